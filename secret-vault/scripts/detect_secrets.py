@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Single-pass secret detector shared by the prompt hook and bulk scans.
+
+All known token formats are compiled into one regex alternation with a
+named group per format, so a text is scanned once and every secret in it is
+reported, not just the first format that matches. BYTES_DETECTOR is the
+same alternation over bytes for scanning transcripts without decoding them,
+and PREFIXES lists the literal prefix of each format for cheap prefiltering.
+
+The generic "long token" heuristic is not part of the alternation: it is
+only applied to short prompts with no known secret, where a bare 60+
+character string is almost certainly something the user meant to paste.
+
+Usage:
+    echo "$HOOK_INPUT" | python3 detect_secrets.py --hook
+    python3 detect_secrets.py < some-file.txt
+
+Output (--hook): the transcript_path on the first line, then one
+"name|label|secret" line per finding. Without --hook, JSON findings.
+"""
+
+import argparse
+import json
+import re
+import sys
+from typing import List, NamedTuple
+
+# (vault file name, human label, regex). Order matters where formats share
+# a prefix: the more specific one must come first.
+PATTERNS = [
+    ("github_token", "GitHub fine-grained PAT", r"github_pat_[A-Za-z0-9_\-]{30,}"),
+    ("github_token_classic", "GitHub classic PAT", r"ghp_[A-Za-z0-9]{30,}"),
+    ("anthropic_oauth", "Anthropic OAuth token", r"sk-ant-oat[A-Za-z0-9_\-]{30,}"),
+    ("anthropic_api_key", "Anthropic API key", r"sk-ant-api[A-Za-z0-9_\-]{30,}"),
+    ("openai_api_key", "OpenAI API key", r"sk-[A-Za-z0-9]{40,}"),
+    ("aws_access_key", "AWS access key", r"AKIA[A-Z0-9]{16}"),
+    ("tailscale_auth_key", "Tailscale auth key", r"tskey-auth-[A-Za-z0-9\-]{30,}"),
+]
+
+LABELS = {name: label for name, label, _ in PATTERNS}
+
+GENERIC = ("unknown_token", "unrecognized token", re.compile(r"[A-Za-z0-9_\-]{60,}"))
+GENERIC_MAX_WORDS = 15
+GENERIC_EXCLUDE = re.compile(r"(https?://|/home/|/usr/|/var/)")
+
+_ALTERNATION = "|".join(f"(?P<{name}>{regex})" for name, _, regex in PATTERNS)
+DETECTOR = re.compile(_ALTERNATION)
+BYTES_DETECTOR = re.compile(_ALTERNATION.encode())
+
+PREFIXES = [b"github_pat_", b"ghp_", b"sk-", b"AKIA", b"tskey-auth-"]
+
+
+class Finding(NamedTuple):
+    name: str
+    label: str
+    secret: str
+    start: int
+    end: int
+
+
+def detect(text: str, generic: bool = False) -> List[Finding]:
+    """Every known-format secret in ``text``, in order of appearance.
+
+    With ``generic``, a short prompt with no known secret is also checked
+    for one long token-like string.
+    """
+    findings = [Finding(m.lastgroup, LABELS[m.lastgroup], m.group(), m.start(), m.end())
+                for m in DETECTOR.finditer(text)]
+    if findings or not generic:
+        return findings
+
+    name, label, regex = GENERIC
+    if len(text.split()) <= GENERIC_MAX_WORDS and not GENERIC_EXCLUDE.search(text):
+        match = regex.search(text)
+        if match:
+            findings.append(Finding(name, label, match.group(), match.start(), match.end()))
+    return findings
+
+
+def vault_names(findings: List[Finding]) -> List[tuple]:
+    """(vault file name, finding) pairs, one per distinct secret.
+
+    A second secret of the same format is stored as <name>_2, and so on.
+    """
+    seen, counts, named = set(), {}, []
+    for finding in findings:
+        if finding.secret in seen:
+            continue
+        seen.add(finding.secret)
+        counts[finding.name] = counts.get(finding.name, 0) + 1
+        suffix = f"_{counts[finding.name]}" if counts[finding.name] > 1 else ""
+        named.append((finding.name + suffix, finding))
+    return named
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Detect secrets in a prompt or text")
+    parser.add_argument("--hook", action="store_true",
+                        help="Read UserPromptSubmit hook JSON and print lines for intercept-secret.sh")
+    args = parser.parse_args(argv)
+
+    if args.hook:
+        try:
+            hook_input = json.load(sys.stdin)
+        except ValueError:
+            return 0
+        prompt = hook_input.get("prompt") or ""
+        print(hook_input.get("transcript_path") or "")
+        for name, finding in vault_names(detect(prompt, generic=True)):
+            print(f"{name}|{finding.label}|{finding.secret}")
+        return 0
+
+    findings = detect(sys.stdin.read())
+    result = {
+        "status": "success",
+        "findings": [{"name": f.name, "label": f.label, "start": f.start, "end": f.end} for f in findings],
+    }
+    print(json.dumps(result, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except Exception as e:
+        print(json.dumps({"status": "error", "error": str(e)}), file=sys.stderr)
+        sys.exit(1)
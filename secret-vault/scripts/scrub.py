@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Incremental, in-place secret scrubber for Claude Code transcripts.
+
+Every occurrence of a vaulted secret is overwritten with a marker of exactly
+the same length ("[VAULT:github_token]****", or "[VAULT]**" / "****" when the
+name does not fit). The file never changes length and is written with
+pwrite at the secret's offset, so Claude Code can keep appending while the
+scrubber runs and no line outside the secret is touched.
+
+Progress lives in ~/.secrets/.scrub-state.json, per file and per secret
+value (keyed by its SHA-256, so a vault name re-used for a new token starts
+over): ``offset`` is how far the file has been scanned for that secret, so
+a secret seen before only costs what was appended since, while a newly
+vaulted one is looked for in the whole file. A run that hits its
+--budget-ms leaves the unscanned range as ``pending`` and the next run
+finishes it. Secrets are read from the vault by name; they never appear on
+the command line, and the state file only holds their digests.
+
+Usage:
+    python3 scrub.py --name github_token ~/.claude/history.jsonl <transcript>
+    python3 scrub.py --resume ~/.claude/history.jsonl
+
+Output: JSON with the redactions made per file.
+"""
+
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional
+
+SECRETS_DIR = Path.home() / ".secrets"
+STATE_FILE = SECRETS_DIR / ".scrub-state.json"
+
+BUDGET_MS = 3000
+SETTLE_MS = 1000
+
+# Deadline is checked between windows of this size
+WINDOW = 8 * 1024 * 1024
+
+
+def marker(name: str, length: int) -> bytes:
+    """A redaction marker for vault ``name`` that is exactly ``length`` bytes long."""
+    for label in (f"[VAULT:{name}]", "[VAULT]"):
+        if len(label) <= length:
+            return (label + "*" * (length - len(label))).encode()
+    return b"*" * length
+
+
+def needles(secret: str) -> List[bytes]:
+    """Byte forms the secret can take in a JSONL file: raw and JSON-escaped."""
+    raw = secret.encode()
+    escaped = json.dumps(secret)[1:-1].encode()
+    return [raw] if escaped == raw else [raw, escaped]
+
+
+def digest(secret: str) -> str:
+    return hashlib.sha256(secret.encode()).hexdigest()
+
+
+def read_vault(name: str) -> Optional[str]:
+    try:
+        secret = (SECRETS_DIR / name).read_text().strip()
+    except OSError:
+        return None
+    return secret or None
+
+
+@contextmanager
+def locked_state():
+    """The state dict, held under an exclusive lock and saved atomically on exit."""
+    import fcntl
+
+    SECRETS_DIR.mkdir(mode=0o700, exist_ok=True)
+    with open(STATE_FILE.with_suffix(".lock"), "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            state = json.loads(STATE_FILE.read_text())
+        except (OSError, ValueError):
+            state = {}
+        yield state
+        tmp = STATE_FILE.with_suffix(f".tmp.{os.getpid()}")
+        tmp.write_text(json.dumps(state, indent=2))
+        os.chmod(tmp, 0o600)
+        os.replace(tmp, STATE_FILE)
+
+
+def scan_range(fd: int, mm, start: int, end: int, secret_needles: List[bytes], replacement: Dict[bytes, bytes],
+               deadline: float) -> tuple:
+    """Redact needles in [start, end). Returns (redactions, resume offset or None when done)."""
+    longest = max(len(n) for n in secret_needles)
+    redactions = 0
+    pos = start
+    while pos < end:
+        if time.monotonic() > deadline:
+            return redactions, pos
+        window_end = min(end, pos + WINDOW)
+        # Matches may start anywhere before window_end; let them run past it
+        search_end = min(end, window_end + longest - 1)
+        for needle in secret_needles:
+            hit = mm.find(needle, pos, search_end)
+            while hit != -1 and hit < window_end:
+                os.pwrite(fd, replacement[needle], hit)
+                redactions += 1
+                hit = mm.find(needle, hit + len(needle), search_end)
+        pos = window_end
+    return redactions, None
+
+
+def scrub_file(path: Path, names: List[str], state: dict, deadline: float) -> dict:
+    """Scan ``path`` for the vaulted secrets in ``names``.
+
+    Progress is tracked per secret value: a secret this file has not been
+    scrubbed for is scanned from the start, since it may have been pasted
+    long before it was caught; a known one only from where it stopped.
+    Pending ranges are retried too, unless their vault name now holds a
+    different secret. Returns a report with the redaction count and the
+    number of ranges still pending.
+    """
+    key = os.path.abspath(path)
+    try:
+        st = path.stat()
+    except OSError:
+        return {"path": key, "error": "not found"}
+
+    entry = state.get(key)
+    if (not entry or "secrets" not in entry or entry.get("inode") != st.st_ino or st.st_size < entry["size"]
+            or any("name" not in progress for progress in entry["secrets"].values())):
+        # New, replaced or truncated file, or state from before per-value tracking: everything is unscanned
+        entry = {"inode": st.st_ino, "size": 0, "secrets": {}}
+    size = st.st_size
+    secrets = entry["secrets"]
+
+    jobs = [dict(job, name=progress["name"], digest=value)
+            for value, progress in secrets.items() for job in progress["pending"]]
+    for name in names:
+        secret = read_vault(name)
+        if secret is None:
+            continue
+        value = digest(secret)
+        progress = secrets.setdefault(value, {"name": name, "offset": 0, "pending": []})
+        progress["name"] = name
+        if progress["offset"] < size:
+            jobs.append({"name": name, "digest": value, "from": progress["offset"], "to": size})
+        progress["offset"] = max(progress["offset"], size)
+    for progress in secrets.values():
+        progress["pending"] = []
+
+    redactions = 0
+    if size:
+        with open(path, "r+b") as f:
+            mm = mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ)
+            try:
+                for job in jobs:
+                    secret = read_vault(job["name"])
+                    if secret is None or digest(secret) != job["digest"]:
+                        continue
+                    forms = needles(secret)
+                    replacement = {n: marker(job["name"], len(n)) for n in forms}
+                    count, resume = scan_range(f.fileno(), mm, job["from"], min(job["to"], size), forms,
+                                               replacement, deadline)
+                    redactions += count
+                    if resume is not None:
+                        secrets[job["digest"]]["pending"].append({"from": resume, "to": job["to"]})
+            finally:
+                mm.close()
+
+    state[key] = {"inode": st.st_ino, "size": size, "secrets": secrets}
+    pending = sum(len(progress["pending"]) for progress in secrets.values())
+    return {"path": key, "redactions": redactions, "scanned_to": size, "pending": pending}
+
+
+def scrub(paths: List[Path], names: List[str], budget_ms: int = BUDGET_MS) -> List[dict]:
+    deadline = time.monotonic() + budget_ms / 1000
+    with locked_state() as state:
+        return [scrub_file(path, names, state, deadline) for path in paths]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Redact vaulted secrets from transcripts in place")
+    parser.add_argument("paths", nargs="+", type=Path, help="Transcript or history files")
+    parser.add_argument("--name", action="append", default=[],
+                        help="Vault file name (~/.secrets/<name>) of a secret to redact; repeatable")
+    parser.add_argument("--resume", action="store_true", help="Only finish pending ranges from earlier runs")
+    parser.add_argument("--budget-ms", type=int, default=BUDGET_MS, help="Time budget per pass")
+    parser.add_argument("--settle-ms", type=int, default=SETTLE_MS,
+                        help="Wait this long, then scan what was appended meanwhile (0 disables)")
+    args = parser.parse_args(argv)
+
+    if not args.name and not args.resume:
+        parser.error("give --name or --resume")
+
+    names = [] if args.resume else args.name
+    reports = scrub(args.paths, names, args.budget_ms)
+    if args.settle_ms and names:
+        # The prompt may reach history.jsonl or the transcript just after the hook returns
+        time.sleep(args.settle_ms / 1000)
+        settled = scrub(args.paths, names, args.budget_ms)
+        for report, late in zip(reports, settled):
+            if "redactions" in report and "redactions" in late:
+                report["redactions"] += late["redactions"]
+                report["scanned_to"] = late["scanned_to"]
+                report["pending"] = late["pending"]
+
+    print(json.dumps({"status": "success", "files": reports}, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except Exception as e:
+        print(json.dumps({"status": "error", "error": str(e)}), file=sys.stderr)
+        sys.exit(1)
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Sweep existing Claude Code transcripts for secrets and redact them.
+
+The prompt hook only scrubs the current transcript when it catches a
+secret. Secrets pasted before the plugin was installed, or that came back
+in tool output, are still sitting in ~/.claude/projects/**/*.jsonl. This
+walks projects with session-historian's walker (one worker process per
+project) and scans every transcript with the compiled detector.
+
+Each live transcript is mmapped and searched for the literal prefix of
+every known format with mmap.find. The detector is anchored only at those
+offsets, so the regex engine never runs over the bulk of the file.
+Findings are redacted in place with the same-length markers scrub.py uses,
+which is safe while Claude Code is appending. Archived (.jsonl.gz)
+sessions are scanned and reported but cannot be redacted in place.
+
+Usage:
+    python3 sweep.py --all-projects --dry-run
+    python3 sweep.py --project 'api-*' --workers 8
+
+Output: JSON with findings per format and per project. Secret values are
+never printed; findings show the format, file, offset and a short prefix.
+"""
+
+import argparse
+import glob
+import gzip
+import json
+import mmap
+import os
+import sys
+from collections import Counter
+from pathlib import Path
+from typing import List
+
+
+def _session_historian_scripts() -> Path:
+    """session-historian's scripts dir: $SESSION_HISTORIAN_SCRIPTS, the sibling
+    plugin in this marketplace, or an installed copy in the plugin cache."""
+    if os.environ.get("SESSION_HISTORIAN_SCRIPTS"):
+        return Path(os.environ["SESSION_HISTORIAN_SCRIPTS"])
+    sibling = Path(__file__).resolve().parents[2] / "session-historian" / "scripts"
+    if sibling.exists():
+        return sibling
+    cached = glob.glob(str(Path.home() / ".claude/plugins/**/session-historian/**/scripts/session_io.py"),
+                       recursive=True)
+    return Path(sorted(cached)[-1]).parent if cached else sibling
+
+
+sys.path.insert(0, str(_session_historian_scripts()))
+
+from detect_secrets import BYTES_DETECTOR, LABELS, PREFIXES  # noqa: E402
+from scrub import marker  # noqa: E402
+
+try:
+    from perf import PERF, add_profile_args, configure, emit_json, timed  # noqa: E402
+    from session_io import ARCHIVE_SUFFIX, is_archived, map_projects, match_project_dirs  # noqa: E402
+except ImportError:
+    print(json.dumps({"status": "error", "error": "session-historian plugin not found; "
+                                                  "set SESSION_HISTORIAN_SCRIPTS to its scripts directory"}))
+    sys.exit(1)
+
+# Findings listed individually in the output; the rest are only counted
+FINDINGS_LIMIT = 100
+PREVIEW_CHARS = 8
+
+
+def find_secrets(data) -> List[tuple]:
+    """(offset, name, secret bytes) for every known-format secret in ``data``.
+
+    ``data`` is any bytes-like object, typically an mmap. Candidate offsets
+    come from a memchr-speed search for each format's literal prefix; the
+    compiled detector then only has to match at those offsets.
+    """
+    candidates = set()
+    for prefix in PREFIXES:
+        pos = data.find(prefix)
+        while pos != -1:
+            candidates.add(pos)
+            pos = data.find(prefix, pos + 1)
+
+    found, covered = [], 0
+    for pos in sorted(candidates):
+        if pos < covered:
+            continue
+        match = BYTES_DETECTOR.match(data, pos)
+        if match:
+            found.append((pos, match.lastgroup, match.group()))
+            covered = match.end()
+    return found
+
+
+@timed("scan")
+def sweep_file(path: Path, redact: bool) -> dict:
+    """Scan one transcript and, when ``redact``, overwrite its secrets in place."""
+    report = {"file": str(path), "bytes": 0, "findings": [], "redacted": 0}
+    try:
+        if is_archived(path):
+            with gzip.open(path, "rb") as f:
+                data = f.read()
+            report["bytes"] = len(data)
+            found = find_secrets(data)
+            report["compressed"] = True
+        else:
+            size = path.stat().st_size
+            report["bytes"] = size
+            if not size:
+                return report
+            with open(path, "r+b" if redact else "rb") as f:
+                mm = mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ)
+                try:
+                    found = find_secrets(mm)
+                    if redact:
+                        for offset, name, secret in found:
+                            os.pwrite(f.fileno(), marker(name, len(secret)), offset)
+                        report["redacted"] = len(found)
+                finally:
+                    mm.close()
+    except (OSError, EOFError) as e:
+        report["error"] = str(e)
+        return report
+
+    PERF.count("bytes_scanned", report["bytes"])
+    report["findings"] = [{"offset": offset, "name": name, "preview": secret[:PREVIEW_CHARS].decode() + "..."}
+                          for offset, name, secret in found]
+    return report
+
+
+class SweepTally:
+    """Mergeable sweep counts for a set of files."""
+
+    def __init__(self):
+        self.files = 0
+        self.bytes = 0
+        self.files_with_findings = 0
+        self.redacted = 0
+        self.unredacted_archives = 0
+        self.errors = 0
+        self.by_name = Counter()
+        self.findings = []
+
+    def add(self, report: dict) -> None:
+        self.files += 1
+        self.bytes += report["bytes"]
+        self.redacted += report["redacted"]
+        if report.get("error"):
+            self.errors += 1
+        if not report["findings"]:
+            return
+        self.files_with_findings += 1
+        if report.get("compressed"):
+            self.unredacted_archives += 1
+        for finding in report["findings"]:
+            self.by_name[finding["name"]] += 1
+            if len(self.findings) < FINDINGS_LIMIT:
+                self.findings.append({"file": report["file"], **finding})
+
+    def merge(self, other: "SweepTally") -> "SweepTally":
+        self.files += other.files
+        self.bytes += other.bytes
+        self.files_with_findings += other.files_with_findings
+        self.redacted += other.redacted
+        self.unredacted_archives += other.unredacted_archives
+        self.errors += other.errors
+        self.by_name.update(other.by_name)
+        self.findings.extend(other.findings[:FINDINGS_LIMIT - len(self.findings)])
+        return self
+
+    def summary(self) -> dict:
+        return {
+            "files_scanned": self.files,
+            "bytes_scanned": self.bytes,
+            "files_with_findings": self.files_with_findings,
+            "total_findings": sum(self.by_name.values()),
+            "redacted": self.redacted,
+            "unredacted_archives": self.unredacted_archives,
+            "errors": self.errors,
+            "by_format": [{"name": name, "label": LABELS[name], "count": count}
+                          for name, count in self.by_name.most_common()],
+        }
+
+
+def sweep_project(project_dir: Path, redact: bool) -> SweepTally:
+    """Sweep every session file in ``project_dir``.
+
+    Unlike session_files, a live transcript does not shadow an archive of
+    the same id here: both can hold secrets, so both are scanned.
+    """
+    tally = SweepTally()
+    for session_file in sorted(project_dir.glob("*.jsonl")) + sorted(project_dir.glob("*" + ARCHIVE_SUFFIX)):
+        tally.add(sweep_file(session_file, redact))
+    return tally
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Find and redact secrets in existing Claude Code transcripts")
+    scope = parser.add_mutually_exclusive_group(required=True)
+    scope.add_argument("--project", help="Project name or glob (e.g. 'api-*')")
+    scope.add_argument("--all-projects", action="store_true",
+                       help="Sweep every project, plus ~/.claude/history.jsonl")
+    parser.add_argument("--dry-run", action="store_true", help="Report findings without redacting")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    add_profile_args(parser)
+
+    args = parser.parse_args(argv)
+    configure(args)
+
+    project_dirs = match_project_dirs(None if args.all_projects else args.project)
+    if not project_dirs:
+        result = {
+            "status": "error",
+            "error": "No projects found" + (f" matching '{args.project}'" if args.project else ""),
+            "project": args.project,
+        }
+        print(json.dumps(result, indent=2))
+        return 1
+
+    redact = not args.dry_run
+    total = SweepTally()
+    by_project = []
+    for project_dir, tally in map_projects(sweep_project, project_dirs, (redact,), args.workers):
+        total.merge(tally)
+        if tally.files_with_findings:
+            by_project.append({"project_dir": str(project_dir), **tally.summary()})
+    by_project.sort(key=lambda p: (-p["total_findings"], p["project_dir"]))
+
+    history = Path.home() / ".claude" / "history.jsonl"
+    if args.all_projects and history.exists():
+        total.add(sweep_file(history, redact))
+
+    result = {
+        "status": "success",
+        "project": args.project or "*",
+        "projects_matched": len(project_dirs),
+        "dry_run": args.dry_run,
+        **total.summary(),
+        "findings": total.findings,
+        "by_project": by_project,
+    }
+    emit_json(result)
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except Exception as e:
+        print(json.dumps({"status": "error", "error": str(e)}), file=sys.stderr)
+        sys.exit(1)
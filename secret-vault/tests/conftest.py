@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Shared pytest fixtures for secret-vault tests.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+SCRIPTS_DIR = Path(__file__).parent.parent / "scripts"
+
+# Let tests import script modules directly for unit-level checks
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+
+@pytest.fixture
+def scripts_dir():
+    """Return the path to the secret-vault scripts directory."""
+    return SCRIPTS_DIR
+
+
+@pytest.fixture
+def vault(tmp_path, monkeypatch):
+    """A temporary ~/.secrets for scrub.py; call it with (name, secret) to store a secret."""
+    import scrub
+
+    secrets_dir = tmp_path / ".secrets"
+    secrets_dir.mkdir(mode=0o700)
+    monkeypatch.setattr(scrub, "SECRETS_DIR", secrets_dir)
+    monkeypatch.setattr(scrub, "STATE_FILE", secrets_dir / ".scrub-state.json")
+
+    def store(name, secret):
+        (secrets_dir / name).write_text(secret + "\n")
+        return secret
+
+    store.dir = secrets_dir
+    return store
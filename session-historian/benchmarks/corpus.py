@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Deterministic synthetic session corpus for benchmarks.
+
+Writes a fake HOME containing .claude/projects/<project>/*.jsonl with
+realistic entry shapes: user prompts, assistant text and thinking, tool_use
+calls drawn from a weighted tool mix, tool_result payloads of configurable
+size (string and list-of-blocks forms), file-history snapshots and
+agent-*.jsonl sub-agent transcripts launched by Task calls. The same
+arguments and seed always produce byte-identical files.
+
+Usage:
+    python corpus.py --out /tmp/corpus --sessions 50 --lines 2000
+    python corpus.py --out /tmp/corpus --tool-mix "Bash=5,Read=3,Edit=2" --result-bytes 8192
+"""
+
+import argparse
+import json
+import random
+import sys
+import zlib
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict
+
+DEFAULT_TOOL_MIX = "Bash=5,Read=4,Edit=3,Grep=2,Write=1,Glob=1,Task=1"
+
+BASH_COMMANDS = [
+    "git status", "git diff --stat", "git commit -m 'wip'", "npm test", "npm run build",
+    "python -m pytest -q", "bd close proj-abc", "gh pr create --fill", "ls -la src",
+    "docker compose up -d", "make lint",
+]
+WORDS = (
+    "parser config gateway session token cache index render schema worker queue "
+    "retry timeout handler module import export build deploy branch commit"
+).split()
+ERROR_RESULTS = [
+    "Error: ENOENT: no such file or directory",
+    "Traceback (most recent call last):\n  File \"app.py\", line 3\nTypeError: bad operand",
+    "bash: foo: command not found",
+    "FAILED tests/test_app.py::test_render - AssertionError",
+]
+
+
+def parse_tool_mix(value: str) -> Dict[str, int]:
+    """Parse "Bash=5,Read=3" into {"Bash": 5, "Read": 3}."""
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip():
+            mix[name.strip()] = int(weight or 1)
+    return mix
+
+
+class CorpusGenerator:
+    """Generate session files from a seeded RNG."""
+
+    def __init__(self, seed: int = 0, tool_mix: str = DEFAULT_TOOL_MIX, result_bytes: int = 2048,
+                 error_rate: float = 0.1, start: datetime = None):
+        self.rng = random.Random(seed)
+        mix = parse_tool_mix(tool_mix)
+        self.tools = list(mix)
+        self.weights = [mix[t] for t in self.tools]
+        self.result_bytes = result_bytes
+        self.error_rate = error_rate
+        self.start = start or datetime(2025, 12, 1, tzinfo=timezone.utc)
+
+    def _text(self, n_words: int) -> str:
+        return " ".join(self.rng.choice(WORDS) for _ in range(n_words))
+
+    def _payload(self) -> str:
+        size = max(16, int(self.rng.expovariate(1 / self.result_bytes)))
+        line = self._text(12) + "\n"
+        return (line * (size // len(line) + 1))[:size]
+
+    def _tool_input(self, tool: str, n: int) -> dict:
+        path = f"/home/bench/project/src/{self.rng.choice(WORDS)}_{n % 40}.py"
+        if tool == "Bash":
+            return {"command": self.rng.choice(BASH_COMMANDS), "description": self._text(4)}
+        if tool in ("Read", "Write"):
+            inp = {"file_path": path}
+            if tool == "Write":
+                inp["content"] = self._payload()
+            return inp
+        if tool == "Edit":
+            return {"file_path": path, "old_string": self._text(6), "new_string": self._text(7)}
+        if tool == "Task":
+            return {"description": self._text(3), "subagent_type": "general-purpose",
+                    "prompt": f"Task {n}: " + self._text(20)}
+        return {"pattern": self.rng.choice(WORDS), "path": "/home/bench/project"}
+
+    def session_lines(self, session_id: str, n_lines: int, day: int, agent_parent: str = None,
+                      first_prompt: str = None):
+        """Yield JSON lines for one session; Task prompts are reported via self.task_prompts."""
+        ts = self.start + timedelta(days=day, minutes=self.rng.randint(0, 600))
+        sid = agent_parent or session_id
+        sidechain = agent_parent is not None
+        parent = None
+        uuid_n = 0
+        self.task_prompts = []
+        tracked = {}
+
+        def base(kind):
+            nonlocal parent, uuid_n, ts
+            uuid_n += 1
+            ts += timedelta(seconds=self.rng.randint(1, 30))
+            entry = {"parentUuid": parent, "isSidechain": sidechain, "userType": "external",
+                     "cwd": "/home/bench/project", "sessionId": sid, "version": "2.0.75",
+                     "gitBranch": self.rng.choice(["main", "main", "feature/x", "fix/y"]) if uuid_n == 1 else "main",
+                     "type": kind, "uuid": f"{session_id}-{uuid_n:06d}",
+                     "timestamp": ts.strftime("%Y-%m-%dT%H:%M:%S.000Z")}
+            parent = entry["uuid"]
+            return entry
+
+        entry = base("user")
+        entry["message"] = {"role": "user", "content": first_prompt or self._text(15)}
+        yield json.dumps(entry)
+        written = 1
+        msg_n = 0
+
+        while written < n_lines:
+            msg_n += 1
+            roll = self.rng.random()
+            if roll < 0.15:
+                entry = base("assistant")
+                entry["message"] = {"id": f"msg_{session_id}_{msg_n}", "role": "assistant",
+                                    "content": [{"type": "thinking", "thinking": self._text(40)},
+                                                {"type": "text", "text": self._text(60)}],
+                                    "usage": {"input_tokens": self.rng.randint(100, 5000),
+                                              "output_tokens": self.rng.randint(10, 800)}}
+                yield json.dumps(entry)
+                written += 1
+                continue
+
+            tool = self.rng.choices(self.tools, self.weights)[0]
+            tool_id = f"toolu_{session_id}_{msg_n}"
+            tool_input = self._tool_input(tool, msg_n)
+            if tool == "Task":
+                self.task_prompts.append(tool_input["prompt"])
+            entry = base("assistant")
+            entry["message"] = {"id": f"msg_{session_id}_{msg_n}", "role": "assistant",
+                                "content": [{"type": "tool_use", "id": tool_id, "name": tool, "input": tool_input}],
+                                "usage": {"input_tokens": self.rng.randint(100, 5000),
+                                          "output_tokens": self.rng.randint(10, 800)}}
+            yield json.dumps(entry)
+
+            if self.rng.random() < self.error_rate:
+                result = self.rng.choice(ERROR_RESULTS)
+            else:
+                result = self._payload()
+            content = result if self.rng.random() < 0.7 else [{"type": "text", "text": result}]
+            entry = base("user")
+            entry["message"] = {"role": "user", "content": [
+                {"type": "tool_result", "tool_use_id": tool_id, "content": content}]}
+            yield json.dumps(entry)
+            written += 2
+
+            if tool in ("Edit", "Write") and not sidechain:
+                path = tool_input["file_path"]
+                tracked[path] = {"backupFileName": f"{zlib.crc32(path.encode()):08x}@v",
+                                 "version": tracked.get(path, {}).get("version", 0) + 1,
+                                 "backupTime": entry["timestamp"]}
+                yield json.dumps({"type": "file-history-snapshot", "messageId": entry["uuid"],
+                                  "snapshot": {"messageId": entry["uuid"], "trackedFileBackups": dict(tracked),
+                                               "timestamp": entry["timestamp"]},
+                                  "isSnapshotUpdate": True})
+                written += 1
+
+        if not sidechain:
+            yield json.dumps({"type": "summary", "summary": self._text(6), "leafUuid": parent})
+
+    def write_corpus(self, home: Path, sessions: int, lines: int, agents_per_task: float = 0.1,
+                     project: str = "-home-bench-project", days: int = 30) -> Path:
+        """Write the corpus under home/.claude/projects/<project>/ and return that directory."""
+        project_dir = home / ".claude" / "projects" / project
+        project_dir.mkdir(parents=True, exist_ok=True)
+        for i in range(sessions):
+            session_id = f"{self.rng.getrandbits(32):08x}-bench-{i:04d}"
+            day = self.rng.randrange(days)
+            with open(project_dir / f"{session_id}.jsonl", "w") as f:
+                for line in self.session_lines(session_id, lines, day):
+                    f.write(line + "\n")
+            for j, prompt in enumerate(list(self.task_prompts)):
+                if self.rng.random() >= agents_per_task:
+                    continue
+                agent_id = f"agent-{i:04d}{j:03d}"
+                with open(project_dir / f"{agent_id}.jsonl", "w") as f:
+                    for line in self.session_lines(agent_id, max(10, lines // 10), day,
+                                                   agent_parent=session_id, first_prompt=prompt):
+                        f.write(line + "\n")
+        return project_dir
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic session corpus")
+    parser.add_argument("--out", required=True, help="Directory used as HOME for the corpus")
+    parser.add_argument("--sessions", type=int, default=20, help="Number of parent sessions")
+    parser.add_argument("--lines", type=int, default=1000, help="Approximate lines per session")
+    parser.add_argument("--tool-mix", default=DEFAULT_TOOL_MIX, help="Weighted tool mix, e.g. Bash=5,Read=3")
+    parser.add_argument("--result-bytes", type=int, default=2048, help="Mean tool_result size in bytes")
+    parser.add_argument("--error-rate", type=float, default=0.1, help="Fraction of tool results that are errors")
+    parser.add_argument("--agents-per-task", type=float, default=0.1,
+                        help="Probability that a Task call gets an agent-*.jsonl transcript")
+    parser.add_argument("--seed", type=int, default=0, help="RNG seed")
+
+    args = parser.parse_args()
+
+    gen = CorpusGenerator(seed=args.seed, tool_mix=args.tool_mix, result_bytes=args.result_bytes,
+                          error_rate=args.error_rate)
+    project_dir = gen.write_corpus(Path(args.out), args.sessions, args.lines, args.agents_per_task)
+    files = list(project_dir.glob("*.jsonl"))
+    result = {
+        "status": "success",
+        "project_dir": str(project_dir),
+        "files": len(files),
+        "bytes": sum(f.stat().st_size for f in files),
+    }
+    print(json.dumps(result, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Benchmark the per-session core function of every session-historian script.
+
+Each benchmark runs in a fresh interpreter so peak RSS belongs to that
+benchmark alone. Throughput is reported as MB/s and lines/s over the corpus,
+alongside wall time, CPU time and peak RSS. Results can be saved and compared
+against a baseline to catch regressions in the hot loops.
+
+Usage:
+    python run_benchmarks.py                                   # generate a corpus in a temp dir
+    python run_benchmarks.py --sessions 100 --lines 5000 --save baseline.json
+    python run_benchmarks.py --corpus /tmp/corpus --baseline baseline.json --threshold 0.2
+    python run_benchmarks.py --only search_session,build_dag
+    python run_benchmarks.py --startup                         # also time CLI start-up
+
+Output: JSON with one result per benchmark and any regressions.
+"""
+
+import argparse
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+SCRIPTS_DIR = BENCH_DIR.parent / "scripts"
+
+# name -> (module, function, extra args). Each function takes a session file first.
+BENCHMARKS = {
+    "get_session_metadata": ("list_sessions", "get_session_metadata", ()),
+    "summarize_session": ("summarize_session", "summarize_session", ()),
+    "search_session": ("search_sessions", "search_session",
+                       ({"text": "traceback", "in": ["messages", "results", "thinking", "inputs"],
+                         "tool": "Bash", "file": "config"},)),
+    "find_errors_in_session": ("find_errors", "find_errors_in_session", ()),
+    "get_session_context": ("get_session_context", "get_session_context", (True,)),
+    "analyze_session": ("cross_session_analysis", "analyze_session", ()),
+    "aggregate_session_file": ("agent_tree", "aggregate_session_file", ()),
+    "build_dag": ("conversation_dag", "build_dag", ()),
+    "extract_file_activity": ("file_activity", "extract_file_activity", ()),
+}
+
+# Start-up budget for `session_historian.py list --limit 5`, in ms on top of a
+# bare interpreter launch (the interpreter itself is outside our control).
+STARTUP_BUDGET_MS = 40
+STARTUP_COMMAND = ["list", "--limit", "5"]
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MB."""
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS reports bytes
+    return round(rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def run_child(name: str, project_dir: Path, repeat: int) -> dict:
+    """Run one benchmark in this process and return its timings."""
+    sys.path.insert(0, str(SCRIPTS_DIR))
+    module_name, func_name, extra = BENCHMARKS[name]
+    func = getattr(__import__(module_name), func_name)
+    files = sorted(project_dir.glob("*.jsonl"))
+
+    walls, cpus = [], []
+    for _ in range(repeat):
+        wall0, cpu0 = time.perf_counter(), time.process_time()
+        for session_file in files:
+            func(session_file, *extra)
+        walls.append(time.perf_counter() - wall0)
+        cpus.append(time.process_time() - cpu0)
+
+    return {"wall_s": min(walls), "wall_median_s": statistics.median(walls),
+            "cpu_s": min(cpus), "peak_rss_mb": peak_rss_mb()}
+
+
+def measure_startup(home: Path, project_dir: Path, env: dict, budget_ms: float, runs: int = 15) -> dict:
+    """Median wall time of a small CLI query, and its overhead over a bare interpreter."""
+    def median_ms(cmd):
+        times = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                           env=dict(env, HOME=str(home)))
+            times.append((time.perf_counter() - start) * 1000)
+        return statistics.median(times)
+
+    # Warm the page cache and __pycache__ before timing
+    cli = [sys.executable, str(SCRIPTS_DIR / "session_historian.py"), STARTUP_COMMAND[0],
+           "--project", project_dir.name, *STARTUP_COMMAND[1:]]
+    subprocess.run(cli, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, env=dict(env, HOME=str(home)))
+
+    interpreter_ms = median_ms([sys.executable, "-c", "pass"])
+    command_ms = median_ms(cli)
+    overhead_ms = command_ms - interpreter_ms
+    return {
+        "command": " ".join(STARTUP_COMMAND),
+        "interpreter_ms": round(interpreter_ms, 1),
+        "command_ms": round(command_ms, 1),
+        "overhead_ms": round(overhead_ms, 1),
+        "budget_ms": budget_ms,
+        "within_budget": overhead_ms <= budget_ms,
+    }
+
+
+def corpus_size(project_dir: Path) -> dict:
+    total_bytes = 0
+    total_lines = 0
+    files = 0
+    for session_file in project_dir.glob("*.jsonl"):
+        files += 1
+        with open(session_file, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                total_bytes += len(chunk)
+                total_lines += chunk.count(b"\n")
+    return {"files": files, "bytes": total_bytes, "lines": total_lines}
+
+
+def find_corpus_project(home: Path) -> Path:
+    projects = home / ".claude" / "projects"
+    dirs = sorted(d for d in projects.iterdir() if d.is_dir()) if projects.exists() else []
+    if not dirs:
+        raise SystemExit(f"No project directories under {projects}")
+    return dirs[0]
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """Return benchmarks whose throughput dropped more than ``threshold`` versus baseline."""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get("results", {}).get(name)
+        if not base or not base.get("mb_per_s"):
+            continue
+        change = (result["mb_per_s"] - base["mb_per_s"]) / base["mb_per_s"]
+        if change < -threshold:
+            regressions.append({"benchmark": name, "baseline_mb_per_s": base["mb_per_s"],
+                                "mb_per_s": result["mb_per_s"], "change": round(change, 3)})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark session-historian core functions")
+    parser.add_argument("--corpus", help="Existing corpus HOME (default: generate one in a temp dir)")
+    parser.add_argument("--sessions", type=int, default=20, help="Sessions to generate")
+    parser.add_argument("--lines", type=int, default=1000, help="Lines per generated session")
+    parser.add_argument("--result-bytes", type=int, default=2048, help="Mean generated tool_result size")
+    parser.add_argument("--tool-mix", help="Weighted tool mix for the generated corpus, e.g. Bash=5,Read=3")
+    parser.add_argument("--agents-per-task", type=float, default=0.1,
+                        help="Probability that a generated Task call gets an agent transcript")
+    parser.add_argument("--seed", type=int, default=0, help="Corpus RNG seed")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed passes per benchmark (best is reported)")
+    parser.add_argument("--only", help="Comma-separated benchmark names")
+    parser.add_argument("--save", help="Write results to this JSON file")
+    parser.add_argument("--baseline", help="Compare against a saved results file")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Allowed throughput drop versus baseline (default 0.2 = 20%%)")
+    parser.add_argument("--startup", action="store_true",
+                        help=f"Also time `session_historian.py {' '.join(STARTUP_COMMAND)}` "
+                             "against the start-up budget")
+    parser.add_argument("--startup-budget-ms", type=float, default=STARTUP_BUDGET_MS,
+                        help=f"Allowed start-up overhead over a bare interpreter (default {STARTUP_BUDGET_MS})")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--project-dir", help=argparse.SUPPRESS)
+
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_child(args.child, Path(args.project_dir), args.repeat)))
+        return 0
+
+    names = args.only.split(",") if args.only else list(BENCHMARKS)
+    unknown = [n for n in names if n not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(unknown)}")
+
+    with tempfile.TemporaryDirectory(prefix="historian-bench-") as tmp:
+        if args.corpus:
+            home = Path(args.corpus)
+            project_dir = find_corpus_project(home)
+        else:
+            sys.path.insert(0, str(BENCH_DIR))
+            from corpus import DEFAULT_TOOL_MIX, CorpusGenerator
+
+            gen = CorpusGenerator(seed=args.seed, result_bytes=args.result_bytes,
+                                  tool_mix=args.tool_mix or DEFAULT_TOOL_MIX)
+            home = Path(tmp)
+            project_dir = gen.write_corpus(home, args.sessions, args.lines, args.agents_per_task)
+
+        size = corpus_size(project_dir)
+        env = dict(os.environ, SESSION_HISTORIAN_CACHE=str(Path(tmp) / "cache"))
+        results = {}
+        for name in names:
+            proc = subprocess.run(
+                [sys.executable, __file__, "--child", name, "--project-dir", str(project_dir),
+                 "--repeat", str(args.repeat)],
+                capture_output=True, text=True, env=env,
+            )
+            if proc.returncode != 0:
+                results[name] = {"error": proc.stderr.strip().splitlines()[-1:] or ["failed"]}
+                continue
+            timing = json.loads(proc.stdout)
+            wall = timing["wall_s"] or 1e-9
+            results[name] = {
+                **{k: round(v, 4) if isinstance(v, float) else v for k, v in timing.items()},
+                "mb_per_s": round(size["bytes"] / wall / (1024 * 1024), 2),
+                "lines_per_s": round(size["lines"] / wall),
+            }
+
+        startup = measure_startup(home, project_dir, env, args.startup_budget_ms) if args.startup else None
+
+    output = {
+        "status": "success",
+        "python": sys.version.split()[0],
+        "corpus": size,
+        "repeat": args.repeat,
+        "results": results,
+    }
+    if startup is not None:
+        output["startup"] = startup
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(output, f, indent=2)
+
+    exit_code = 0
+    if startup is not None and not startup["within_budget"]:
+        output["status"] = "regression"
+        exit_code = 1
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        output["regressions"] = regressions
+        if regressions:
+            output["status"] = "regression"
+            exit_code = 1
+
+    print(json.dumps(output, indent=2))
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
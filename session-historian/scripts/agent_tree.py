@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+"""
+Link sub-agent sessions to the parent session that spawned them.
+
+Sub-agent runs are written as agent-*.jsonl files next to the parent session.
+Their entries carry the parent's sessionId, and the run was started by a Task
+tool call in the parent. This module indexes a project directory, links each
+agent file to the Task call that launched it, and rolls per-file aggregates
+up across the whole tree.
+
+Usage:
+    python agent_tree.py --project claude-life-dev
+    python agent_tree.py --project claude-life-dev --session-id <uuid>
+
+Output: JSON with the parent/child index, or one rolled-up tree.
+"""
+
+import argparse
+import json
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from perf import PERF, add_profile_args, configure, emit_json, timed
+from session_cache import file_signature, load_json_cache, save_json_cache
+from session_io import iter_entries, mentions_error, session_files, session_id_from_path
+
+# Prompts are compared on their first characters; Task inputs and the first
+# user message of the sub-agent are the same text.
+PROMPT_MATCH_CHARS = 200
+
+
+@timed("walk")
+def find_project_dir(project_name: str) -> Optional[Path]:
+    """Find the project directory in ~/.claude/projects/"""
+    claude_projects = Path.home() / ".claude" / "projects"
+
+    if not claude_projects.exists():
+        return None
+
+    if project_name.startswith("/"):
+        encoded = project_name.replace("/", "-")
+        project_dir = claude_projects / encoded
+        return project_dir if project_dir.exists() else None
+
+    for d in claude_projects.iterdir():
+        if d.is_dir() and d.name.endswith(project_name):
+            return d
+
+    for d in claude_projects.iterdir():
+        if d.is_dir() and project_name in d.name:
+            return d
+
+    return None
+
+
+def is_agent_file(session_file: Path) -> bool:
+    """Return True for sub-agent transcripts (agent-*.jsonl)."""
+    return session_file.name.startswith("agent-")
+
+
+@timed("process")
+def aggregate_session_file(session_file: Path) -> dict:
+    """Compute the per-file aggregate used for linkage and tree roll-ups."""
+    agg = {
+        "session_id": session_id_from_path(session_file),
+        "parent_session_id": None,
+        "is_agent": is_agent_file(session_file),
+        "start_time": None,
+        "end_time": None,
+        "tool_calls": 0,
+        "tool_counts": {},
+        "error_count": 0,
+        "input_tokens": 0,
+        "output_tokens": 0,
+        "first_prompt": None,
+        "task_calls": [],
+    }
+    seen_message_ids = set()
+
+    for entry in iter_entries(session_file):
+        entry_type = entry.get("type")
+        timestamp = entry.get("timestamp")
+
+        if timestamp:
+            if agg["start_time"] is None:
+                agg["start_time"] = timestamp
+            agg["end_time"] = timestamp
+
+        if agg["parent_session_id"] is None and entry.get("sessionId"):
+            agg["parent_session_id"] = entry["sessionId"]
+
+        if entry_type == "user":
+            content = entry.get("message", {}).get("content", "")
+            if agg["first_prompt"] is None and isinstance(content, str) and content:
+                agg["first_prompt"] = content[:PROMPT_MATCH_CHARS]
+            if isinstance(content, list):
+                for block in content:
+                    if block.get("type") == "tool_result":
+                        if mentions_error(str(block.get("content", ""))):
+                            agg["error_count"] += 1
+
+        elif entry_type == "assistant":
+            message = entry.get("message", {})
+
+            # One API message is split across several entries that all
+            # repeat the same usage block; count it once.
+            usage = message.get("usage")
+            message_id = message.get("id")
+            if usage and message_id not in seen_message_ids:
+                if message_id:
+                    seen_message_ids.add(message_id)
+                agg["input_tokens"] += usage.get("input_tokens", 0) or 0
+                agg["output_tokens"] += usage.get("output_tokens", 0) or 0
+
+            content = message.get("content", [])
+            if isinstance(content, list):
+                for block in content:
+                    if block.get("type") != "tool_use":
+                        continue
+                    tool_name = block.get("name", "unknown")
+                    agg["tool_calls"] += 1
+                    agg["tool_counts"][tool_name] = agg["tool_counts"].get(tool_name, 0) + 1
+                    if tool_name == "Task":
+                        tool_input = block.get("input", {})
+                        agg["task_calls"].append({
+                            "id": block.get("id"),
+                            "timestamp": timestamp,
+                            "description": tool_input.get("description"),
+                            "subagent_type": tool_input.get("subagent_type"),
+                            "prompt": (tool_input.get("prompt") or "")[:PROMPT_MATCH_CHARS],
+                        })
+
+    # A regular session's sessionId is its own id; only agents have a parent
+    if not agg["is_agent"] or agg["parent_session_id"] == agg["session_id"]:
+        agg["parent_session_id"] = None
+
+    return agg
+
+
+def load_aggregates(project_dir: Path, use_cache: bool = True) -> Dict[str, dict]:
+    """Return per-file aggregates for a project, re-parsing only changed files."""
+    cache_name = f"aggregates/{project_dir.name}.json"
+    cached = (load_json_cache(cache_name) or {}).get("files", {}) if use_cache else {}
+
+    files = {}
+    aggregates = {}
+    for session_file in session_files(project_dir):
+        try:
+            sig = file_signature(session_file)
+        except OSError:
+            continue
+        hit = cached.get(session_file.name)
+        if hit and hit.get("sig") == sig:
+            PERF.count("cache_hits")
+            agg = hit["agg"]
+        else:
+            PERF.count("cache_misses")
+            try:
+                agg = aggregate_session_file(session_file)
+            except OSError:
+                continue
+        files[session_file.name] = {"sig": sig, "agg": agg}
+        aggregates[agg["session_id"]] = agg
+
+    if use_cache and files != cached:
+        save_json_cache(cache_name, {"files": files})
+
+    return aggregates
+
+
+def _match_task_call(child: dict, candidates: List[dict]) -> Optional[dict]:
+    """Pick the Task call that launched ``child`` from (owner_id, task) candidates."""
+    prompt = child.get("first_prompt")
+    if prompt:
+        for candidate in candidates:
+            if candidate["task"]["prompt"] and candidate["task"]["prompt"] == prompt:
+                return candidate
+
+    # Fall back to the latest Task call issued before the child started
+    start = child.get("start_time")
+    if not start:
+        return None
+    before = [c for c in candidates if c["task"]["timestamp"] and c["task"]["timestamp"] <= start]
+    return max(before, key=lambda c: c["task"]["timestamp"]) if before else None
+
+
+def build_agent_index(aggregates: Dict[str, dict]) -> Dict[str, dict]:
+    """Link every agent file to its parent session and launching Task call.
+
+    Returns {child_session_id: {"parent": owner_id, "root": root_id, "task": {...}}}.
+    Nested agents share the root's sessionId, so Task calls from every file in
+    the same root are candidates; the file owning the matched call is the parent.
+    """
+    by_root: Dict[str, List[dict]] = {}
+    for agg in aggregates.values():
+        root = agg["parent_session_id"] or agg["session_id"]
+        by_root.setdefault(root, []).append(agg)
+
+    index = {}
+    for root, members in by_root.items():
+        if root not in aggregates:
+            continue
+        candidates = [
+            {"owner": agg["session_id"], "task": task}
+            for agg in members
+            for task in agg["task_calls"]
+        ]
+        claimed = set()
+        children = sorted(
+            (agg for agg in members if agg["parent_session_id"]),
+            key=lambda a: a.get("start_time") or "",
+        )
+        for child in children:
+            pool = [c for c in candidates if c["task"]["id"] not in claimed and c["owner"] != child["session_id"]]
+            match = _match_task_call(child, pool)
+            if match:
+                claimed.add(match["task"]["id"])
+            index[child["session_id"]] = {
+                "parent": match["owner"] if match else root,
+                "root": root,
+                "task": {
+                    "tool_use_id": match["task"]["id"],
+                    "description": match["task"]["description"],
+                    "subagent_type": match["task"]["subagent_type"],
+                    "timestamp": match["task"]["timestamp"],
+                } if match else None,
+            }
+    return index
+
+
+def children_map(index: Dict[str, dict]) -> Dict[str, List[str]]:
+    """Invert the index into {parent_id: [child_ids]}."""
+    children: Dict[str, List[str]] = {}
+    for child_id, link in index.items():
+        children.setdefault(link["parent"], []).append(child_id)
+    return children
+
+
+def tree_members(session_id: str, children: Dict[str, List[str]]) -> List[str]:
+    """Return session_id followed by every descendant (depth first)."""
+    members = []
+    stack = [session_id]
+    while stack:
+        node = stack.pop()
+        members.append(node)
+        stack.extend(reversed(sorted(children.get(node, []))))
+    return members
+
+
+def _duration_minutes(start: Optional[str], end: Optional[str]) -> Optional[float]:
+    if not start or not end:
+        return None
+    try:
+        s = datetime.fromisoformat(start.replace("Z", "+00:00"))
+        e = datetime.fromisoformat(end.replace("Z", "+00:00"))
+        return round((e - s).total_seconds() / 60, 1)
+    except (ValueError, TypeError):
+        return None
+
+
+def rollup_tree(session_id: str, aggregates: Dict[str, dict], children: Dict[str, List[str]]) -> dict:
+    """Sum tool calls, errors and tokens across a session and all its sub-agents.
+
+    Duration is the wall-clock span of the whole tree, not the sum of parts,
+    since sub-agents usually run while the parent waits.
+    """
+    totals = {
+        "sessions": 0,
+        "agent_sessions": 0,
+        "tool_calls": 0,
+        "tool_counts": {},
+        "error_count": 0,
+        "input_tokens": 0,
+        "output_tokens": 0,
+        "start_time": None,
+        "end_time": None,
+        "duration_minutes": None,
+    }
+    for member in tree_members(session_id, children):
+        agg = aggregates.get(member)
+        if agg is None:
+            continue
+        totals["sessions"] += 1
+        if agg["is_agent"]:
+            totals["agent_sessions"] += 1
+        totals["tool_calls"] += agg["tool_calls"]
+        totals["error_count"] += agg["error_count"]
+        totals["input_tokens"] += agg["input_tokens"]
+        totals["output_tokens"] += agg["output_tokens"]
+        for tool, count in agg["tool_counts"].items():
+            totals["tool_counts"][tool] = totals["tool_counts"].get(tool, 0) + count
+        if agg["start_time"] and (totals["start_time"] is None or agg["start_time"] < totals["start_time"]):
+            totals["start_time"] = agg["start_time"]
+        if agg["end_time"] and (totals["end_time"] is None or agg["end_time"] > totals["end_time"]):
+            totals["end_time"] = agg["end_time"]
+
+    totals["duration_minutes"] = _duration_minutes(totals["start_time"], totals["end_time"])
+    return totals
+
+
+def build_tree(session_id: str, aggregates: Dict[str, dict], index: Dict[str, dict],
+               children: Dict[str, List[str]]) -> dict:
+    """Return a nested {session_id, task, children} structure for display."""
+    agg = aggregates.get(session_id, {})
+    link = index.get(session_id)
+    return {
+        "session_id": session_id,
+        "is_agent": agg.get("is_agent", False),
+        "task": link["task"] if link else None,
+        "start_time": agg.get("start_time"),
+        "tool_calls": agg.get("tool_calls", 0),
+        "error_count": agg.get("error_count", 0),
+        "children": [
+            build_tree(child, aggregates, index, children)
+            for child in sorted(children.get(session_id, []),
+                                key=lambda c: aggregates.get(c, {}).get("start_time") or "")
+        ],
+    }
+
+
+def load_project_tree(project_dir: Path):
+    """Convenience loader: (aggregates, index, children) for a project directory."""
+    aggregates = load_aggregates(project_dir)
+    index = build_agent_index(aggregates)
+    return aggregates, index, children_map(index)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Link sub-agent sessions to their parents")
+    parser.add_argument("--project", required=True, help="Project name to index")
+    parser.add_argument("--session-id", help="Only show the tree rooted at this session")
+    add_profile_args(parser)
+
+    args = parser.parse_args(argv)
+    configure(args)
+
+    project_dir = find_project_dir(args.project)
+    if project_dir is None:
+        result = {
+            "status": "error",
+            "error": f"Project '{args.project}' not found in ~/.claude/projects/",
+            "project": args.project,
+        }
+        print(json.dumps(result, indent=2))
+        return 1
+
+    aggregates, index, children = load_project_tree(project_dir)
+
+    if args.session_id:
+        if args.session_id not in aggregates:
+            result = {
+                "status": "error",
+                "error": f"Session '{args.session_id}' not found",
+                "session_id": args.session_id,
+            }
+            print(json.dumps(result, indent=2))
+            return 1
+        result = {
+            "status": "success",
+            "project_dir": str(project_dir),
+            "tree": build_tree(args.session_id, aggregates, index, children),
+            "rollup": rollup_tree(args.session_id, aggregates, children),
+        }
+    else:
+        result = {
+            "status": "success",
+            "project_dir": str(project_dir),
+            "total_files": len(aggregates),
+            "agent_files": sum(1 for a in aggregates.values() if a["is_agent"]),
+            "linked_agents": len(index),
+            "links": index,
+        }
+
+    emit_json(result)
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except Exception as e:
+        print(json.dumps({"status": "error", "error": str(e)}), file=sys.stderr)
+        sys.exit(1)
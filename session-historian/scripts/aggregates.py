@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Constant-memory, mergeable building blocks for cross-session summaries.
+
+TDigest approximates a distribution (session durations) with a bounded
+number of centroids; TopK keeps the k largest rows seen. Both merge with
+another instance of themselves and round-trip through to_dict()/from_dict(),
+so a summary can be built per session, cached, shipped back from a worker
+process and combined with any other summary in any order.
+"""
+
+import heapq
+import itertools
+import math
+from typing import List, Optional
+
+
+class TDigest:
+    """Merging t-digest (Dunning) over floats.
+
+    Centroid sizes follow the arcsine scale function, which caps the digest
+    at about ``compression`` / 2 centroids (plus a buffer of unmerged
+    values) however many values are added. Quantiles are exact while every
+    centroid still holds a single value (up to about 60 values with the
+    default compression) and approximate after that, most precise in the
+    tails.
+    """
+
+    def __init__(self, compression: int = 100):
+        self.compression = compression
+        self.centroids: List[list] = []     # [mean, weight], sorted by mean
+        self.buffer: List[float] = []
+        self.count = 0
+        self.total = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def add(self, value: float, weight: float = 1) -> None:
+        self.count += weight
+        self.total += value * weight
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        if weight == 1:
+            self.buffer.append(value)
+        else:
+            self.centroids.append([value, weight])
+            self.centroids.sort()
+        if len(self.buffer) > self.compression * 5:
+            self._compress()
+
+    def merge(self, other: "TDigest") -> "TDigest":
+        if not other.count:
+            return self
+        self.count += other.count
+        self.total += other.total
+        self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = other.max if self.max is None else max(self.max, other.max)
+        self.centroids = sorted(self.centroids + [list(c) for c in other.centroids])
+        self.buffer.extend(other.buffer)
+        self._compress()
+        return self
+
+    def _scale(self, q: float) -> float:
+        return self.compression / (2 * math.pi) * math.asin(2 * min(max(q, 0.0), 1.0) - 1)
+
+    def _compress(self) -> None:
+        points = sorted(self.centroids + [[v, 1] for v in self.buffer])
+        self.buffer = []
+        total = sum(w for _, w in points)
+        merged, before = [], 0.0    # before: weight left of merged[-1]
+        for mean, w in points:
+            if merged:
+                last = merged[-1]
+                # A centroid may span at most one unit of the scale function
+                if self._scale((before + last[1] + w) / total) - self._scale(before / total) <= 1:
+                    last[1] += w
+                    last[0] += (mean - last[0]) * w / last[1]
+                    continue
+                before += last[1]
+            merged.append([mean, w])
+        self.centroids = merged
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Value at quantile ``q`` in [0, 1], interpolated like statistics.median."""
+        if self.buffer:
+            self._compress()
+        if not self.centroids:
+            return None
+        if len(self.centroids) == 1:
+            return self.centroids[0][0]
+
+        # Place each centroid at the centre of the ranks it covers and
+        # interpolate linearly between neighbours (0-based rank space)
+        target = q * (self.count - 1)
+        rank = 0.0
+        prev_rank = prev_mean = None
+        for mean, w in self.centroids:
+            centre = rank + (w - 1) / 2
+            if target <= centre:
+                if prev_rank is None:
+                    return self.min + (mean - self.min) * (target / centre) if centre > 0 else mean
+                return prev_mean + (target - prev_rank) * (mean - prev_mean) / (centre - prev_rank)
+            prev_rank, prev_mean = centre, mean
+            rank += w
+        last = self.count - 1
+        if last > prev_rank:
+            return prev_mean + (self.max - prev_mean) * (target - prev_rank) / (last - prev_rank)
+        return self.max
+
+    def to_dict(self) -> dict:
+        if self.buffer:
+            self._compress()
+        return {"c": self.centroids, "n": self.count, "sum": self.total, "min": self.min, "max": self.max}
+
+    @classmethod
+    def from_dict(cls, data: dict, compression: int = 100) -> "TDigest":
+        digest = cls(compression)
+        digest.centroids = [list(c) for c in data["c"]]
+        digest.count = data["n"]
+        digest.total = data["sum"]
+        digest.min = data["min"]
+        digest.max = data["max"]
+        return digest
+
+
+class TopK:
+    """The ``k`` rows with the largest (score, tiebreak), largest first.
+
+    Rows are JSON-friendly lists or dicts; ``score_index`` and ``tie_index``
+    are the indexes or keys to rank by. Ties in the score fall back to the tiebreak column so
+    the result does not depend on the order rows were added or merged in.
+    """
+
+    def __init__(self, k: int, score_index=0, tie_index=1):
+        self.k = k
+        self.score_index = score_index
+        self.tie_index = tie_index
+        self._heap: List[tuple] = []        # min-heap of (score, tiebreak, seq, row)
+        self._seq = itertools.count()
+
+    def push(self, row: list) -> None:
+        score, tie = row[self.score_index], row[self.tie_index]
+        item = ("" if score is None else score, "" if tie is None else tie, next(self._seq), row)
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, item)
+        elif item[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, item)
+
+    def merge(self, other: "TopK") -> "TopK":
+        for row in other.rows():
+            self.push(row)
+        return self
+
+    def rows(self) -> List[list]:
+        return [item[-1] for item in sorted(self._heap, key=lambda item: item[:2], reverse=True)]
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def to_dict(self) -> list:
+        return self.rows()
+
+    @classmethod
+    def from_dict(cls, rows: list, k: int, score_index=0, tie_index=1) -> "TopK":
+        top = cls(k, score_index, tie_index)
+        for row in rows:
+            top.push(row)
+        return top
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Normalize Bash tool commands to a verb and subcommand.
+
+A command line is tokenized with shlex, split into its simple commands at
+&&, ||, ;, |, & and unquoted newlines, and each simple command is reduced
+to a "head" such as "pytest", "npm run", "git commit", "gh pr" or "docker
+compose". Subshell and brace-group delimiters and heredoc bodies are
+dropped, shell keywords (if, then, do, done, ...) are skipped to reach the
+command they introduce, and commands inside $(...) or backticks are
+reported before the command that uses them. Leading environment
+assignments and wrappers (sudo -u user, env, time, timeout N, ...) are
+skipped, paths are reduced to the program name and `python -m X` counts
+as X.
+
+Usage (library):
+    from command_taxonomy import command_heads
+    command_heads("cd api && FOO=1 python -m pytest -x | tail")  # ["cd", "pytest", "tail"]
+"""
+
+import re
+import shlex
+from typing import List, Optional, Tuple
+
+OPERATORS = {"&&", "||", ";", "|", "&", "|&", ";;"}
+SEPARATOR_CHARS = set(";&|\n")
+
+# Commands that run another command; skipped to reach the real verb
+WRAPPERS = {"sudo", "env", "time", "nohup", "nice", "command", "exec", "builtin", "xargs"}
+
+# Wrappers whose first argument is a value rather than the command
+WRAPPERS_WITH_ARG = {"timeout"}
+
+# Wrapper options that take a value, e.g. `sudo -u bob cmd`
+WRAPPER_OPTIONS_WITH_VALUE = {
+    "sudo": {"-u", "-g", "-h", "-p", "-C", "-D", "-r", "-t", "-U"},
+    "env": {"-u", "--unset", "-C", "--chdir"},
+    "nice": {"-n"},
+    "timeout": {"-s", "--signal", "-k", "--kill-after"},
+    "xargs": {"-I", "-n", "-P", "-L", "-d", "-s", "-a", "-E"},
+}
+
+# Reserved words that precede a command: "then make", "do pytest", "! grep"
+KEYWORDS = {"if", "then", "elif", "else", "fi", "while", "until", "do", "done", "esac", "!", "{", "}"}
+
+# Reserved words that start a construct with no command of its own
+# ("for f in *", "[[ -f x ]]", "function name")
+HEADERS = {"for", "select", "function", "[["}
+
+SUBSTITUTION = re.compile(r"__cmdsubst(\d+)__")
+HEREDOC = re.compile(r"(?<!<)<<-?\s*(['\"]?)([A-Za-z_][A-Za-z0-9_]*)\1")
+
+# Verbs reported together with their first subcommand
+SUBCOMMAND_VERBS = {
+    "apt", "apt-get", "bd", "brew", "bun", "cargo", "deno", "docker", "docker-compose", "gh", "git",
+    "go", "helm", "kubectl", "npm", "pip", "pip3", "pnpm", "poetry", "systemctl", "terraform",
+    "uv", "yarn",
+}
+
+# Options that take a value before the subcommand, e.g. `git -C repo status`
+OPTIONS_WITH_VALUE = {
+    "git": {"-C", "-c", "--git-dir", "--work-tree"},
+    "gh": {"-R", "--repo"},
+    "docker": {"-H", "--host", "--context", "-c", "--config"},
+    "kubectl": {"-n", "--namespace", "--context", "--kubeconfig"},
+    "npm": {"--prefix", "-w", "--workspace"},
+    "yarn": {"--cwd"},
+    "pnpm": {"-C", "--dir", "--filter", "-F"},
+    "cargo": {"--manifest-path"},
+}
+
+PYTHONS = re.compile(r"^python(\d+(\.\d+)?)?$")
+ASSIGNMENT = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*=")
+SUBCOMMAND = re.compile(r"^[a-z][a-z0-9:_-]*$")
+
+
+def split_commands(command: str) -> List[List[str]]:
+    """Tokens of each simple command in ``command``, without redirections.
+
+    Unquoted newlines separate commands like ``;`` does; backslash line
+    continuations do not. Heredoc bodies and case patterns are skipped.
+    Unbalanced quotes (a truncated command) fall back to whitespace
+    splitting.
+    """
+    command = _strip_heredocs(command.replace("\\\n", " "))
+    command, substitutions = _extract_substitutions(command)
+    try:
+        lexer = shlex.shlex(command, posix=True, punctuation_chars=";&|<>\n")
+        lexer.whitespace = " \t\r"
+        lexer.whitespace_split = True
+        lexer.commenters = ""
+        tokens = list(lexer)
+    except ValueError:
+        tokens = command.replace("\n", " ; ").split()
+
+    commands, current = [], []
+
+    def finish():
+        # Substitutions run before the command whose arguments they produce
+        for index in SUBSTITUTION.findall(" ".join(current)):
+            commands.extend(split_commands(substitutions[int(index)]))
+        if current:
+            commands.append(current)
+
+    redirect_target = False
+    case_pattern = False    # expecting a case pattern such as "a)" or "*.py|*.sh)"
+    for token in tokens:
+        if case_pattern and token != "esac":
+            case_pattern = not token.endswith(")")
+            continue
+        case_pattern = False
+        if redirect_target:
+            redirect_target = False
+        elif "<" in token or ">" in token:
+            # Redirections (2>&1, > out.log) and their targets are not arguments
+            redirect_target = set(token) <= set("<>&|")
+        elif token in OPERATORS or (token and set(token) <= SEPARATOR_CHARS):
+            finish()
+            current = []
+            case_pattern = ";;" in token or ";&" in token
+        elif current and current[0] == "case" and token == "in":
+            # "case WORD in" runs nothing; a pattern follows
+            current = []
+            case_pattern = True
+        else:
+            if not current:
+                # Subshells and brace groups: "(cd a && make)", "{ cd a; make; }"
+                token = token.lstrip("({")
+            token = _strip_closing(token)
+            if token:
+                current.append(token)
+    finish()
+    return commands
+
+
+def _strip_heredocs(command: str) -> str:
+    """Drop heredoc bodies: the lines after a ``<<DELIM`` line up to DELIM."""
+    if "<<" not in command:
+        return command
+    lines, delimiters = [], []
+    for line in command.split("\n"):
+        if delimiters:
+            if line.strip() == delimiters[0]:
+                delimiters.pop(0)
+            continue
+        lines.append(line)
+        delimiters = [match.group(2) for match in HEREDOC.finditer(line)]
+    return "\n".join(lines)
+
+
+def _extract_substitutions(command: str) -> Tuple[str, List[str]]:
+    """Replace each $(...) and `...` outside single quotes with a placeholder word.
+
+    Returns the rewritten command and the bodies of the substitutions, so a
+    substitution lexes as one word ("VAR=$(git rev-parse HEAD)") and its own
+    commands can be split separately. Arithmetic $((...)) has no commands
+    and becomes a placeholder with an empty body.
+    """
+    if "$(" not in command and "`" not in command:
+        return command, []
+    out, bodies = [], []
+    in_single = in_double = False
+    i, n = 0, len(command)
+    while i < n:
+        char = command[i]
+        if char == "\\" and not in_single:
+            out.append(command[i:i + 2])
+            i += 2
+            continue
+        if char == "'" and not in_double:
+            in_single = not in_single
+        elif char == '"' and not in_single:
+            in_double = not in_double
+        elif not in_single and (command.startswith("$(", i) or char == "`"):
+            if char == "`":
+                end = command.find("`", i + 1)
+                end = n if end == -1 else end
+                body, i = command[i + 1:end], end + 1
+            else:
+                # Match parentheses only; quotes inside (apostrophes in a heredoc) are not tracked
+                depth, j = 1, i + 2
+                while j < n and depth:
+                    depth += {"(": 1, ")": -1}.get(command[j], 0)
+                    j += 1
+                body = command[i + 2:j - 1] if not depth else command[i + 2:j]
+                if body.startswith("(") and body.endswith(")"):
+                    body = ""
+                i = j
+            out.append(f"__cmdsubst{len(bodies)}__")
+            bodies.append(body)
+            continue
+        out.append(char)
+        i += 1
+    return "".join(out), bodies
+
+
+def _strip_closing(token: str) -> str:
+    """Drop unbalanced trailing ")" and "}" that close a subshell or group."""
+    while token and token[-1] in ")}":
+        opening = "(" if token[-1] == ")" else "{"
+        if token.count(token[-1]) <= token.count(opening):
+            break
+        token = token[:-1]
+    return token
+
+
+def normalize(tokens: List[str]) -> Optional[str]:
+    """Reduce one simple command to its head ("pytest", "git commit", ...)."""
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        if ASSIGNMENT.match(token):
+            i += 1
+        elif token in KEYWORDS:
+            i += 1
+        elif token in HEADERS:
+            return None
+        elif token in WRAPPERS or token in WRAPPERS_WITH_ARG:
+            takes_value = WRAPPER_OPTIONS_WITH_VALUE.get(token, ())
+            i += 1
+            while i < len(tokens) and tokens[i].startswith("-"):
+                i += 2 if tokens[i] in takes_value else 1
+            if token in WRAPPERS_WITH_ARG:
+                i += 1      # the duration
+        else:
+            break
+    if i >= len(tokens):
+        return None
+
+    verb = tokens[i].rsplit("/", 1)[-1]
+    if not verb or verb in ("(", ")", "{", "}") or SUBSTITUTION.fullmatch(verb):
+        return None
+    rest = tokens[i + 1:]
+
+    if PYTHONS.match(verb) and len(rest) >= 2 and rest[0] == "-m":
+        return rest[1].split(".", 1)[0]
+
+    if verb in SUBCOMMAND_VERBS:
+        takes_value = OPTIONS_WITH_VALUE.get(verb, ())
+        j = 0
+        while j < len(rest) and rest[j].startswith("-"):
+            j += 2 if rest[j] in takes_value else 1
+        if j < len(rest) and SUBCOMMAND.match(rest[j]):
+            return f"{verb} {rest[j]}"
+    return verb
+
+
+def command_heads(command: str) -> List[str]:
+    """Heads of every simple command in a Bash command line, in order."""
+    heads = []
+    for tokens in split_commands(command):
+        head = normalize(tokens)
+        if head:
+            heads.append(head)
+    return heads
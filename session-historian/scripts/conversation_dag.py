@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Reconstruct the conversation DAG of a session from uuid/parentUuid links.
+
+Session files are append-only logs, not linear conversations: rewinding or
+editing a prompt leaves an abandoned branch behind, sidechain entries hang
+off the main thread, and compaction starts a new root whose
+logicalParentUuid points back at the pre-compaction thread. Reading the file
+in line order counts all of that. This module builds the DAG in one pass and
+exposes the active path so the other scripts can restrict their stats to it.
+
+Usage:
+    python conversation_dag.py --session-id <uuid>
+
+Output: JSON with active path size, branch points, abandoned entries,
+sidechain subtrees and compaction boundaries.
+"""
+
+import argparse
+import json
+import sys
+from array import array
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from perf import add_profile_args, configure, emit_json, timed
+from session_io import iter_entries, resolve_session_file, session_id_from_path
+
+NO_PARENT = -1
+UNRESOLVED = -2
+
+# Only entries with a uuid (or a summary's leafUuid) are DAG nodes; other
+# lines are skipped before they are decoded.
+DAG_PREFILTER = (b'"uuid"', b'"leafUuid"')
+
+
+@timed("walk")
+def find_session_file(session_id: str) -> Optional[Path]:
+    """Find a session file by its ID across all projects."""
+    claude_projects = Path.home() / ".claude" / "projects"
+
+    if not claude_projects.exists():
+        return None
+
+    for project_dir in claude_projects.iterdir():
+        if not project_dir.is_dir():
+            continue
+
+        session_file = resolve_session_file(project_dir, session_id)
+        if session_file is not None:
+            return session_file
+
+        if not session_id.startswith("agent-"):
+            agent_file = resolve_session_file(project_dir, f"agent-{session_id}")
+            if agent_file is not None:
+                return agent_file
+
+    return None
+
+
+class ConversationDAG:
+    """uuid -> parent links for one session, stored in compact parallel arrays.
+
+    Node ``i`` is the i-th entry with a uuid. ``parent[i]`` is the index of its
+    parent (NO_PARENT for roots), ``line[i]`` its 0-based line number in the
+    file and ``sidechain[i]`` is 1 for sidechain entries. Only the uuid -> index
+    dict holds strings.
+    """
+
+    def __init__(self):
+        self.index: Dict[str, int] = {}
+        self.uuids: List[str] = []
+        self.parent = array("i")
+        self.line = array("I")
+        self.sidechain = bytearray()
+        self.total_lines = 0
+        self.compaction_boundaries: List[dict] = []
+        self.summary_leaves: List[str] = []
+        self.leaf: Optional[int] = None
+
+    def __len__(self) -> int:
+        return len(self.uuids)
+
+    def _add(self, uuid: str, line_no: int, is_sidechain: bool) -> int:
+        idx = len(self.uuids)
+        self.index[uuid] = idx
+        self.uuids.append(uuid)
+        self.parent.append(UNRESOLVED)
+        self.line.append(line_no)
+        self.sidechain.append(1 if is_sidechain else 0)
+        return idx
+
+    def active_path(self) -> List[int]:
+        """Node indexes from the root to the current leaf, oldest first."""
+        path = []
+        node = self.leaf
+        seen = set()
+        while node is not None and node >= 0 and node not in seen:
+            seen.add(node)
+            path.append(node)
+            node = self.parent[node]
+        path.reverse()
+        return path
+
+    def line_mask(self) -> bytearray:
+        """Per-line keep flags: 1 for lines on the active path or without a uuid."""
+        mask = bytearray(b"\x01") * self.total_lines
+        for ln in self.line:
+            mask[ln] = 0
+        for node in self.active_path():
+            mask[self.line[node]] = 1
+        return mask
+
+    def children_counts(self) -> array:
+        """Number of main-thread (non-sidechain) children of each node."""
+        counts = array("I", [0]) * len(self)
+        for i, p in enumerate(self.parent):
+            if p >= 0 and not self.sidechain[i]:
+                counts[p] += 1
+        return counts
+
+    def sidechain_subtrees(self) -> List[dict]:
+        """Group sidechain entries by the first sidechain node of each chain."""
+        roots: Dict[int, dict] = {}
+        root_of = array("i", [NO_PARENT]) * len(self)
+        for i in range(len(self)):
+            if not self.sidechain[i]:
+                continue
+            p = self.parent[i]
+            if p >= 0 and self.sidechain[p] and root_of[p] >= 0:
+                root_of[i] = root_of[p]
+            else:
+                root_of[i] = i
+                roots[i] = {
+                    "root_uuid": self.uuids[i],
+                    "attached_to": self.uuids[p] if p >= 0 else None,
+                    "first_line": self.line[i] + 1,
+                    "entries": 0,
+                }
+            roots[root_of[i]]["entries"] += 1
+        return list(roots.values())
+
+    def describe(self) -> dict:
+        path = self.active_path()
+        on_path = bytearray(len(self))
+        for node in path:
+            on_path[node] = 1
+        counts = self.children_counts()
+        branch_points = [self.uuids[i] for i in range(len(self)) if counts[i] > 1 and not self.sidechain[i]]
+        abandoned = sum(1 for i in range(len(self)) if not on_path[i] and not self.sidechain[i])
+
+        return {
+            "total_lines": self.total_lines,
+            "total_nodes": len(self),
+            "leaf_uuid": self.uuids[self.leaf] if self.leaf is not None else None,
+            "active_path_length": len(path),
+            "branch_points": branch_points,
+            "abandoned_entries": abandoned,
+            "sidechain_entries": sum(self.sidechain),
+            "sidechains": self.sidechain_subtrees(),
+            "compaction_boundaries": self.compaction_boundaries,
+            "summary_leaves": self.summary_leaves,
+        }
+
+
+@timed("process")
+def build_dag(session_file: Path, follow_compaction: bool = True) -> ConversationDAG:
+    """Build the DAG for a session file in a single pass.
+
+    With ``follow_compaction`` a compact_boundary entry is linked to the
+    thread it compacted (via logicalParentUuid), so the active path covers
+    the whole session rather than only the post-compaction tail.
+    """
+    dag = ConversationDAG()
+    pending = []  # (node, parent_uuid) for parents not seen yet
+    last_message = None
+
+    read_stats = {"lines_read": 0}
+    entries = iter_entries(session_file, stats=read_stats, prefilter=DAG_PREFILTER,
+                           with_line_numbers=True)
+    for line_no, entry in entries:
+        entry_type = entry.get("type")
+        if entry_type == "summary":
+            if entry.get("leafUuid"):
+                dag.summary_leaves.append(entry["leafUuid"])
+            continue
+
+        uuid = entry.get("uuid")
+        if not uuid or uuid in dag.index:
+            continue
+
+        is_sidechain = bool(entry.get("isSidechain"))
+        node = dag._add(uuid, line_no, is_sidechain)
+
+        parent_uuid = entry.get("parentUuid")
+        if entry_type == "system" and entry.get("subtype") == "compact_boundary":
+            logical = entry.get("logicalParentUuid")
+            dag.compaction_boundaries.append({
+                "uuid": uuid,
+                "line": line_no + 1,
+                "timestamp": entry.get("timestamp"),
+                "logical_parent_uuid": logical,
+                "trigger": (entry.get("compactMetadata") or {}).get("trigger"),
+            })
+            if parent_uuid is None and follow_compaction:
+                parent_uuid = logical
+
+        if parent_uuid is None:
+            dag.parent[node] = NO_PARENT
+        elif parent_uuid in dag.index:
+            dag.parent[node] = dag.index[parent_uuid]
+        else:
+            pending.append((node, parent_uuid))
+
+        if entry_type in ("user", "assistant", "system"):
+            last_message = node
+            if not is_sidechain:
+                dag.leaf = node
+
+    dag.total_lines = read_stats["lines_read"]
+
+    for node, parent_uuid in pending:
+        dag.parent[node] = dag.index.get(parent_uuid, NO_PARENT)
+
+    # Sub-agent transcripts are sidechain from start to finish
+    if dag.leaf is None:
+        dag.leaf = last_message
+
+    return dag
+
+
+def active_line_mask(session_file: Path) -> bytearray:
+    """Convenience wrapper: build the DAG and return its active-path line mask."""
+    return build_dag(session_file).line_mask()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Reconstruct the conversation DAG of a session")
+    parser.add_argument("--session-id", required=True, help="Session UUID to analyze")
+    parser.add_argument("--no-follow-compaction", action="store_true",
+                        help="Stop the active path at the latest compaction boundary")
+    add_profile_args(parser)
+
+    args = parser.parse_args(argv)
+    configure(args)
+
+    session_file = find_session_file(args.session_id)
+
+    if session_file is None:
+        result = {
+            "status": "error",
+            "error": f"Session '{args.session_id}' not found",
+            "session_id": args.session_id
+        }
+        print(json.dumps(result, indent=2))
+        return 1
+
+    dag = build_dag(session_file, follow_compaction=not args.no_follow_compaction)
+    result = {
+        "status": "success",
+        "session_id": session_id_from_path(session_file),
+        "file_path": str(session_file),
+        **dag.describe(),
+    }
+
+    emit_json(result)
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except Exception as e:
+        print(json.dumps({"status": "error", "error": str(e)}), file=sys.stderr)
+        sys.exit(1)
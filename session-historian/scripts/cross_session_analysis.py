@@ -6,26 +6,44 @@ Usage:
     python cross_session_analysis.py --project claude-life-dev --days 7 --focus failures
     python cross_session_analysis.py --project claude-life-dev --days 14 --focus tools
     python cross_session_analysis.py --project claude-life-dev --days 7 --focus duration
+    python cross_session_analysis.py --project claude-life-dev --days 7 --focus tools --tree
+    python cross_session_analysis.py --all-projects --days 30 --focus failures
+    python cross_session_analysis.py --project claude-life-dev --days 90 --focus trends
+    python cross_session_analysis.py --project 'api-*' --days 7 --focus tools --workers 8
 
 Focus options:
     failures  - Analyze failure patterns and success rates
     tools     - Analyze tool usage patterns
     duration  - Analyze session duration patterns
-    commands  - Analyze command usage patterns
+    commands  - Analyze Bash commands by verb/subcommand: frequency, failure rate, latency
+    trends    - Daily time series (sessions, errors, tool calls, tokens, durations)
+                from the per-day rollup table
 
 Output: Statistics on success rates, common patterns, failure hotspots.
+With --all-projects or a project glob, "analysis" covers every matched
+project and "by_project" holds the same analysis for each project.
 """
 
 import argparse
 import json
-import statistics
 import sys
-from collections import Counter, defaultdict
+from collections import Counter
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional
 
+from aggregates import TDigest, TopK
+from command_taxonomy import command_heads
+from perf import PERF, add_profile_args, configure, emit_json, timed
+from session_cache import file_signature, load_json_cache, save_json_cache
+from session_io import (iter_entries, is_project_glob, map_projects, match_project_dirs, session_files,
+                        session_id_from_path)
 
+# Bump when Aggregate.to_dict() changes shape; cached partials and rollups are rebuilt
+PARTIALS_VERSION = 3
+
+
+@timed("walk")
 def find_project_dir(project_name: str) -> Optional[Path]:
     """Find the project directory in ~/.claude/projects/"""
     claude_projects = Path.home() / ".claude" / "projects"
@@ -49,70 +67,94 @@ def find_project_dir(project_name: str) -> Optional[Path]:
     return None
 
 
+@timed("process")
 def analyze_session(session_file: Path) -> dict:
     """Analyze a single session for cross-session analysis."""
     analysis = {
-        "session_id": session_file.stem,
+        "session_id": session_id_from_path(session_file),
         "start_time": None,
         "end_time": None,
         "duration_minutes": None,
         "tool_counts": Counter(),
         "error_count": 0,
         "message_count": 0,
-        "commands": [],
+        "command_stats": {},  # head -> [calls, failed calls, latencies in ms]
         "has_errors": False,
         "git_branch": None,
+        "input_tokens": 0,
+        "output_tokens": 0,
         "parse_warnings": 0,  # Track skipped lines
         "parse_error": None,  # Track file-level errors
     }
 
+    seen_message_ids = set()
+    # Bash tool_use id -> (command heads, timestamp); dropped when its result arrives
+    pending_commands = {}
+
     try:
-        with open(session_file, 'r') as f:
-            for line in f:
-                if not line.strip():
-                    continue
-                try:
-                    entry = json.loads(line)
-                except json.JSONDecodeError:
-                    analysis["parse_warnings"] += 1
-                    continue
-
-                entry_type = entry.get("type")
-                timestamp = entry.get("timestamp")
-
-                if timestamp:
-                    if analysis["start_time"] is None:
-                        analysis["start_time"] = timestamp
-                    analysis["end_time"] = timestamp
-
-                if entry_type == "user":
-                    analysis["message_count"] += 1
-                    if analysis["git_branch"] is None:
-                        analysis["git_branch"] = entry.get("gitBranch")
-
-                    content = entry.get("message", {}).get("content", [])
-                    if isinstance(content, list):
-                        for block in content:
-                            if block.get("type") == "tool_result":
-                                result = str(block.get("content", "")).lower()
-                                if "error" in result or "failed" in result:
-                                    analysis["error_count"] += 1
-                                    analysis["has_errors"] = True
-
-                elif entry_type == "assistant":
-                    analysis["message_count"] += 1
-                    content = entry.get("message", {}).get("content", [])
-                    if isinstance(content, list):
-                        for block in content:
-                            if block.get("type") == "tool_use":
-                                tool_name = block.get("name", "unknown")
-                                analysis["tool_counts"][tool_name] += 1
-
-                                if tool_name == "Bash":
-                                    cmd = block.get("input", {}).get("command", "")
-                                    # Extract slash commands or git/gh commands
-                                    if cmd.startswith("/") or cmd.startswith("gh ") or cmd.startswith("git "):
-                                        analysis["commands"].append(cmd[:100])
+        for entry in iter_entries(session_file, stats=analysis):
+            entry_type = entry.get("type")
+            timestamp = entry.get("timestamp")
+
+            if timestamp:
+                if analysis["start_time"] is None:
+                    analysis["start_time"] = timestamp
+                analysis["end_time"] = timestamp
+
+            if entry_type == "user":
+                analysis["message_count"] += 1
+                if analysis["git_branch"] is None:
+                    analysis["git_branch"] = entry.get("gitBranch")
+
+                content = entry.get("message", {}).get("content", [])
+                if isinstance(content, list):
+                    for block in content:
+                        if block.get("type") == "tool_result":
+                            result = str(block.get("content", "")).lower()
+                            failed = "error" in result or "failed" in result
+                            if failed:
+                                analysis["error_count"] += 1
+                                analysis["has_errors"] = True
+
+                            pending = pending_commands.pop(block.get("tool_use_id"), None)
+                            if pending is not None:
+                                heads, started = pending
+                                latency = elapsed_ms(started, timestamp)
+                                for head in heads:
+                                    stats = analysis["command_stats"][head]
+                                    stats[1] += failed or block.get("is_error") is True
+                                    if latency is not None:
+                                        stats[2].append(latency)
+
+            elif entry_type == "assistant":
+                analysis["message_count"] += 1
+                message = entry.get("message", {})
+
+                # One API message is split across several entries that all
+                # repeat the same usage block; count it once.
+                usage = message.get("usage")
+                message_id = message.get("id")
+                if usage and message_id not in seen_message_ids:
+                    if message_id:
+                        seen_message_ids.add(message_id)
+                    analysis["input_tokens"] += usage.get("input_tokens", 0) or 0
+                    analysis["output_tokens"] += usage.get("output_tokens", 0) or 0
+
+                content = message.get("content", [])
+                if isinstance(content, list):
+                    for block in content:
+                        if block.get("type") == "tool_use":
+                            tool_name = block.get("name", "unknown")
+                            analysis["tool_counts"][tool_name] += 1
+
+                            if tool_name == "Bash":
+                                cmd = block.get("input", {}).get("command", "")
+                                # Each head counts once per call, e.g. "cd api && pytest" -> cd, pytest
+                                heads = list(dict.fromkeys(command_heads(cmd)))
+                                for head in heads:
+                                    analysis["command_stats"].setdefault(head, [0, 0, []])[0] += 1
+                                if heads and block.get("id"):
+                                    pending_commands[block["id"]] = (heads, timestamp)
 
         # Calculate duration
         if analysis["start_time"] and analysis["end_time"]:
@@ -129,175 +171,594 @@ def analyze_session(session_file: Path) -> dict:
     return analysis
 
 
-def analyze_failures(sessions: List[dict]) -> dict:
-    """Analyze failure patterns across sessions."""
-    total = len(sessions)
-    with_errors = sum(1 for s in sessions if s["has_errors"])
-    error_rate = with_errors / total if total > 0 else 0
-
-    # Sessions with most errors
-    error_sessions = sorted(
-        [s for s in sessions if s["error_count"] > 0],
-        key=lambda x: x["error_count"],
-        reverse=True
-    )[:10]
-
-    # Error distribution by branch
-    branch_errors = defaultdict(lambda: {"total": 0, "with_errors": 0})
+def merge_agent_trees(sessions: List[dict], index: dict) -> List[dict]:
+    """Fold sub-agent analyses into the analysis of their root session.
+
+    Agents whose root session is outside the analyzed set stay as their own unit.
+    """
+    by_id = {s["session_id"]: s for s in sessions}
+    merged = []
     for s in sessions:
-        branch = s["git_branch"] or "unknown"
-        branch_errors[branch]["total"] += 1
+        link = index.get(s["session_id"])
+        root = by_id.get(link["root"]) if link else None
+        if root is None or root is s:
+            s.setdefault("agent_sessions", 0)
+            merged.append(s)
+            continue
+
+        root["agent_sessions"] = root.get("agent_sessions", 0) + 1
+        root["tool_counts"].update(s["tool_counts"])
+        root["error_count"] += s["error_count"]
+        root["has_errors"] = root["has_errors"] or s["has_errors"]
+        root["message_count"] += s["message_count"]
+        for head, (calls, failures, latencies) in s["command_stats"].items():
+            stats = root["command_stats"].setdefault(head, [0, 0, []])
+            stats[0] += calls
+            stats[1] += failures
+            stats[2].extend(latencies)
+        root["input_tokens"] += s["input_tokens"]
+        root["output_tokens"] += s["output_tokens"]
+        root["parse_warnings"] += s["parse_warnings"]
+        if s["start_time"] and (not root["start_time"] or s["start_time"] < root["start_time"]):
+            root["start_time"] = s["start_time"]
+        if s["end_time"] and (root["end_time"] is None or s["end_time"] > root["end_time"]):
+            root["end_time"] = s["end_time"]
+
+    for s in merged:
+        if s.get("agent_sessions"):
+            try:
+                start = datetime.fromisoformat(s["start_time"].replace("Z", "+00:00"))
+                end = datetime.fromisoformat(s["end_time"].replace("Z", "+00:00"))
+                s["duration_minutes"] = round((end - start).total_seconds() / 60, 1)
+            except (ValueError, TypeError, AttributeError):
+                pass
+    return merged
+
+
+class Aggregate:
+    """Mergeable summary of analyzed sessions, enough to render every focus.
+
+    Each session is folded in with add(); aggregates of disjoint session sets
+    (sessions, projects, worker processes, cached partials) combine with
+    merge() in any order. Memory is bounded: counters keyed by branch, tool
+    and command, a t-digest of durations and the top sessions by errors.
+    """
+
+    TOP_SESSIONS = 10
+
+    def __init__(self):
+        self.sessions = 0
+        self.sessions_with_errors = 0
+        self.errors = 0
+        self.tokens = Counter()             # "input" / "output"
+        self.branches = {}                  # branch -> [sessions, sessions with errors]
+        self.worst = TopK(self.TOP_SESSIONS)  # [error_count, session_id, branch]
+        self.tool_calls = Counter()
+        self.sessions_using = Counter()
+        self.durations = TDigest()
+        self.duration_buckets = Counter()
+        self.commands = {}                  # head -> [calls, failed calls, latency TDigest]
+        self.sessions_with_commands = 0
+
+    def add(self, s: dict) -> None:
+        self.sessions += 1
+        branch = self.branches.setdefault(s["git_branch"] or "unknown", [0, 0])
+        branch[0] += 1
         if s["has_errors"]:
-            branch_errors[branch]["with_errors"] += 1
-
-    branch_analysis = [
-        {
-            "branch": branch,
-            "total_sessions": data["total"],
-            "sessions_with_errors": data["with_errors"],
-            "error_rate": round(data["with_errors"] / data["total"], 2) if data["total"] > 0 else 0,
+            self.sessions_with_errors += 1
+            branch[1] += 1
+        self.errors += s["error_count"]
+        self.tokens.update({"input": s.get("input_tokens", 0), "output": s.get("output_tokens", 0)})
+        if s["error_count"] > 0:
+            self.worst.push([s["error_count"], s["session_id"], s["git_branch"]])
+
+        self.tool_calls.update(s["tool_counts"])
+        self.sessions_using.update(s["tool_counts"].keys())
+
+        if s["duration_minutes"] is not None:
+            self.durations.add(s["duration_minutes"])
+            self.duration_buckets[duration_bucket(s["duration_minutes"])] += 1
+
+        if s["command_stats"]:
+            self.sessions_with_commands += 1
+        for head, (calls, failures, latencies) in s["command_stats"].items():
+            stats = self.commands.setdefault(head, [0, 0, TDigest()])
+            stats[0] += calls
+            stats[1] += failures
+            for latency in latencies:
+                stats[2].add(latency)
+
+    def merge(self, other: "Aggregate") -> "Aggregate":
+        self.sessions += other.sessions
+        self.sessions_with_errors += other.sessions_with_errors
+        self.errors += other.errors
+        self.tokens.update(other.tokens)
+        for branch, (total, with_errors) in other.branches.items():
+            mine = self.branches.setdefault(branch, [0, 0])
+            mine[0] += total
+            mine[1] += with_errors
+        self.worst.merge(other.worst)
+        self.tool_calls.update(other.tool_calls)
+        self.sessions_using.update(other.sessions_using)
+        self.durations.merge(other.durations)
+        self.duration_buckets.update(other.duration_buckets)
+        for head, (calls, failures, latency) in other.commands.items():
+            stats = self.commands.setdefault(head, [0, 0, TDigest()])
+            stats[0] += calls
+            stats[1] += failures
+            stats[2].merge(latency)
+        self.sessions_with_commands += other.sessions_with_commands
+        return self
+
+    @classmethod
+    def from_sessions(cls, sessions: List[dict]) -> "Aggregate":
+        agg = cls()
+        for s in sessions:
+            agg.add(s)
+        return agg
+
+    def to_dict(self) -> dict:
+        return {
+            "sessions": self.sessions,
+            "sessions_with_errors": self.sessions_with_errors,
+            "errors": self.errors,
+            "tokens": dict(self.tokens),
+            "branches": self.branches,
+            "worst": self.worst.to_dict(),
+            "tool_calls": dict(self.tool_calls),
+            "sessions_using": dict(self.sessions_using),
+            "durations": self.durations.to_dict(),
+            "duration_buckets": dict(self.duration_buckets),
+            "commands": {head: [calls, failures, latency.to_dict()]
+                         for head, (calls, failures, latency) in self.commands.items()},
+            "sessions_with_commands": self.sessions_with_commands,
         }
-        for branch, data in sorted(branch_errors.items(), key=lambda x: x[1]["with_errors"], reverse=True)[:10]
-    ]
 
-    return {
-        "total_sessions": total,
-        "sessions_with_errors": with_errors,
-        "error_rate": round(error_rate, 2),
-        "worst_sessions": [
-            {"session_id": s["session_id"], "error_count": s["error_count"], "branch": s["git_branch"]}
-            for s in error_sessions
-        ],
-        "error_by_branch": branch_analysis,
-    }
+    @classmethod
+    def from_dict(cls, data: dict) -> "Aggregate":
+        agg = cls()
+        agg.sessions = data["sessions"]
+        agg.sessions_with_errors = data["sessions_with_errors"]
+        agg.errors = data["errors"]
+        agg.tokens = Counter(data["tokens"])
+        agg.branches = {branch: list(counts) for branch, counts in data["branches"].items()}
+        agg.worst = TopK.from_dict(data["worst"], cls.TOP_SESSIONS)
+        agg.tool_calls = Counter(data["tool_calls"])
+        agg.sessions_using = Counter(data["sessions_using"])
+        agg.durations = TDigest.from_dict(data["durations"])
+        agg.duration_buckets = Counter(data["duration_buckets"])
+        agg.commands = {head: [calls, failures, TDigest.from_dict(latency)]
+                        for head, (calls, failures, latency) in data["commands"].items()}
+        agg.sessions_with_commands = data["sessions_with_commands"]
+        return agg
+
+    def render(self, focus: str) -> dict:
+        return {
+            "failures": self.failures,
+            "tools": self.tools,
+            "duration": self.duration,
+            "commands": self.command_usage,
+        }[focus]()
+
+    def failures(self) -> dict:
+        """Failure patterns: error rate, worst sessions, error rate by branch."""
+        total = self.sessions
+        branch_analysis = [
+            {
+                "branch": branch,
+                "total_sessions": n,
+                "sessions_with_errors": with_errors,
+                "error_rate": round(with_errors / n, 2) if n > 0 else 0,
+            }
+            for branch, (n, with_errors) in sorted(self.branches.items(), key=lambda x: x[1][1], reverse=True)[:10]
+        ]
+
+        return {
+            "total_sessions": total,
+            "sessions_with_errors": self.sessions_with_errors,
+            "error_rate": round(self.sessions_with_errors / total, 2) if total > 0 else 0,
+            "worst_sessions": [
+                {"session_id": session_id, "error_count": count, "branch": branch}
+                for count, session_id, branch in self.worst.rows()
+            ],
+            "error_by_branch": branch_analysis,
+        }
 
+    def tools(self) -> dict:
+        """Tool usage: calls, sessions using each tool, usage rate."""
+        total_sessions = self.sessions
+        tool_analysis = [
+            {
+                "tool": tool,
+                "total_calls": count,
+                "sessions_using": self.sessions_using[tool],
+                "usage_rate": round(self.sessions_using[tool] / total_sessions, 2) if total_sessions > 0 else 0,
+                "avg_calls_per_session": round(count / self.sessions_using[tool], 1) if self.sessions_using[tool] > 0 else 0,
+            }
+            for tool, count in self.tool_calls.most_common(20)
+        ]
+
+        return {
+            "total_sessions": total_sessions,
+            "total_tool_calls": sum(self.tool_calls.values()),
+            "unique_tools": len(self.tool_calls),
+            "tool_usage": tool_analysis,
+        }
 
-def analyze_tools(sessions: List[dict]) -> dict:
-    """Analyze tool usage patterns across sessions."""
-    total_tool_counts = Counter()
-    sessions_using_tool = defaultdict(int)
+    def duration(self) -> dict:
+        """Duration distribution: min/max/avg/median/p90 and buckets."""
+        durations = self.durations
+        total = durations.count
+
+        if not total:
+            return {"error": "No duration data available"}
+
+        # Exact for small windows, t-digest estimates beyond that
+        percentile_90 = round(durations.quantile(0.9), 1) if total >= 10 else None
+
+        return {
+            "total_sessions": total,
+            "min_duration": durations.min,
+            "max_duration": durations.max,
+            "avg_duration": round(durations.total / total, 1),
+            "median_duration": round(durations.quantile(0.5), 1),
+            "percentile_90": percentile_90,
+            "duration_buckets": {bucket: self.duration_buckets.get(bucket, 0) for bucket in DURATION_BUCKETS},
+        }
 
-    for s in sessions:
-        for tool, count in s["tool_counts"].items():
-            total_tool_counts[tool] += count
-            sessions_using_tool[tool] += 1
-
-    total_sessions = len(sessions)
-    tool_analysis = [
-        {
-            "tool": tool,
-            "total_calls": count,
-            "sessions_using": sessions_using_tool[tool],
-            "usage_rate": round(sessions_using_tool[tool] / total_sessions, 2) if total_sessions > 0 else 0,
-            "avg_calls_per_session": round(count / sessions_using_tool[tool], 1) if sessions_using_tool[tool] > 0 else 0,
+    def command_usage(self) -> dict:
+        """Bash command frequency, failure rate and latency per command head."""
+        top = sorted(self.commands.items(), key=lambda item: (-item[1][0], item[0]))[:20]
+        return {
+            "total_sessions": self.sessions,
+            "sessions_with_commands": self.sessions_with_commands,
+            "command_frequency": [
+                {
+                    "command": head,
+                    "count": calls,
+                    "failures": failures,
+                    "failure_rate": round(failures / calls, 2) if calls else 0,
+                    "median_latency_ms": round(latency.quantile(0.5)) if latency.count else None,
+                    "p90_latency_ms": round(latency.quantile(0.9)) if latency.count else None,
+                }
+                for head, (calls, failures, latency) in top
+            ],
         }
-        for tool, count in total_tool_counts.most_common(20)
-    ]
 
-    return {
-        "total_sessions": total_sessions,
-        "total_tool_calls": sum(total_tool_counts.values()),
-        "unique_tools": len(total_tool_counts),
-        "tool_usage": tool_analysis,
-    }
+
+DURATION_BUCKETS = ["under_1min", "1_to_5min", "5_to_15min", "15_to_30min", "30_to_60min", "over_60min"]
+
+
+def duration_bucket(minutes: float) -> str:
+    if minutes < 1:
+        return "under_1min"
+    if minutes < 5:
+        return "1_to_5min"
+    if minutes < 15:
+        return "5_to_15min"
+    if minutes < 30:
+        return "15_to_30min"
+    if minutes < 60:
+        return "30_to_60min"
+    return "over_60min"
+
+
+def elapsed_ms(start: Optional[str], end: Optional[str]) -> Optional[int]:
+    """Milliseconds between two entry timestamps, or None if either is missing."""
+    if not start or not end:
+        return None
+    try:
+        delta = (datetime.fromisoformat(end.replace("Z", "+00:00"))
+                 - datetime.fromisoformat(start.replace("Z", "+00:00")))
+    except (ValueError, TypeError):
+        return None
+    return max(0, round(delta.total_seconds() * 1000))
+
+
+def analyze_failures(sessions: List[dict]) -> dict:
+    """Analyze failure patterns across sessions."""
+    return Aggregate.from_sessions(sessions).failures()
+
+
+def analyze_tools(sessions: List[dict]) -> dict:
+    """Analyze tool usage patterns across sessions."""
+    return Aggregate.from_sessions(sessions).tools()
 
 
 def analyze_duration(sessions: List[dict]) -> dict:
     """Analyze session duration patterns."""
-    durations = [s["duration_minutes"] for s in sessions if s["duration_minutes"] is not None]
-
-    if not durations:
-        return {"error": "No duration data available"}
-
-    durations.sort()
-    total = len(durations)
-
-    # Bucket sessions by duration
-    buckets = {
-        "under_1min": 0,
-        "1_to_5min": 0,
-        "5_to_15min": 0,
-        "15_to_30min": 0,
-        "30_to_60min": 0,
-        "over_60min": 0,
-    }
+    return Aggregate.from_sessions(sessions).duration()
 
-    for d in durations:
-        if d < 1:
-            buckets["under_1min"] += 1
-        elif d < 5:
-            buckets["1_to_5min"] += 1
-        elif d < 15:
-            buckets["5_to_15min"] += 1
-        elif d < 30:
-            buckets["15_to_30min"] += 1
-        elif d < 60:
-            buckets["30_to_60min"] += 1
-        else:
-            buckets["over_60min"] += 1
-
-    # Use statistics module for proper median calculation
-    median = statistics.median(durations)
-
-    # Proper 90th percentile calculation
-    percentile_90 = None
-    if total >= 10:
-        # Use linear interpolation for percentile
-        idx = 0.9 * (total - 1)
-        lower = int(idx)
-        upper = lower + 1
-        if upper < total:
-            percentile_90 = round(durations[lower] + (idx - lower) * (durations[upper] - durations[lower]), 1)
+
+def analyze_commands(sessions: List[dict]) -> dict:
+    """Analyze command usage patterns."""
+    return Aggregate.from_sessions(sessions).command_usage()
+
+
+def session_partial(session_file: Path) -> dict:
+    """Cacheable per-session result: start time and its one-session Aggregate."""
+    analysis = analyze_session(session_file)
+    if not analysis["start_time"]:  # Only include sessions with data
+        return {"start": None, "agg": None}
+    agg = Aggregate()
+    agg.add(analysis)
+    return {"start": analysis["start_time"], "agg": agg.to_dict()}
+
+
+def load_partials(project_dir: Path, cutoff: Optional[datetime] = None,
+                  use_cache: bool = True) -> Dict[str, dict]:
+    """{file name: partial} for sessions modified since ``cutoff`` (all without one).
+
+    Only changed files are re-parsed. Cached partials of older sessions are
+    kept, so a wider window later on is still answered without re-parsing.
+    """
+    cache_name = f"partials/{project_dir.name}.json"
+    cached = load_json_cache(cache_name) if use_cache else None
+    cached = cached["files"] if cached and cached.get("partials_version") == PARTIALS_VERSION else {}
+    cutoff_ts = cutoff.timestamp() if cutoff else 0
+
+    files = {}
+    partials = {}
+    for session_file in session_files(project_dir):
+        try:
+            sig = file_signature(session_file)
+        except OSError:
+            continue
+        hit = cached.get(session_file.name)
+        if sig[1] / 1e9 < cutoff_ts:
+            if hit:
+                files[session_file.name] = hit
+            continue
+        if hit and hit.get("sig") == sig:
+            PERF.count("cache_hits")
+            partial = hit["partial"]
         else:
-            percentile_90 = durations[lower]
+            PERF.count("cache_misses")
+            try:
+                partial = session_partial(session_file)
+            except OSError:
+                continue
+        files[session_file.name] = {"sig": sig, "partial": partial}
+        partials[session_file.name] = partial
+
+    if use_cache and files != cached:
+        save_json_cache(cache_name, {"partials_version": PARTIALS_VERSION, "files": files})
+
+    return partials
+
+
+def load_daily_rollups(project_dir: Path, use_cache: bool = True) -> Dict[str, Aggregate]:
+    """{start date (UTC): Aggregate of the sessions that started that day} for a project.
+
+    The rollup table lives in rollups/<project>.json together with the
+    signature and day of every session file. When nothing changed it is
+    returned without opening the partials; otherwise only the days that
+    gained, lost or changed a session are re-merged from their partials.
+    """
+    cache_name = f"rollups/{project_dir.name}.json"
+    cached = load_json_cache(cache_name) if use_cache else None
+    if not cached or cached.get("partials_version") != PARTIALS_VERSION:
+        cached = {"files": {}, "days": {}}
+    files = dict(cached["files"])          # file name -> {"sig": ..., "day": ...}
+    days = dict(cached["days"])            # day -> Aggregate.to_dict()
+
+    sigs = {}
+    for session_file in session_files(project_dir):
+        try:
+            sigs[session_file.name] = file_signature(session_file)
+        except OSError:
+            continue
 
+    stale = set()
+    for name in [name for name in files if name not in sigs]:
+        stale.add(files.pop(name)["day"])
+    changed = [name for name, sig in sigs.items() if files.get(name, {}).get("sig") != sig]
+
+    if changed:
+        PERF.count("cache_misses")
+        partials = load_partials(project_dir, use_cache=use_cache)
+        for name in changed:
+            if name in files:
+                stale.add(files[name]["day"])
+            partial = partials.get(name)
+            if partial is None:
+                files.pop(name, None)
+                continue
+            day = partial["start"][:10] if partial["start"] else None
+            files[name] = {"sig": sigs[name], "day": day}
+            stale.add(day)
+
+        stale.discard(None)
+        for day in stale:
+            members = [partials[name]["agg"] for name, info in files.items() if info["day"] == day]
+            if members:
+                agg = Aggregate()
+                for member in members:
+                    agg.merge(Aggregate.from_dict(member))
+                days[day] = agg.to_dict()
+            else:
+                days.pop(day, None)
+    else:
+        PERF.count("cache_hits")
+
+    if use_cache and (files != cached["files"] or days != cached["days"]):
+        save_json_cache(cache_name, {"partials_version": PARTIALS_VERSION, "files": files, "days": days})
+
+    return {day: Aggregate.from_dict(data) for day, data in days.items()}
+
+
+def project_trends(project_dir: Path, cutoff: datetime) -> Dict[str, Aggregate]:
+    """Daily rollups of ``project_dir`` from the day of ``cutoff`` on (worker entry point)."""
+    first_day = cutoff.date().isoformat()
+    return {day: agg for day, agg in load_daily_rollups(project_dir).items() if day >= first_day}
+
+
+def render_trends(rollups: Dict[str, Aggregate], cutoff: datetime) -> dict:
+    """Daily time series from ``cutoff`` to today; days without sessions are zero-filled."""
+    series = []
+    day = cutoff.date()
+    today = datetime.now(timezone.utc).date()
+    while day <= today:
+        agg = rollups.get(day.isoformat()) or Aggregate()
+        durations = agg.durations
+        series.append({
+            "date": day.isoformat(),
+            "sessions": agg.sessions,
+            "sessions_with_errors": agg.sessions_with_errors,
+            "error_rate": round(agg.sessions_with_errors / agg.sessions, 2) if agg.sessions else 0,
+            "errors": agg.errors,
+            "tool_calls": sum(agg.tool_calls.values()),
+            "input_tokens": agg.tokens["input"],
+            "output_tokens": agg.tokens["output"],
+            "median_duration": round(durations.quantile(0.5), 1) if durations.count else None,
+            "top_tools": [{"tool": tool, "calls": n} for tool, n in agg.tool_calls.most_common(5)],
+            "branches": {
+                branch: {"sessions": n, "sessions_with_errors": with_errors}
+                for branch, (n, with_errors) in sorted(agg.branches.items())
+            },
+        })
+        day += timedelta(days=1)
+
+    total = Aggregate()
+    for agg in rollups.values():
+        total.merge(agg)
     return {
-        "total_sessions": total,
-        "min_duration": min(durations),
-        "max_duration": max(durations),
-        "avg_duration": round(sum(durations) / total, 1),
-        "median_duration": round(median, 1),
-        "percentile_90": percentile_90,
-        "duration_buckets": buckets,
+        "total_sessions": total.sessions,
+        "sessions_with_errors": total.sessions_with_errors,
+        "error_rate": round(total.sessions_with_errors / total.sessions, 2) if total.sessions else 0,
+        "total_tool_calls": sum(total.tool_calls.values()),
+        "input_tokens": total.tokens["input"],
+        "output_tokens": total.tokens["output"],
+        "daily": series,
     }
 
 
-def analyze_commands(sessions: List[dict]) -> dict:
-    """Analyze command usage patterns."""
-    command_counts = Counter()
-    for s in sessions:
-        for cmd in s["commands"]:
-            # Extract the base command
-            if cmd.startswith("/"):
-                base = cmd.split()[0] if " " in cmd else cmd
-                command_counts[base] += 1
-            elif "gh pr" in cmd:
-                command_counts["gh pr"] += 1
-            elif "gh issue" in cmd:
-                command_counts["gh issue"] += 1
-            elif "git " in cmd:
-                parts = cmd.split()
-                if len(parts) >= 2:
-                    command_counts[f"git {parts[1]}"] += 1
+def analyze_project(project_dir: Path, cutoff: datetime, tree: bool = False) -> Aggregate:
+    """Aggregate every session in ``project_dir`` modified since ``cutoff``.
+
+    Runs in a worker process for --all-projects and project globs. Without
+    --tree the result is merged from cached per-session partials; with it,
+    the project's sessions are analyzed afresh so sub-agents can be merged
+    into their roots first.
+    """
+    agg = Aggregate()
+    if not tree:
+        for partial in load_partials(project_dir, cutoff).values():
+            if partial["agg"] is not None:
+                agg.merge(Aggregate.from_dict(partial["agg"]))
+        return agg
+
+    cutoff_ts = cutoff.timestamp()
+    pending = []
+    for session_file in session_files(project_dir):
+        try:
+            if session_file.stat().st_mtime < cutoff_ts:
+                continue
+        except OSError:
+            continue
 
-    return {
-        "total_sessions": len(sessions),
-        "sessions_with_commands": sum(1 for s in sessions if s["commands"]),
-        "command_frequency": [
-            {"command": cmd, "count": count}
-            for cmd, count in command_counts.most_common(20)
-        ],
+        analysis = analyze_session(session_file)
+        if analysis["start_time"]:  # Only include sessions with data
+            pending.append(analysis)
+
+    if pending:
+        from agent_tree import build_agent_index, load_aggregates
+
+        for analysis in merge_agent_trees(pending, build_agent_index(load_aggregates(project_dir))):
+            agg.add(analysis)
+    return agg
+
+
+def analyze_projects(args, project_dirs: List[Path]) -> int:
+    """--all-projects / project glob: one pass over every project, per project and global results."""
+    cutoff = datetime.now(timezone.utc) - timedelta(days=args.days)
+
+    trends = args.focus == "trends"
+    if trends:
+        worker, worker_args = project_trends, (cutoff,)
+    else:
+        worker, worker_args = analyze_project, (cutoff, args.tree)
+
+    total = Aggregate()
+    daily = {}
+    by_project = []
+    for project_dir, result in map_projects(worker, project_dirs, worker_args, args.workers):
+        if trends:
+            rollups, agg = result, Aggregate()
+            for day, day_agg in rollups.items():
+                agg.merge(day_agg)
+                daily.setdefault(day, Aggregate()).merge(day_agg)
+        else:
+            agg = result
+        if not agg.sessions:
+            continue
+        total.merge(agg)
+        if trends:
+            analysis = render_trends(rollups, cutoff)
+            del analysis["daily"]  # the fleet-wide series is enough; keep per-project totals
+        else:
+            analysis = agg.render(args.focus)
+        by_project.append({
+            "project_dir": str(project_dir),
+            "sessions_analyzed": agg.sessions,
+            "analysis": analysis,
+        })
+
+    if not total.sessions:
+        result = {
+            "status": "error",
+            "error": f"No sessions found in last {args.days} days",
+            "project": args.project or "*",
+        }
+        print(json.dumps(result, indent=2))
+        return 1
+
+    by_project.sort(key=lambda p: (-p["sessions_analyzed"], p["project_dir"]))
+    result = {
+        "status": "success",
+        "project": args.project or "*",
+        "projects_matched": len(project_dirs),
+        "projects_analyzed": len(by_project),
+        "days": args.days,
+        "focus": args.focus,
+        "tree": args.tree,
+        "sessions_analyzed": total.sessions,
+        "analysis": render_trends(daily, cutoff) if trends else total.render(args.focus),
+        "by_project": by_project,
     }
 
+    emit_json(result)
+    return 0
+
 
-def main():
+def main(argv=None):
     parser = argparse.ArgumentParser(description="Cross-session pattern analysis")
-    parser.add_argument("--project", required=True, help="Project name to analyze")
+    scope = parser.add_mutually_exclusive_group(required=True)
+    scope.add_argument("--project", help="Project name to analyze (glob patterns such as 'api-*' match several)")
+    scope.add_argument("--all-projects", action="store_true", help="Analyze every project")
     parser.add_argument("--days", type=int, default=7, help="Number of days to analyze")
-    parser.add_argument("--focus", choices=["failures", "tools", "duration", "commands"],
+    parser.add_argument("--focus", choices=["failures", "tools", "duration", "commands", "trends"],
                         default="failures", help="Analysis focus area")
-
-    args = parser.parse_args()
+    parser.add_argument("--tree", action="store_true",
+                        help="Treat each session plus its sub-agents as one unit")
+    parser.add_argument("--workers", type=int,
+                        help="Worker processes for multi-project runs (default: CPU count)")
+    add_profile_args(parser)
+
+    args = parser.parse_args(argv)
+    configure(args)
+
+    if args.all_projects or is_project_glob(args.project):
+        project_dirs = match_project_dirs(args.project)
+        if not project_dirs:
+            result = {
+                "status": "error",
+                "error": "No projects found" + (f" matching '{args.project}'" if args.project else ""),
+                "project": args.project
+            }
+            print(json.dumps(result, indent=2))
+            return 1
+        return analyze_projects(args, project_dirs)
 
     # Find project directory
     project_dir = find_project_dir(args.project)
@@ -315,17 +776,16 @@ def main():
     cutoff = datetime.now(timezone.utc) - timedelta(days=args.days)
 
     # Analyze all sessions
-    sessions = []
-    for session_file in project_dir.glob("*.jsonl"):
-        mtime = datetime.fromtimestamp(session_file.stat().st_mtime, tz=timezone.utc)
-        if mtime < cutoff:
-            continue
-
-        analysis = analyze_session(session_file)
-        if analysis["start_time"]:  # Only include sessions with data
-            sessions.append(analysis)
-
-    if not sessions:
+    if args.focus == "trends":
+        # Served from the daily rollup table; --tree does not apply
+        rollups = project_trends(project_dir, cutoff)
+        agg = Aggregate()
+        for day_agg in rollups.values():
+            agg.merge(day_agg)
+    else:
+        agg = analyze_project(project_dir, cutoff, args.tree)
+
+    if not agg.sessions:
         result = {
             "status": "error",
             "error": f"No sessions found in last {args.days} days",
@@ -334,27 +794,18 @@ def main():
         print(json.dumps(result, indent=2))
         return 1
 
-    # Run focused analysis
-    if args.focus == "failures":
-        analysis_result = analyze_failures(sessions)
-    elif args.focus == "tools":
-        analysis_result = analyze_tools(sessions)
-    elif args.focus == "duration":
-        analysis_result = analyze_duration(sessions)
-    elif args.focus == "commands":
-        analysis_result = analyze_commands(sessions)
-
     result = {
         "status": "success",
         "project": args.project,
         "project_dir": str(project_dir),
         "days": args.days,
         "focus": args.focus,
-        "sessions_analyzed": len(sessions),
-        "analysis": analysis_result,
+        "tree": args.tree,
+        "sessions_analyzed": agg.sessions,
+        "analysis": render_trends(rollups, cutoff) if args.focus == "trends" else agg.render(args.focus),
     }
 
-    print(json.dumps(result, indent=2, default=str))
+    emit_json(result)
     return 0
 
 
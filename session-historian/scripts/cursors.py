@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Ordered session scans and opaque resumable cursors for paginated output.
+
+list_sessions and search_sessions return sessions newest first. Instead of
+parsing every session to learn its start time, ordered_sessions() reads it
+from a per-project cache (refreshed by file signature; an uncached file
+costs one read of its first timestamped line), sorts, and lets the caller
+parse only the sessions on the requested page.
+
+A cursor is the sort key of the last session a page covered, plus a hash
+of the query it belongs to, packed as URL-safe base64. Resuming from it
+skips straight past that key, so page N costs about the same as page 1.
+"""
+
+import base64
+import json
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, List, NamedTuple, Optional
+
+from perf import PERF
+from session_cache import file_signature, load_json_cache, save_json_cache
+from session_io import iter_entries, session_files, session_id_from_path
+
+CURSOR_VERSION = 1
+
+
+class OrderedSession(NamedTuple):
+    key: tuple          # (start_time or "", project dir name, session id); sorted descending
+    path: Path
+
+
+def first_timestamp(session_file: Path) -> Optional[str]:
+    """Timestamp of the first entry that has one (the session start time)."""
+    for entry in iter_entries(session_file, prefilter=(b'"timestamp"',)):
+        if entry.get("timestamp"):
+            return entry["timestamp"]
+    return None
+
+
+def load_start_times(project_dir: Path, use_cache: bool = True) -> dict:
+    """Return {session_file_name: (path, mtime, start_time)}, reading only changed files."""
+    cache_name = f"start_times/{project_dir.name}.json"
+    cached = (load_json_cache(cache_name) or {}).get("files", {}) if use_cache else {}
+
+    files, starts = {}, {}
+    for session_file in session_files(project_dir):
+        try:
+            sig = file_signature(session_file)
+        except OSError:
+            continue
+        hit = cached.get(session_file.name)
+        if hit and hit.get("sig") == sig:
+            PERF.count("cache_hits")
+            start = hit["start"]
+        else:
+            PERF.count("cache_misses")
+            try:
+                start = first_timestamp(session_file)
+            except OSError:
+                continue
+        files[session_file.name] = {"sig": sig, "start": start}
+        starts[session_file.name] = (session_file, sig[1] / 1e9, start)
+
+    if use_cache and files != cached:
+        save_json_cache(cache_name, {"files": files})
+
+    return starts
+
+
+def ordered_sessions(project_dirs: Iterable[Path], cutoff: datetime, by_start: bool = True,
+                     include: Optional[dict] = None, exclude: Optional[set] = None) -> List[OrderedSession]:
+    """Sessions modified since ``cutoff``, newest start time first.
+
+    by_start: also drop sessions that started before ``cutoff``
+    include:  optional {project_dir: set of file names} restricting candidates
+    exclude:  session ids to leave out (e.g. sub-agents folded into a tree)
+    """
+    cutoff_ts = cutoff.timestamp()
+    ordered = []
+    for project_dir in project_dirs:
+        allowed = include.get(project_dir) if include is not None else None
+        for name, (path, mtime, start) in load_start_times(project_dir).items():
+            if allowed is not None and name not in allowed:
+                continue
+            if mtime < cutoff_ts:
+                continue
+            session_id = session_id_from_path(path)
+            if exclude and session_id in exclude:
+                continue
+            if by_start and start:
+                try:
+                    if datetime.fromisoformat(start.replace("Z", "+00:00")) < cutoff:
+                        continue
+                except (ValueError, TypeError):
+                    pass
+            ordered.append(OrderedSession((start or "", project_dir.name, session_id), path))
+    ordered.sort(key=lambda s: s.key, reverse=True)
+    return ordered
+
+
+def query_hash(query: dict) -> str:
+    return f"{zlib.crc32(json.dumps(query, sort_keys=True, default=str).encode()):08x}"
+
+
+def encode_cursor(key: tuple, query: dict) -> str:
+    """Pack the last key of a page and the query it belongs to into an opaque token."""
+    payload = json.dumps({"v": CURSOR_VERSION, "k": list(key), "q": query_hash(query)},
+                         separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str, query: dict) -> tuple:
+    """Return the key stored in ``token``; ValueError if malformed or from another query."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        key = tuple(payload["k"])
+    except (ValueError, TypeError, KeyError):
+        raise ValueError("malformed cursor")
+    if payload.get("v") != CURSOR_VERSION or len(key) != 3:
+        raise ValueError("cursor is from an incompatible version")
+    if payload.get("q") != query_hash(query):
+        raise ValueError("cursor belongs to a different query; repeat the original options")
+    return key
+
+
+def after_cursor(ordered: List[OrderedSession], key: Optional[tuple]) -> List[OrderedSession]:
+    """Sessions that sort after ``key`` (i.e. older), or all of them without a cursor."""
+    if key is None:
+        return ordered
+    return [s for s in ordered if s.key < key]
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+File activity across sessions: which files were read, edited and written, where.
+
+Two sources are combined per session: tool_use inputs that carry a file path
+(Read, Write, Edit, MultiEdit, NotebookEdit, ...) and file-history-snapshot
+entries, whose trackedFileBackups record every file Claude changed with a
+version number per checkpoint. Per-session results are cached by file
+signature, and the path -> sessions index is rebuilt from the cache, so
+lookups only re-parse sessions that changed.
+
+Usage:
+    python file_activity.py --project claude-life-dev --days 7 --hot
+    python file_activity.py --project claude-life-dev --days 30 --file gateway.ts
+
+Output: JSON with the hottest files by churn, or the sessions that touched a file.
+"""
+
+import argparse
+import json
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from perf import PERF, add_profile_args, configure, emit_json, timed
+from session_cache import file_signature, load_json_cache, save_json_cache
+from session_io import iter_entries, session_files, session_id_from_path
+
+# Tools whose file_path input modifies the file
+MODIFYING_TOOLS = {"Write": "write", "Edit": "edit", "MultiEdit": "edit", "NotebookEdit": "edit"}
+
+
+@timed("walk")
+def find_project_dir(project_name: str) -> Optional[Path]:
+    """Find the project directory in ~/.claude/projects/"""
+    claude_projects = Path.home() / ".claude" / "projects"
+
+    if not claude_projects.exists():
+        return None
+
+    if project_name.startswith("/"):
+        encoded = project_name.replace("/", "-")
+        project_dir = claude_projects / encoded
+        return project_dir if project_dir.exists() else None
+
+    for d in claude_projects.iterdir():
+        if d.is_dir() and d.name.endswith(project_name):
+            return d
+
+    for d in claude_projects.iterdir():
+        if d.is_dir() and project_name in d.name:
+            return d
+
+    return None
+
+
+def _file_record(files: dict, path: str) -> dict:
+    record = files.get(path)
+    if record is None:
+        record = files[path] = {"ops": {}, "snapshot_versions": 0, "last_time": None}
+    return record
+
+
+@timed("process")
+def extract_file_activity(session_file: Path) -> dict:
+    """Collect per-file operations for one session from tool inputs and snapshots."""
+    activity = {
+        "session_id": session_id_from_path(session_file),
+        "start_time": None,
+        "end_time": None,
+        "files": {},
+    }
+    files = activity["files"]
+    cwd = None
+
+    for entry in iter_entries(session_file):
+        entry_type = entry.get("type")
+        timestamp = entry.get("timestamp")
+        if timestamp:
+            if activity["start_time"] is None:
+                activity["start_time"] = timestamp
+            activity["end_time"] = timestamp
+        if cwd is None and entry.get("cwd"):
+            cwd = entry["cwd"]
+
+        if entry_type == "assistant":
+            content = entry.get("message", {}).get("content", [])
+            if not isinstance(content, list):
+                continue
+            for block in content:
+                if block.get("type") != "tool_use":
+                    continue
+                tool_input = block.get("input") or {}
+                path = tool_input.get("file_path") or tool_input.get("notebook_path")
+                if not path or not isinstance(path, str):
+                    continue
+                tool_name = block.get("name", "unknown")
+                op = MODIFYING_TOOLS.get(tool_name, tool_name.lower())
+                record = _file_record(files, path)
+                record["ops"][op] = record["ops"].get(op, 0) + 1
+                record["last_time"] = timestamp or record["last_time"]
+
+        elif entry_type == "file-history-snapshot":
+            snapshot = entry.get("snapshot") or {}
+            snap_ts = snapshot.get("timestamp")
+            for path, backup in (snapshot.get("trackedFileBackups") or {}).items():
+                if cwd and not os.path.isabs(path):
+                    path = os.path.join(cwd, path)
+                record = _file_record(files, path)
+                version = (backup or {}).get("version") or 0
+                if version > record["snapshot_versions"]:
+                    record["snapshot_versions"] = version
+                record["last_time"] = snap_ts or record["last_time"]
+
+    for record in files.values():
+        record["churn"] = file_churn(record)
+
+    return activity
+
+
+def file_churn(record: dict) -> int:
+    """Number of recorded changes to a file in one session.
+
+    Write/Edit calls are counted directly. Snapshot versions cover changes
+    the tool inputs miss (e.g. a file only seen in snapshots), so the larger
+    of the two is used rather than their sum.
+    """
+    ops = record["ops"]
+    tool_changes = ops.get("write", 0) + ops.get("edit", 0)
+    return max(tool_changes, record["snapshot_versions"])
+
+
+def load_file_index(project_dir: Path, use_cache: bool = True) -> Dict[str, dict]:
+    """Return {session_file_name: activity} for a project, re-parsing only changed files."""
+    cache_name = f"file_index/{project_dir.name}.json"
+    cached = (load_json_cache(cache_name) or {}).get("files", {}) if use_cache else {}
+
+    files = {}
+    for session_file in session_files(project_dir):
+        try:
+            sig = file_signature(session_file)
+        except OSError:
+            continue
+        hit = cached.get(session_file.name)
+        if hit and hit.get("sig") == sig:
+            PERF.count("cache_hits")
+            files[session_file.name] = hit
+            continue
+        PERF.count("cache_misses")
+        try:
+            files[session_file.name] = {"sig": sig, "activity": extract_file_activity(session_file)}
+        except OSError:
+            continue
+
+    if use_cache and files != cached:
+        save_json_cache(cache_name, {"files": files})
+
+    return {name: item["activity"] for name, item in files.items()}
+
+
+def build_path_index(activities: Iterable[dict]) -> Dict[str, List[dict]]:
+    """Invert per-session activity into {file_path: [{session_id, ops, churn, ...}]}."""
+    index: Dict[str, List[dict]] = {}
+    for activity in activities:
+        for path, record in activity["files"].items():
+            index.setdefault(path, []).append({
+                "session_id": activity["session_id"],
+                "start_time": activity["start_time"],
+                "ops": record["ops"],
+                "snapshot_versions": record["snapshot_versions"],
+                "churn": record["churn"],
+                "last_time": record["last_time"],
+            })
+    return index
+
+
+def sessions_touching(project_dir: Path, file_filter: str) -> Dict[str, List[str]]:
+    """Return {session_file_name: [matching paths]} for sessions that touched ``file_filter``.
+
+    Substring match on the path, the same rule search_sessions --file uses.
+    """
+    matches = {}
+    for name, activity in load_file_index(project_dir).items():
+        paths = [p for p in activity["files"] if file_filter in p]
+        if paths:
+            matches[name] = paths
+    return matches
+
+
+def _after(timestamp: Optional[str], cutoff: datetime) -> bool:
+    if not timestamp:
+        return False
+    try:
+        return datetime.fromisoformat(timestamp.replace("Z", "+00:00")) >= cutoff
+    except (ValueError, TypeError):
+        return False
+
+
+def hottest_files(activities: Iterable[dict], cutoff: datetime, limit: int = 20) -> List[dict]:
+    """Rank files by total churn over sessions active since ``cutoff``."""
+    totals: Dict[str, dict] = {}
+    for activity in activities:
+        if not _after(activity["end_time"], cutoff):
+            continue
+        for path, record in activity["files"].items():
+            item = totals.setdefault(path, {"file": path, "churn": 0, "sessions": 0, "ops": {}, "last_time": None})
+            item["churn"] += record["churn"]
+            item["sessions"] += 1
+            for op, count in record["ops"].items():
+                item["ops"][op] = item["ops"].get(op, 0) + count
+            if record["last_time"] and (item["last_time"] is None or record["last_time"] > item["last_time"]):
+                item["last_time"] = record["last_time"]
+
+    ranked = sorted(totals.values(), key=lambda x: (x["churn"], x["sessions"], x["last_time"] or ""), reverse=True)
+    return ranked[:limit]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="File activity across Claude Code sessions")
+    parser.add_argument("--project", required=True, help="Project name to analyze")
+    parser.add_argument("--days", type=int, default=7, help="Number of days to look back")
+    parser.add_argument("--limit", type=int, default=20, help="Maximum files or sessions to return")
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument("--hot", action="store_true", help="Rank the most-changed files")
+    mode.add_argument("--file", help="Sessions that touched files matching this substring")
+    add_profile_args(parser)
+
+    args = parser.parse_args(argv)
+    configure(args)
+
+    project_dir = find_project_dir(args.project)
+    if project_dir is None:
+        result = {
+            "status": "error",
+            "error": f"Project '{args.project}' not found in ~/.claude/projects/",
+            "project": args.project,
+        }
+        print(json.dumps(result, indent=2))
+        return 1
+
+    cutoff = datetime.now(timezone.utc) - timedelta(days=args.days)
+    activities = list(load_file_index(project_dir).values())
+
+    result = {
+        "status": "success",
+        "project": args.project,
+        "project_dir": str(project_dir),
+        "days": args.days,
+    }
+
+    if args.hot:
+        result["hot_files"] = hottest_files(activities, cutoff, args.limit)
+    else:
+        index = build_path_index(a for a in activities if _after(a["end_time"], cutoff))
+        touched = []
+        for path, sessions in index.items():
+            if args.file in path:
+                for s in sessions:
+                    touched.append(dict(s, file=path))
+        touched.sort(key=lambda x: x["last_time"] or "", reverse=True)
+        result["file"] = args.file
+        result["total_matches"] = len(touched)
+        result["sessions"] = touched[:args.limit]
+
+    emit_json(result)
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except Exception as e:
+        print(json.dumps({"status": "error", "error": str(e)}), file=sys.stderr)
+        sys.exit(1)
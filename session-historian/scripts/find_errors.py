@@ -4,8 +4,13 @@ Find error patterns across sessions.
 
 Usage:
     python find_errors.py --project claude-life-dev --days 3
+    python find_errors.py --all-projects --days 7
+    python find_errors.py --project 'api-*' --days 7 --workers 8
 
 Output: JSON with error list, patterns, affected sessions, error rates.
+Each error is joined to the tool call that produced it (tool, command
+heads, file), and failure rates are reported per tool and per command.
+Multi-project runs add "by_project" with per-project counts and patterns.
 """
 
 import argparse
@@ -17,7 +22,14 @@ from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import List, Optional
 
+from aggregates import TopK
+from command_taxonomy import command_heads
+from perf import add_profile_args, configure, emit_json, timed
+from session_io import (iter_entries, is_project_glob, map_projects, match_project_dirs, session_files,
+                        session_id_from_path)
 
+
+@timed("walk")
 def find_project_dir(project_name: str) -> Optional[Path]:
     """Find the project directory in ~/.claude/projects/"""
     claude_projects = Path.home() / ".claude" / "projects"
@@ -71,57 +83,90 @@ def categorize_error(error_content: str) -> str:
     return "other_error"
 
 
+def describe_call(block: dict) -> dict:
+    """Tool name, Bash command heads and target file of a tool_use block."""
+    tool_input = block.get("input") or {}
+    commands = []
+    if block.get("name") == "Bash":
+        commands = list(dict.fromkeys(command_heads(tool_input.get("command", ""))))
+    return {
+        "tool": block.get("name", "unknown"),
+        "commands": commands,
+        "file": tool_input.get("file_path") or tool_input.get("notebook_path") or tool_input.get("path"),
+    }
+
+
+@timed("process")
 def find_errors_in_session(session_file: Path) -> dict:
     """Find all errors in a single session."""
     session_info = {
-        "session_id": session_file.stem,
+        "session_id": session_id_from_path(session_file),
         "file_path": str(session_file),
         "errors": [],
         "error_count": 0,
         "start_time": None,
         "end_time": None,
+        "tool_stats": {},     # tool -> [calls, failed calls]
+        "command_stats": {},  # Bash command head -> [calls, failed calls]
     }
 
+    # Hash join of tool_result -> tool_use on tool_use_id. Calls wait here
+    # until their result arrives and are dropped on the match, so memory is
+    # bounded by the calls still in flight rather than the session length.
+    pending = {}
+
     try:
-        with open(session_file, 'r') as f:
-            for line in f:
-                if not line.strip():
-                    continue
-                try:
-                    entry = json.loads(line)
-                except json.JSONDecodeError:
-                    continue
-
-                entry_type = entry.get("type")
-                timestamp = entry.get("timestamp")
-
-                # Track times
-                if timestamp:
-                    if session_info["start_time"] is None:
-                        session_info["start_time"] = timestamp
-                    session_info["end_time"] = timestamp
-
-                # Check tool results for errors
-                if entry_type == "user":
-                    content = entry.get("message", {}).get("content", [])
-                    if isinstance(content, list):
-                        for block in content:
-                            if block.get("type") == "tool_result":
-                                result = str(block.get("content", ""))
-                                result_lower = result.lower()
-
-                                # Check for error indicators
-                                if "error" in result_lower or "failed" in result_lower or "exception" in result_lower:
-                                    tool_use_id = block.get("tool_use_id", "")
-                                    category = categorize_error(result)
-
-                                    session_info["errors"].append({
-                                        "timestamp": timestamp,
-                                        "tool_use_id": tool_use_id,
-                                        "category": category,
-                                        "preview": result[:300] + ("..." if len(result) > 300 else ""),
-                                    })
-                                    session_info["error_count"] += 1
+        for entry in iter_entries(session_file):
+            entry_type = entry.get("type")
+            timestamp = entry.get("timestamp")
+
+            # Track times
+            if timestamp:
+                if session_info["start_time"] is None:
+                    session_info["start_time"] = timestamp
+                session_info["end_time"] = timestamp
+
+            if entry_type == "assistant":
+                content = entry.get("message", {}).get("content", [])
+                if isinstance(content, list):
+                    for block in content:
+                        if block.get("type") == "tool_use":
+                            call = describe_call(block)
+                            session_info["tool_stats"].setdefault(call["tool"], [0, 0])[0] += 1
+                            for head in call["commands"]:
+                                session_info["command_stats"].setdefault(head, [0, 0])[0] += 1
+                            if block.get("id"):
+                                pending[block["id"]] = call
+
+            # Check tool results for errors
+            elif entry_type == "user":
+                content = entry.get("message", {}).get("content", [])
+                if isinstance(content, list):
+                    for block in content:
+                        if block.get("type") == "tool_result":
+                            tool_use_id = block.get("tool_use_id", "")
+                            call = pending.pop(tool_use_id, None)
+                            result = str(block.get("content", ""))
+                            result_lower = result.lower()
+
+                            # Check for error indicators
+                            if "error" in result_lower or "failed" in result_lower or "exception" in result_lower:
+                                category = categorize_error(result)
+
+                                session_info["errors"].append({
+                                    "timestamp": timestamp,
+                                    "tool_use_id": tool_use_id,
+                                    "tool": call["tool"] if call else None,
+                                    "commands": call["commands"] if call else [],
+                                    "file": call["file"] if call else None,
+                                    "category": category,
+                                    "preview": result[:300] + ("..." if len(result) > 300 else ""),
+                                })
+                                session_info["error_count"] += 1
+                                if call:
+                                    session_info["tool_stats"][call["tool"]][1] += 1
+                                    for head in call["commands"]:
+                                        session_info["command_stats"][head][1] += 1
 
     except Exception as e:
         session_info["parse_error"] = str(e)
@@ -129,12 +174,168 @@ def find_errors_in_session(session_file: Path) -> dict:
     return session_info
 
 
-def main():
+class ErrorAggregate:
+    """Mergeable error summary for a set of sessions.
+
+    Keeps counts, per-category example previews and bounded top-k lists of
+    the most recent errors and affected sessions, so projects scanned in
+    separate processes combine with merge() without shipping every error back.
+    """
+
+    RECENT_ERRORS = 50
+    AFFECTED_SESSIONS = 20
+    EXAMPLES = 3
+
+    def __init__(self):
+        self.total_sessions = 0
+        self.sessions_with_errors = 0
+        self.total_errors = 0
+        self.categories = Counter()
+        self.examples = {}      # category -> previews (first EXAMPLES seen)
+        self.recent = TopK(self.RECENT_ERRORS, "timestamp", "tool_use_id")
+        self.affected = TopK(self.AFFECTED_SESSIONS, "start_time", "session_id")
+        self.tool_stats = {}        # tool -> [calls, failed calls]
+        self.command_stats = {}     # command head -> [calls, failed calls]
+
+    def add(self, session_info: dict) -> None:
+        self.total_sessions += 1
+        _add_stats(self.tool_stats, session_info["tool_stats"])
+        _add_stats(self.command_stats, session_info["command_stats"])
+        if session_info["error_count"] == 0:
+            return
+        self.sessions_with_errors += 1
+        self.total_errors += session_info["error_count"]
+        self.affected.push({
+            "session_id": session_info["session_id"],
+            "error_count": session_info["error_count"],
+            "start_time": session_info["start_time"],
+        })
+
+        for error in session_info["errors"]:
+            error["session_id"] = session_info["session_id"]
+            self.categories[error["category"]] += 1
+            examples = self.examples.setdefault(error["category"], [])
+            if len(examples) < self.EXAMPLES:
+                examples.append(error["preview"][:100])
+            self.recent.push(error)
+
+    def merge(self, other: "ErrorAggregate") -> "ErrorAggregate":
+        self.total_sessions += other.total_sessions
+        self.sessions_with_errors += other.sessions_with_errors
+        self.total_errors += other.total_errors
+        self.categories.update(other.categories)
+        for category, previews in other.examples.items():
+            examples = self.examples.setdefault(category, [])
+            examples.extend(previews[:self.EXAMPLES - len(examples)])
+        _add_stats(self.tool_stats, other.tool_stats)
+        _add_stats(self.command_stats, other.command_stats)
+        self.recent.merge(other.recent)
+        self.affected.merge(other.affected)
+        return self
+
+    def summary(self) -> dict:
+        patterns = [
+            {"category": category, "count": count, "examples": self.examples[category]}
+            for category, count in self.categories.most_common(10)
+        ]
+        error_rate = self.sessions_with_errors / self.total_sessions if self.total_sessions > 0 else 0
+        return {
+            "total_sessions": self.total_sessions,
+            "sessions_with_errors": self.sessions_with_errors,
+            "error_rate": round(error_rate, 2),
+            "total_errors": self.total_errors,
+            "patterns": patterns,
+            "failure_rate_by_tool": _failure_rates(self.tool_stats, "tool"),
+            "failure_rate_by_command": _failure_rates(self.command_stats, "command"),
+            "affected_sessions": self.affected.rows(),
+            "recent_errors": self.recent.rows(),
+        }
+
+
+def _add_stats(into: dict, stats: dict) -> None:
+    for key, (calls, failures) in stats.items():
+        mine = into.setdefault(key, [0, 0])
+        mine[0] += calls
+        mine[1] += failures
+
+
+def _failure_rates(stats: dict, label: str, limit: int = 20) -> List[dict]:
+    """Keys with at least one failure, most failures first."""
+    rows = sorted(((key, calls, failures) for key, (calls, failures) in stats.items() if failures),
+                  key=lambda row: (-row[2], row[0]))[:limit]
+    return [
+        {label: key, "calls": calls, "failures": failures, "failure_rate": round(failures / calls, 2)}
+        for key, calls, failures in rows
+    ]
+
+
+def scan_project(project_dir: Path, cutoff: datetime) -> ErrorAggregate:
+    """Error summary of the sessions in ``project_dir`` modified since ``cutoff``."""
+    cutoff_ts = cutoff.timestamp()
+    agg = ErrorAggregate()
+    for session_file in session_files(project_dir):
+        # Quick filter by modification time
+        try:
+            if session_file.stat().st_mtime < cutoff_ts:
+                continue
+        except OSError:
+            continue
+        agg.add(find_errors_in_session(session_file))
+    return agg
+
+
+def main(argv=None):
     parser = argparse.ArgumentParser(description="Find errors across Claude Code sessions")
-    parser.add_argument("--project", required=True, help="Project name to analyze")
+    scope = parser.add_mutually_exclusive_group(required=True)
+    scope.add_argument("--project", help="Project name to analyze (glob patterns such as 'api-*' match several)")
+    scope.add_argument("--all-projects", action="store_true", help="Scan every project")
     parser.add_argument("--days", type=int, default=3, help="Number of days to look back")
+    parser.add_argument("--workers", type=int,
+                        help="Worker processes for multi-project runs (default: CPU count)")
+    add_profile_args(parser)
+
+    args = parser.parse_args(argv)
+    configure(args)
+
+    # Calculate cutoff date
+    cutoff = datetime.now(timezone.utc) - timedelta(days=args.days)
 
-    args = parser.parse_args()
+    if args.all_projects or is_project_glob(args.project):
+        project_dirs = match_project_dirs(args.project)
+        if not project_dirs:
+            result = {
+                "status": "error",
+                "error": "No projects found" + (f" matching '{args.project}'" if args.project else ""),
+                "project": args.project,
+                "errors": []
+            }
+            print(json.dumps(result, indent=2))
+            return 1
+
+        total = ErrorAggregate()
+        by_project = []
+        for project_dir, agg in map_projects(scan_project, project_dirs, (cutoff,), args.workers):
+            if not agg.total_sessions:
+                continue
+            total.merge(agg)
+            summary = agg.summary()
+            by_project.append({
+                "project_dir": str(project_dir),
+                **{key: summary[key] for key in ("total_sessions", "sessions_with_errors", "error_rate",
+                                                 "total_errors", "patterns", "failure_rate_by_tool")},
+            })
+        by_project.sort(key=lambda p: (-p["total_errors"], p["project_dir"]))
+
+        result = {
+            "status": "success",
+            "project": args.project or "*",
+            "projects_matched": len(project_dirs),
+            "days": args.days,
+            **total.summary(),
+            "by_project": by_project,
+        }
+        emit_json(result)
+        return 0
 
     # Find project directory
     project_dir = find_project_dir(args.project)
@@ -149,71 +350,15 @@ def main():
         print(json.dumps(result, indent=2))
         return 1
 
-    # Calculate cutoff date
-    cutoff = datetime.now(timezone.utc) - timedelta(days=args.days)
-
-    # Collect errors from all sessions
-    all_errors = []
-    affected_sessions = []
-    total_sessions = 0
-    sessions_with_errors = 0
-
-    for session_file in project_dir.glob("*.jsonl"):
-        # Quick filter by modification time
-        mtime = datetime.fromtimestamp(session_file.stat().st_mtime, tz=timezone.utc)
-        if mtime < cutoff:
-            continue
-
-        total_sessions += 1
-        session_info = find_errors_in_session(session_file)
-
-        if session_info["error_count"] > 0:
-            sessions_with_errors += 1
-            affected_sessions.append({
-                "session_id": session_info["session_id"],
-                "error_count": session_info["error_count"],
-                "start_time": session_info["start_time"],
-            })
-
-            for error in session_info["errors"]:
-                error["session_id"] = session_info["session_id"]
-                all_errors.append(error)
-
-    # Categorize errors
-    error_categories = Counter(e["category"] for e in all_errors)
-
-    # Find common patterns
-    patterns = []
-    for category, count in error_categories.most_common(10):
-        # Get example errors for this category
-        examples = [e for e in all_errors if e["category"] == category][:3]
-        patterns.append({
-            "category": category,
-            "count": count,
-            "examples": [e["preview"][:100] for e in examples],
-        })
-
-    # Calculate error rate
-    error_rate = sessions_with_errors / total_sessions if total_sessions > 0 else 0
-
-    # Sort errors by timestamp (most recent first)
-    all_errors.sort(key=lambda x: x.get("timestamp") or "", reverse=True)
-
     result = {
         "status": "success",
         "project": args.project,
         "project_dir": str(project_dir),
         "days": args.days,
-        "total_sessions": total_sessions,
-        "sessions_with_errors": sessions_with_errors,
-        "error_rate": round(error_rate, 2),
-        "total_errors": len(all_errors),
-        "patterns": patterns,
-        "affected_sessions": affected_sessions[:20],
-        "recent_errors": all_errors[:50],
+        **scan_project(project_dir, cutoff).summary(),
     }
 
-    print(json.dumps(result, indent=2, default=str))
+    emit_json(result)
     return 0
 
 
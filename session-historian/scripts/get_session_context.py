@@ -5,6 +5,7 @@ Get full context for deep debugging of a specific session.
 Usage:
     python get_session_context.py --session-id <uuid>
     python get_session_context.py --session-id <uuid> --include-messages
+    python get_session_context.py --session-id <uuid> --active-path
 
 Output: Complete session data including message content when --include-messages is set.
 """
@@ -15,7 +16,11 @@ import sys
 from pathlib import Path
 from typing import Optional
 
+from perf import add_profile_args, configure, emit_json, timed
+from session_io import iter_entries, mentions_error, resolve_session_file, session_id_from_path
 
+
+@timed("walk")
 def find_session_file(session_id: str) -> Optional[Path]:
     """Find a session file by its ID across all projects."""
     claude_projects = Path.home() / ".claude" / "projects"
@@ -27,24 +32,33 @@ def find_session_file(session_id: str) -> Optional[Path]:
         if not project_dir.is_dir():
             continue
 
-        # Try exact match
-        session_file = project_dir / f"{session_id}.jsonl"
-        if session_file.exists():
+        # Try exact match (live or archived)
+        session_file = resolve_session_file(project_dir, session_id)
+        if session_file is not None:
             return session_file
 
         # Try with agent- prefix
         if not session_id.startswith("agent-"):
-            agent_file = project_dir / f"agent-{session_id}.jsonl"
-            if agent_file.exists():
+            agent_file = resolve_session_file(project_dir, f"agent-{session_id}")
+            if agent_file is not None:
                 return agent_file
 
     return None
 
 
-def get_session_context(session_file: Path, include_messages: bool = False) -> dict:
-    """Extract full context from a session for debugging."""
+@timed("process")
+def get_session_context(session_file: Path, include_messages: bool = False,
+                        line_mask: Optional[bytearray] = None, start_line: int = 0,
+                        stop_line: Optional[int] = None, start_offset: int = 0) -> dict:
+    """Extract full context from a session for debugging.
+
+    ``line_mask`` (from conversation_dag) restricts extraction to the lines
+    flagged 1, e.g. the active conversation path. ``start_line``/``stop_line``
+    restrict it to a window of lines; with ``start_offset`` (from offset_index)
+    reading seeks straight to the window.
+    """
     context = {
-        "session_id": session_file.stem,
+        "session_id": session_id_from_path(session_file),
         "file_path": str(session_file),
         "file_size_kb": round(session_file.stat().st_size / 1024, 1),
         "metadata": {
@@ -67,6 +81,7 @@ def get_session_context(session_file: Path, include_messages: bool = False) -> d
             "snapshots": 0,
             "parse_warnings": 0,  # Track skipped lines
         },
+        "file_snapshots": {},
         "tool_calls": [],
         "tool_results": [],
         "errors": [],
@@ -77,112 +92,111 @@ def get_session_context(session_file: Path, include_messages: bool = False) -> d
     try:
         from datetime import datetime
 
-        with open(session_file, 'r') as f:
-            for line in f:
-                if not line.strip():
-                    continue
-                try:
-                    entry = json.loads(line)
-                except json.JSONDecodeError:
-                    context["statistics"]["parse_warnings"] += 1
-                    continue
-
-                context["statistics"]["total_entries"] += 1
-                entry_type = entry.get("type")
-                timestamp = entry.get("timestamp")
-
-                # Track times
-                if timestamp:
-                    if context["metadata"]["start_time"] is None:
-                        context["metadata"]["start_time"] = timestamp
-                    context["metadata"]["end_time"] = timestamp
-
-                # Handle different entry types
-                if entry_type == "summary":
-                    context["statistics"]["summaries"] += 1
-                    context["metadata"]["session_summary"] = entry.get("summary")
-
-                elif entry_type == "file-history-snapshot":
-                    context["statistics"]["snapshots"] += 1
-
-                elif entry_type == "user":
-                    context["statistics"]["user_messages"] += 1
-
-                    # Get metadata from first user message
-                    if context["metadata"]["cwd"] is None:
-                        context["metadata"]["cwd"] = entry.get("cwd")
-                        context["metadata"]["git_branch"] = entry.get("gitBranch")
-                        context["metadata"]["version"] = entry.get("version")
-
-                    content = entry.get("message", {}).get("content", "")
-
-                    # Check for tool results
-                    if isinstance(content, list):
+        entries = iter_entries(session_file, line_mask=line_mask, stats=context["statistics"],
+                               start_line=start_line, stop_line=stop_line, start_offset=start_offset)
+        for entry in entries:
+            context["statistics"]["total_entries"] += 1
+            entry_type = entry.get("type")
+            timestamp = entry.get("timestamp")
+
+            # Track times
+            if timestamp:
+                if context["metadata"]["start_time"] is None:
+                    context["metadata"]["start_time"] = timestamp
+                context["metadata"]["end_time"] = timestamp
+
+            # Handle different entry types
+            if entry_type == "summary":
+                context["statistics"]["summaries"] += 1
+                context["metadata"]["session_summary"] = entry.get("summary")
+
+            elif entry_type == "file-history-snapshot":
+                context["statistics"]["snapshots"] += 1
+                # Latest backup version per tracked file
+                tracked = (entry.get("snapshot") or {}).get("trackedFileBackups") or {}
+                for file_path, backup in tracked.items():
+                    version = (backup or {}).get("version") or 0
+                    if version >= context["file_snapshots"].get(file_path, 0):
+                        context["file_snapshots"][file_path] = version
+
+            elif entry_type == "user":
+                context["statistics"]["user_messages"] += 1
+
+                # Get metadata from first user message
+                if context["metadata"]["cwd"] is None:
+                    context["metadata"]["cwd"] = entry.get("cwd")
+                    context["metadata"]["git_branch"] = entry.get("gitBranch")
+                    context["metadata"]["version"] = entry.get("version")
+
+                content = entry.get("message", {}).get("content", "")
+
+                # Check for tool results
+                if isinstance(content, list):
+                    for block in content:
+                        if block.get("type") == "tool_result":
+                            context["statistics"]["tool_results"] += 1
+                            result_content = str(block.get("content", ""))
+
+                            tool_result = {
+                                "timestamp": timestamp,
+                                "tool_use_id": block.get("tool_use_id"),
+                                "is_error": mentions_error(result_content),
+                                "content_preview": result_content[:500] + ("..." if len(result_content) > 500 else ""),
+                            }
+
+                            if tool_result["is_error"]:
+                                context["statistics"]["errors"] += 1
+                                context["errors"].append(tool_result)
+
+                            context["tool_results"].append(tool_result)
+
+                # Include messages if requested
+                if include_messages:
+                    if isinstance(content, str) and content:
+                        context["messages"].append({
+                            "timestamp": timestamp,
+                            "role": "user",
+                            "content": content,
+                        })
+                    elif isinstance(content, list):
+                        # Extract text content from list-format messages
+                        text_parts = []
                         for block in content:
-                            if block.get("type") == "tool_result":
-                                context["statistics"]["tool_results"] += 1
-                                result_content = str(block.get("content", ""))
-
-                                tool_result = {
-                                    "timestamp": timestamp,
-                                    "tool_use_id": block.get("tool_use_id"),
-                                    "is_error": "error" in result_content.lower() or "failed" in result_content.lower(),
-                                    "content_preview": result_content[:500] + ("..." if len(result_content) > 500 else ""),
-                                }
-
-                                if tool_result["is_error"]:
-                                    context["statistics"]["errors"] += 1
-                                    context["errors"].append(tool_result)
-
-                                context["tool_results"].append(tool_result)
-
-                    # Include messages if requested
-                    if include_messages:
-                        if isinstance(content, str) and content:
+                            if isinstance(block, dict) and block.get("type") == "text":
+                                text_parts.append(block.get("text", ""))
+                        if text_parts:
                             context["messages"].append({
                                 "timestamp": timestamp,
                                 "role": "user",
-                                "content": content,
+                                "content": " ".join(text_parts),
                             })
-                        elif isinstance(content, list):
-                            # Extract text content from list-format messages
-                            text_parts = []
-                            for block in content:
-                                if isinstance(block, dict) and block.get("type") == "text":
-                                    text_parts.append(block.get("text", ""))
-                            if text_parts:
-                                context["messages"].append({
-                                    "timestamp": timestamp,
-                                    "role": "user",
-                                    "content": " ".join(text_parts),
-                                })
 
-                elif entry_type == "assistant":
-                    context["statistics"]["assistant_messages"] += 1
-                    content = entry.get("message", {}).get("content", [])
+            elif entry_type == "assistant":
+                context["statistics"]["assistant_messages"] += 1
+                content = entry.get("message", {}).get("content", [])
 
-                    if isinstance(content, list):
-                        for block in content:
-                            block_type = block.get("type")
+                if isinstance(content, list):
+                    for block in content:
+                        block_type = block.get("type")
 
-                            if block_type == "tool_use":
-                                context["statistics"]["tool_calls"] += 1
-                                tool_call = {
+                        if block_type == "tool_use":
+                            context["statistics"]["tool_calls"] += 1
+                            tool_call = {
+                                "timestamp": timestamp,
+                                "id": block.get("id"),
+                                "name": block.get("name"),
+                                "input": block.get("input", {}),
+                            }
+                            context["tool_calls"].append(tool_call)
+
+                        elif block_type == "text" and include_messages:
+                            text = block.get("text", "")
+                            if text:
+                                context["messages"].append({
                                     "timestamp": timestamp,
-                                    "id": block.get("id"),
-                                    "name": block.get("name"),
-                                    "input": block.get("input", {}),
-                                }
-                                context["tool_calls"].append(tool_call)
-
-                            elif block_type == "text" and include_messages:
-                                text = block.get("text", "")
-                                if text:
-                                    context["messages"].append({
-                                        "timestamp": timestamp,
-                                        "role": "assistant",
-                                        "content": text[:2000] + ("..." if len(text) > 2000 else ""),
-                                    })
+                                    "role": "assistant",
+                                    "content": text[:2000] + ("..." if len(text) > 2000 else ""),
+                                })
 
         # Calculate duration
         if context["metadata"]["start_time"] and context["metadata"]["end_time"]:
@@ -206,13 +220,36 @@ def get_session_context(session_file: Path, include_messages: bool = False) -> d
     return context
 
 
-def main():
+def main(argv=None):
     parser = argparse.ArgumentParser(description="Get full session context for debugging")
     parser.add_argument("--session-id", required=True, help="Session UUID to analyze")
     parser.add_argument("--include-messages", action="store_true",
                         help="Include full message content (verbose)")
-
-    args = parser.parse_args()
+    parser.add_argument("--active-path", action="store_true",
+                        help="Only count entries on the active conversation path (skip abandoned branches and sidechains)")
+    window = parser.add_argument_group("windows (seek via the line-offset index)")
+    window.add_argument("--from", dest="from_time", metavar="TIME",
+                        help="Only entries at or after this ISO time")
+    window.add_argument("--to", dest="to_time", metavar="TIME",
+                        help="Only entries at or before this ISO time")
+    window.add_argument("--around", metavar="TOOL_USE_ID",
+                        help="Only the lines around one tool call and its result")
+    window.add_argument("--context-lines", type=int, default=20,
+                        help="Lines before the call and after its result for --around (default 20)")
+    window.add_argument("--page", type=int,
+                        help="Page of tool calls, 1 = most recent (see --page-size)")
+    window.add_argument("--page-size", type=int, default=100,
+                        help="Tool calls per page (default 100)")
+    add_profile_args(parser)
+
+    args = parser.parse_args(argv)
+    configure(args)
+
+    modes = [bool(args.from_time or args.to_time), bool(args.around), args.page is not None]
+    if sum(modes) > 1:
+        parser.error("--from/--to, --around and --page cannot be combined")
+    if args.page is not None and (args.page < 1 or args.page_size < 1):
+        parser.error("--page and --page-size must be at least 1")
 
     # Find session file
     session_file = find_session_file(args.session_id)
@@ -226,10 +263,66 @@ def main():
         print(json.dumps(result, indent=2))
         return 1
 
-    context = get_session_context(session_file, args.include_messages)
+    line_mask = None
+    dag_info = None
+    if args.active_path:
+        from conversation_dag import build_dag
+
+        dag = build_dag(session_file)
+        line_mask = dag.line_mask()
+        dag_info = dag.describe()
+
+    window = None
+    start_line, stop_line, start_offset, page_ids = 0, None, 0, None
+    if any(modes):
+        from offset_index import load_offset_index, normalize_timestamp
+
+        index = load_offset_index(session_file)
+        window = {"total_lines": index.lines}
+        if args.around:
+            span = index.around(args.around, args.context_lines)
+            if span is None:
+                result = {
+                    "status": "error",
+                    "error": f"Tool call '{args.around}' not found in session",
+                    "session_id": args.session_id,
+                }
+                print(json.dumps(result, indent=2))
+                return 1
+            start_line, stop_line = span
+            window.update(mode="around", tool_use_id=args.around)
+        elif args.page is not None:
+            start_line, stop_line, pages, page_ids = index.tool_call_page(args.page, args.page_size)
+            window.update(mode="page", page=args.page, page_size=args.page_size, pages=pages)
+        else:
+            try:
+                start = normalize_timestamp(args.from_time) if args.from_time else None
+                end = normalize_timestamp(args.to_time) if args.to_time else None
+            except ValueError as e:
+                parser.error(f"invalid --from/--to time: {e}")
+            start_line, stop_line = index.time_range(start, end)
+            window.update(mode="time", start=start, end=end)
+        window.update(start_line=start_line, stop_line=stop_line)
+        start_offset = index.offset(start_line)
+
+    context = get_session_context(session_file, args.include_messages, line_mask,
+                                  start_line, stop_line, start_offset)
+    if page_ids is not None:
+        wanted = set(page_ids)
+        context["tool_calls"] = [c for c in context["tool_calls"] if c["id"] in wanted]
+        context["tool_results"] = [r for r in context["tool_results"] if r.get("tool_use_id") in wanted]
+    if window is not None:
+        context["window"] = window
+    if dag_info is not None:
+        context["conversation"] = {
+            k: dag_info[k]
+            for k in ("active_path_length", "abandoned_entries", "sidechain_entries",
+                      "branch_points", "compaction_boundaries")
+        }
+    context["active_path_only"] = args.active_path
     context["status"] = "success"
 
-    print(json.dumps(context, indent=2, default=str))
+    emit_json(context)
     return 0
 
 
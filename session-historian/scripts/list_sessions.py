@@ -5,6 +5,8 @@ List recent Claude Code sessions with metadata.
 Usage:
     python list_sessions.py --project claude-life-dev --days 7
     python list_sessions.py --project claude-life-dev --days 7 --limit 10
+    python list_sessions.py --project claude-life-dev --days 7 --tree
+    python list_sessions.py --project claude-life-dev --days 7 --active-path
 
 Output: JSON with session list including id, start/end time, duration, tools used, error count.
 """
@@ -17,6 +19,10 @@ from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import Optional
 
+from cursors import after_cursor, decode_cursor, encode_cursor, ordered_sessions
+from perf import add_profile_args, configure, emit_json, timed
+from session_io import iter_entries, mentions_error, session_id_from_path
+
 
 def encode_project_path(project_name: str) -> str:
     """Convert project name to encoded path format.
@@ -29,6 +35,7 @@ def encode_project_path(project_name: str) -> str:
     return None  # Will search for matching dirs
 
 
+@timed("walk")
 def find_project_dir(project_name: str) -> Optional[Path]:
     """Find the project directory in ~/.claude/projects/"""
     claude_projects = Path.home() / ".claude" / "projects"
@@ -57,10 +64,15 @@ def find_project_dir(project_name: str) -> Optional[Path]:
     return candidates[0] if candidates else None
 
 
-def get_session_metadata(session_file: Path) -> dict:
-    """Extract metadata from a session file."""
+@timed("process")
+def get_session_metadata(session_file: Path, line_mask: Optional[bytearray] = None) -> dict:
+    """Extract metadata from a session file.
+
+    ``line_mask`` (from conversation_dag) restricts the counts to the lines
+    flagged 1, e.g. the active conversation path.
+    """
     metadata = {
-        "session_id": session_file.stem,
+        "session_id": session_id_from_path(session_file),
         "file_path": str(session_file),
         "file_size_kb": round(session_file.stat().st_size / 1024, 1),
         "start_time": None,
@@ -81,65 +93,56 @@ def get_session_metadata(session_file: Path) -> dict:
     last_timestamp = None
 
     try:
-        with open(session_file, 'r') as f:
-            for line in f:
-                if not line.strip():
-                    continue
-                try:
-                    entry = json.loads(line)
-                except json.JSONDecodeError:
-                    continue
-
-                entry_type = entry.get("type")
-                timestamp = entry.get("timestamp")
-
-                # Track timestamps
-                if timestamp:
+        for entry in iter_entries(session_file, line_mask=line_mask):
+            entry_type = entry.get("type")
+            timestamp = entry.get("timestamp")
+
+            # Track timestamps
+            if timestamp:
+                if first_timestamp is None:
+                    first_timestamp = timestamp
+                last_timestamp = timestamp
+
+            # Also check snapshot timestamps
+            if entry_type == "file-history-snapshot":
+                snap_ts = entry.get("snapshot", {}).get("timestamp")
+                if snap_ts:
                     if first_timestamp is None:
-                        first_timestamp = timestamp
-                    last_timestamp = timestamp
-
-                # Also check snapshot timestamps
-                if entry_type == "file-history-snapshot":
-                    snap_ts = entry.get("snapshot", {}).get("timestamp")
-                    if snap_ts:
-                        if first_timestamp is None:
-                            first_timestamp = snap_ts
-                        last_timestamp = snap_ts
-
-                # Count messages
-                if entry_type == "user":
-                    metadata["message_count"] += 1
-                    metadata["user_messages"] += 1
-
-                    # Check for tool results with errors
-                    content = entry.get("message", {}).get("content", [])
-                    if isinstance(content, list):
-                        for block in content:
-                            if block.get("type") == "tool_result":
-                                result = str(block.get("content", "")).lower()
-                                if "error" in result or "failed" in result:
-                                    metadata["error_count"] += 1
-
-                    # Get context info from first user message
-                    if metadata["git_branch"] is None:
-                        metadata["git_branch"] = entry.get("gitBranch")
-                        metadata["cwd"] = entry.get("cwd")
-
-                elif entry_type == "assistant":
-                    metadata["message_count"] += 1
-                    metadata["assistant_messages"] += 1
-
-                    # Count tool calls
-                    content = entry.get("message", {}).get("content", [])
-                    if isinstance(content, list):
-                        for block in content:
-                            if block.get("type") == "tool_use":
-                                metadata["tool_calls"] += 1
-                                metadata["tools_used"].add(block.get("name", "unknown"))
-
-                elif entry_type == "summary":
-                    metadata["summary"] = entry.get("summary")
+                        first_timestamp = snap_ts
+                    last_timestamp = snap_ts
+
+            # Count messages
+            if entry_type == "user":
+                metadata["message_count"] += 1
+                metadata["user_messages"] += 1
+
+                # Check for tool results with errors
+                content = entry.get("message", {}).get("content", [])
+                if isinstance(content, list):
+                    for block in content:
+                        if block.get("type") == "tool_result":
+                            if mentions_error(str(block.get("content", ""))):
+                                metadata["error_count"] += 1
+
+                # Get context info from first user message
+                if metadata["git_branch"] is None:
+                    metadata["git_branch"] = entry.get("gitBranch")
+                    metadata["cwd"] = entry.get("cwd")
+
+            elif entry_type == "assistant":
+                metadata["message_count"] += 1
+                metadata["assistant_messages"] += 1
+
+                # Count tool calls
+                content = entry.get("message", {}).get("content", [])
+                if isinstance(content, list):
+                    for block in content:
+                        if block.get("type") == "tool_use":
+                            metadata["tool_calls"] += 1
+                            metadata["tools_used"].add(block.get("name", "unknown"))
+
+            elif entry_type == "summary":
+                metadata["summary"] = entry.get("summary")
 
         # Parse timestamps
         if first_timestamp:
@@ -165,13 +168,22 @@ def get_session_metadata(session_file: Path) -> dict:
     return metadata
 
 
-def main():
+def main(argv=None):
     parser = argparse.ArgumentParser(description="List recent Claude Code sessions")
     parser.add_argument("--project", required=True, help="Project name to filter sessions")
     parser.add_argument("--days", type=int, default=7, help="Number of days to look back")
     parser.add_argument("--limit", type=int, default=50, help="Maximum sessions to return")
-
-    args = parser.parse_args()
+    parser.add_argument("--tree", action="store_true",
+                        help="Fold sub-agent sessions into their parent and roll up tree totals")
+    parser.add_argument("--active-path", action="store_true",
+                        help="Only count entries on the active conversation path (skip abandoned branches and sidechains)")
+    parser.add_argument("--cursor", help="Resume after the page that returned this next_cursor")
+    add_profile_args(parser)
+
+    args = parser.parse_args(argv)
+    if args.limit < 1:
+        parser.error("--limit must be at least 1")
+    configure(args)
 
     # Find project directory
     project_dir = find_project_dir(args.project)
@@ -189,35 +201,43 @@ def main():
     # Calculate cutoff date
     cutoff = datetime.now(timezone.utc) - timedelta(days=args.days)
 
-    # Find all session files
-    session_files = list(project_dir.glob("*.jsonl"))
+    query = {"command": "list", "project": str(project_dir), "days": args.days,
+             "tree": args.tree, "active_path": args.active_path}
+    try:
+        after = decode_cursor(args.cursor, query) if args.cursor else None
+    except ValueError as e:
+        result = {"status": "error", "error": f"Invalid --cursor: {e}", "project": args.project, "sessions": []}
+        print(json.dumps(result, indent=2))
+        return 1
+
+    if args.active_path:
+        from conversation_dag import active_line_mask
 
-    # Get metadata for each session
-    sessions = []
-    for session_file in session_files:
-        # Quick filter by file modification time
-        mtime = datetime.fromtimestamp(session_file.stat().st_mtime, tz=timezone.utc)
-        if mtime < cutoff:
-            continue
+    exclude = None
+    if args.tree:
+        from agent_tree import load_project_tree, rollup_tree, tree_members
 
-        metadata = get_session_metadata(session_file)
+        aggregates, index, children = load_project_tree(project_dir)
+        exclude = set(index)
 
-        # Filter by actual start time if available
-        if metadata["start_time"]:
-            try:
-                start = datetime.fromisoformat(metadata["start_time"].replace("Z", "+00:00"))
-                if start < cutoff:
-                    continue
-            except (ValueError, TypeError):
-                pass
+    # Order live and archived sessions by start time from the cached start
+    # times, then parse only the sessions on this page
+    remaining = after_cursor(ordered_sessions([project_dir], cutoff, exclude=exclude), after)
+    page = remaining[:args.limit]
 
+    sessions = []
+    for item in page:
+        line_mask = None
+        if args.active_path:
+            line_mask = active_line_mask(item.path)
+
+        metadata = get_session_metadata(item.path, line_mask)
+        if args.tree:
+            metadata["agents"] = tree_members(metadata["session_id"], children)[1:]
+            metadata["tree_rollup"] = rollup_tree(metadata["session_id"], aggregates, children)
         sessions.append(metadata)
 
-    # Sort by start time (newest first)
-    sessions.sort(key=lambda x: x.get("start_time") or "", reverse=True)
-
-    # Apply limit
-    sessions = sessions[:args.limit]
+    next_cursor = encode_cursor(page[-1].key, query) if page and len(remaining) > len(page) else None
 
     result = {
         "status": "success",
@@ -225,11 +245,14 @@ def main():
         "project_dir": str(project_dir),
         "days": args.days,
         "limit": args.limit,
+        "tree": args.tree,
+        "active_path_only": args.active_path,
         "total_sessions": len(sessions),
-        "sessions": sessions
+        "sessions": sessions,
+        "next_cursor": next_cursor,
     }
 
-    print(json.dumps(result, indent=2, default=str))
+    emit_json(result)
     return 0
 
 
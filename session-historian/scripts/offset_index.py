@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Per-session line-offset index for random access into large sessions.
+
+For every line of a session the index records its byte offset and
+timestamp, plus the lines holding each tool_use, each tool_result and each
+user prompt. Readers use it to seek straight to a time window, the
+neighbourhood of one tool call or a page of tool calls instead of parsing
+the file from the top.
+
+Indexes live in the cache (offsets/<project>/<session>.json). A session
+that has only grown since it was indexed is indexed from the old end, so
+keeping the index current costs as much as reading the new lines.
+
+Usage:
+    python offset_index.py --session-id <uuid>
+
+Output: JSON with the index size and the first and last timestamps.
+"""
+
+import argparse
+import json
+import sys
+import zlib
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from perf import PERF, add_profile_args, configure, emit_json, timed
+from session_cache import file_signature, load_json_cache, save_json_cache
+from session_io import is_archived, open_session, resolve_session_file, session_id_from_path
+
+INDEX_VERSION = 1
+
+# Bytes hashed from the start of the file to detect rewrites
+HEAD_BYTES = 4096
+
+
+def find_session_file(session_id: str) -> Optional[Path]:
+    """Find a session file by its ID across all projects."""
+    claude_projects = Path.home() / ".claude" / "projects"
+
+    if not claude_projects.exists():
+        return None
+
+    for project_dir in claude_projects.iterdir():
+        if not project_dir.is_dir():
+            continue
+
+        session_file = resolve_session_file(project_dir, session_id)
+        if session_file is not None:
+            return session_file
+
+        if not session_id.startswith("agent-"):
+            agent_file = resolve_session_file(project_dir, f"agent-{session_id}")
+            if agent_file is not None:
+                return agent_file
+
+    return None
+
+
+def _head_crc(session_file: Path, size: int) -> int:
+    with open(session_file, "rb") as f:
+        return zlib.crc32(f.read(min(size, HEAD_BYTES)))
+
+
+def normalize_timestamp(value: str) -> str:
+    """Render a user-supplied ISO time the way session entries write it (UTC, ms, Z).
+
+    Session timestamps then compare correctly as plain strings.
+    """
+    dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    dt = dt.astimezone(timezone.utc)
+    return dt.strftime("%Y-%m-%dT%H:%M:%S.") + f"{dt.microsecond // 1000:03d}Z"
+
+
+class OffsetIndex:
+    """Line offsets, timestamps and tool/user line numbers for one session."""
+
+    def __init__(self, data: dict):
+        self.data = data
+        self.offsets: List[int] = data["offsets"]
+        self.timestamps: List[Optional[str]] = data["timestamps"]
+        self.tool_uses: dict = data["tool_uses"]          # tool_use_id -> line
+        self.tool_results: dict = data["tool_results"]    # tool_use_id -> line
+        self.user_messages: List[int] = data["user_messages"]
+
+    @property
+    def lines(self) -> int:
+        return len(self.offsets)
+
+    def offset(self, line_no: int) -> int:
+        """Byte offset of ``line_no`` (0 for archives, which seek by frame)."""
+        if self.data["archived"] or line_no <= 0 or line_no >= len(self.offsets):
+            return 0
+        return self.offsets[line_no]
+
+    def time_range(self, start: Optional[str] = None, end: Optional[str] = None) -> Tuple[int, int]:
+        """Lines [first, stop) whose timestamps fall within [start, end].
+
+        Lines without a timestamp between two in-window lines are included.
+        """
+        first, stop = None, 0
+        for line_no, ts in enumerate(self.timestamps):
+            if ts is None:
+                continue
+            if (start is None or ts >= start) and (end is None or ts <= end):
+                if first is None:
+                    first = line_no
+                stop = line_no + 1
+        if first is None:
+            return 0, 0
+        return first, stop
+
+    def around(self, tool_use_id: str, context: int) -> Optional[Tuple[int, int]]:
+        """Lines from ``context`` before a tool call to ``context`` after its result."""
+        line_no = self.tool_uses.get(tool_use_id)
+        if line_no is None:
+            return None
+        last = max(line_no, self.tool_results.get(tool_use_id, line_no))
+        return max(0, line_no - context), min(self.lines, last + context + 1)
+
+    def tool_call_page(self, page: int, page_size: int) -> Tuple[int, int, int, List[str]]:
+        """Page ``page`` (1 = newest) of tool calls: (first, stop, page count, tool_use ids).
+
+        The line range runs from the page's oldest tool call to the last
+        result of any call on the page.
+        """
+        calls = sorted(self.tool_uses.items(), key=lambda item: item[1])
+        pages = max(1, -(-len(calls) // page_size))
+        end = len(calls) - (page - 1) * page_size
+        chosen = calls[max(0, end - page_size):max(0, end)]
+        if not chosen:
+            return 0, 0, pages, []
+        stop = max(self.tool_results.get(tool_id, line_no) for tool_id, line_no in chosen) + 1
+        return chosen[0][1], stop, pages, [tool_id for tool_id, _ in chosen]
+
+
+def _index_lines(f, data: dict, line_no: int, pos: int) -> None:
+    """Append index records for the lines of ``f`` starting at ``line_no``/``pos``."""
+    offsets = data["offsets"]
+    timestamps = data["timestamps"]
+    tool_uses = data["tool_uses"]
+    tool_results = data["tool_results"]
+    user_messages = data["user_messages"]
+
+    for raw in f:
+        if not raw.endswith(b"\n"):
+            break  # the last line is still being written; pick it up next time
+        offsets.append(pos)
+        pos += len(raw)
+        try:
+            entry = json.loads(raw)
+        except ValueError:
+            entry = None
+        if not isinstance(entry, dict):
+            timestamps.append(None)
+            line_no += 1
+            continue
+
+        timestamps.append(entry.get("timestamp"))
+        entry_type = entry.get("type")
+        content = (entry.get("message") or {}).get("content")
+        if entry_type == "user":
+            if isinstance(content, str):
+                user_messages.append(line_no)
+            elif isinstance(content, list):
+                for block in content:
+                    if isinstance(block, dict) and block.get("type") == "tool_result":
+                        tool_results[block.get("tool_use_id", "")] = line_no
+        elif entry_type == "assistant" and isinstance(content, list):
+            for block in content:
+                if isinstance(block, dict) and block.get("type") == "tool_use" and block.get("id"):
+                    tool_uses[block["id"]] = line_no
+        line_no += 1
+
+    data["size"] = pos
+
+
+@timed("index")
+def load_offset_index(session_file: Path, use_cache: bool = True) -> OffsetIndex:
+    """Return an up-to-date index, re-reading only lines appended since the last call."""
+    cache_name = f"offsets/{session_file.parent.name}/{session_id_from_path(session_file)}.json"
+    data = load_json_cache(cache_name) if use_cache else None
+    sig = file_signature(session_file)
+    archived = is_archived(session_file)
+
+    if data and data.get("index_version") == INDEX_VERSION and data.get("archived") == archived:
+        if data["sig"] == sig:
+            PERF.count("cache_hits")
+            return OffsetIndex(data)
+        # A live session that only grew: index the new tail
+        if (not archived and sig[0] >= data["size"]
+                and _head_crc(session_file, data["size"]) == data["head_crc"]):
+            PERF.count("cache_partial_hits")
+            with open(session_file, "rb") as f:
+                f.seek(data["size"])
+                _index_lines(f, data, len(data["offsets"]), data["size"])
+            data["sig"] = sig
+            if use_cache:
+                save_json_cache(cache_name, data)
+            return OffsetIndex(data)
+
+    PERF.count("cache_misses")
+    data = {
+        "index_version": INDEX_VERSION,
+        "archived": archived,
+        "sig": sig,
+        "size": 0,
+        "offsets": [],
+        "timestamps": [],
+        "tool_uses": {},
+        "tool_results": {},
+        "user_messages": [],
+    }
+    with open_session(session_file) as (f, _):
+        _index_lines(f, data, 0, 0)
+    data["head_crc"] = 0 if archived else _head_crc(session_file, data["size"])
+    if use_cache:
+        save_json_cache(cache_name, data)
+    return OffsetIndex(data)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or refresh the line-offset index of a session")
+    parser.add_argument("--session-id", required=True, help="Session UUID to index")
+    add_profile_args(parser)
+
+    args = parser.parse_args(argv)
+    configure(args)
+
+    session_file = find_session_file(args.session_id)
+    if session_file is None:
+        result = {
+            "status": "error",
+            "error": f"Session '{args.session_id}' not found",
+            "session_id": args.session_id
+        }
+        print(json.dumps(result, indent=2))
+        return 1
+
+    index = load_offset_index(session_file)
+    stamped = [ts for ts in index.timestamps if ts]
+    result = {
+        "status": "success",
+        "session_id": session_id_from_path(session_file),
+        "file_path": str(session_file),
+        "lines": index.lines,
+        "indexed_bytes": index.data["size"],
+        "tool_uses": len(index.tool_uses),
+        "tool_results": len(index.tool_results),
+        "user_messages": len(index.user_messages),
+        "first_timestamp": stamped[0] if stamped else None,
+        "last_timestamp": stamped[-1] if stamped else None,
+    }
+
+    emit_json(result)
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except Exception as e:
+        print(json.dumps({"status": "error", "error": str(e)}), file=sys.stderr)
+        sys.exit(1)
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Opt-in performance instrumentation for the session-historian scripts.
+
+Every script accepts:
+    --profile                   add a "_perf" section to the JSON output
+    --profile-out PATH          also write cProfile stats (load with pstats)
+    --profile-collapsed PATH    also write sampled stacks in collapsed format
+                                (one "frame;frame;frame count" per line, as
+                                consumed by flamegraph.pl / speedscope)
+
+The "_perf" section reports wall and CPU time per phase, counters such as
+bytes read, lines decoded and lines skipped by a prefilter, cache hit ratios
+and peak RSS. Phases:
+    walk        locating project directories and session files
+    process     per-session work in the scripts' core functions
+    decode      json.loads inside the shared reader (part of process)
+    index       building or refreshing line-offset indexes
+    serialize   building the JSON output
+
+When profiling is off the recorder's methods return immediately, so the
+instrumentation costs next to nothing on normal runs.
+"""
+
+import functools
+import json
+import sys
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Optional
+
+
+class PerfRecorder:
+    """Collects phase timings and counters for one script run."""
+
+    def __init__(self):
+        self.enabled = False
+        self.phases = {}
+        self.counters = Counter()
+        self._started = None
+        self._profiler = None
+        self._profile_out = None
+        self._sampler = None
+
+    def enable(self) -> None:
+        self.enabled = True
+        self._started = (time.perf_counter(), time.process_time())
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time a block; nested or repeated phases of the same name accumulate."""
+        if not self.enabled:
+            yield
+            return
+        wall0, cpu0 = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - wall0, time.process_time() - cpu0)
+
+    def add_time(self, name: str, wall: float, cpu: float = 0.0, calls: int = 1) -> None:
+        phase = self.phases.setdefault(name, {"wall_ms": 0.0, "cpu_ms": 0.0, "calls": 0})
+        phase["wall_ms"] += wall * 1000
+        phase["cpu_ms"] += cpu * 1000
+        phase["calls"] += calls
+
+    def count(self, name: str, n: int = 1) -> None:
+        if self.enabled:
+            self.counters[name] += n
+
+    def report(self) -> dict:
+        """Return the "_perf" section."""
+        wall0, cpu0 = self._started or (time.perf_counter(), time.process_time())
+        counters = dict(self.counters)
+        hits, misses = counters.get("cache_hits", 0), counters.get("cache_misses", 0)
+        return {
+            "total_wall_ms": round((time.perf_counter() - wall0) * 1000, 2),
+            "total_cpu_ms": round((time.process_time() - cpu0) * 1000, 2),
+            "phases": {
+                name: {"wall_ms": round(p["wall_ms"], 2), "cpu_ms": round(p["cpu_ms"], 2), "calls": p["calls"]}
+                for name, p in self.phases.items()
+            },
+            "counters": counters,
+            "cache_hit_ratio": round(hits / (hits + misses), 3) if hits + misses else None,
+            "peak_rss_mb": peak_rss_mb(),
+        }
+
+
+PERF = PerfRecorder()
+
+
+def timed(phase: str):
+    """Decorator: account each call of the function to ``phase``."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not PERF.enabled:
+                return func(*args, **kwargs)
+            with PERF.phase(phase):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process in MB, if the platform reports it."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS reports bytes
+    return round(rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+class StackSampler:
+    """Sample the main thread's Python stack on a CPU-time timer.
+
+    Produces collapsed stacks ("outer;inner;leaf count") for flame graphs.
+    Unix only (uses SIGPROF); silently does nothing elsewhere.
+    """
+
+    def __init__(self, interval: float = 0.001):
+        self.interval = interval
+        self.stacks = Counter()
+        self._signal = None
+
+    def _handler(self, signum, frame):
+        parts = []
+        while frame is not None:
+            code = frame.f_code
+            parts.append(f"{code.co_name} ({code.co_filename.rsplit('/', 1)[-1]}:{code.co_firstlineno})")
+            frame = frame.f_back
+        self.stacks[";".join(reversed(parts))] += 1
+
+    def start(self) -> None:
+        try:
+            import signal
+            signal.signal(signal.SIGPROF, self._handler)
+            signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+            self._signal = signal
+        except (ImportError, AttributeError, ValueError, OSError):
+            self._signal = None
+
+    def stop(self) -> None:
+        if self._signal:
+            self._signal.setitimer(self._signal.ITIMER_PROF, 0, 0)
+            self._signal.signal(self._signal.SIGPROF, self._signal.SIG_DFL)
+
+    def write(self, path: str) -> None:
+        with open(path, "w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+def add_profile_args(parser) -> None:
+    """Register --profile, --profile-out and --profile-collapsed on an argparse parser."""
+    parser.add_argument("--profile", action="store_true",
+                        help="Add a _perf section with phase timings, counters and peak RSS")
+    parser.add_argument("--profile-out", metavar="PATH",
+                        help="Write cProfile stats to PATH (implies --profile)")
+    parser.add_argument("--profile-collapsed", metavar="PATH",
+                        help="Write sampled collapsed stacks for flame graphs to PATH (implies --profile)")
+
+
+def configure(args) -> None:
+    """Enable the recorder and profilers requested on the command line."""
+    if not (getattr(args, "profile", False) or getattr(args, "profile_out", None)
+            or getattr(args, "profile_collapsed", None)):
+        return
+    PERF.enable()
+    if args.profile_out:
+        import cProfile
+        PERF._profiler = cProfile.Profile()
+        PERF._profile_out = args.profile_out
+        PERF._profiler.enable()
+    if args.profile_collapsed:
+        PERF._sampler = StackSampler()
+        PERF._sampler._out = args.profile_collapsed
+        PERF._sampler.start()
+
+
+def _finish_profilers(report: dict) -> None:
+    if PERF._profiler is not None:
+        PERF._profiler.disable()
+        PERF._profiler.dump_stats(PERF._profile_out)
+        report["profile_out"] = PERF._profile_out
+    if PERF._sampler is not None:
+        PERF._sampler.stop()
+        PERF._sampler.write(PERF._sampler._out)
+        report["profile_collapsed"] = PERF._sampler._out
+        report["samples"] = sum(PERF._sampler.stacks.values())
+
+
+def emit_json(result: dict) -> None:
+    """Print a script's JSON result, adding the _perf section when profiling."""
+    with PERF.phase("serialize"):
+        text = json.dumps(result, indent=2, default=str)
+    if PERF.enabled:
+        report = PERF.report()
+        _finish_profilers(report)
+        result["_perf"] = report
+        text = json.dumps(result, indent=2, default=str)
+    print(text)
@@ -6,11 +6,13 @@ Usage:
     python search_sessions.py --project claude-life-dev --days 7 --text "WebSocket"
     python search_sessions.py --tool "gh" --command "/feat" --has-errors
     python search_sessions.py --file "gateway.ts" --min-duration 30
+    python search_sessions.py --text "Traceback" --in results,thinking
 
 Available filters:
     --project       Filter by project name
     --days          Limit to last N days
     --text          Full-text search in messages
+    --in            Where --text looks: messages,results,thinking,inputs
     --tool          Sessions that used specific tool
     --command       Sessions that ran specific command
     --file          Sessions that touched specific file
@@ -27,9 +29,62 @@ import re
 import sys
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import List, Optional
-
-
+from typing import Iterator, List, Optional
+
+from cursors import after_cursor, decode_cursor, encode_cursor, ordered_sessions
+from perf import add_profile_args, configure, emit_json, timed
+from session_io import find_text, iter_entries, mentions_error, session_id_from_path
+
+# Places --text can look. "messages" is the historical default (user prompts
+# and assistant text); the rest opt in to the much larger tool payloads.
+SEARCH_SCOPES = ("messages", "results", "thinking", "inputs")
+
+def match_preview(text: str, idx: int, width: int = 100) -> str:
+    """Return a window of ``text`` around a match index."""
+    start = max(0, min(idx, len(text)) - width // 3)
+    return text[start:start + width]
+
+
+def iter_result_texts(content) -> Iterator[str]:
+    """Yield the text pieces of a tool_result, which may be a string or a list of blocks."""
+    if isinstance(content, str):
+        yield content
+    elif isinstance(content, list):
+        for block in content:
+            if isinstance(block, dict) and block.get("type") == "text":
+                text = block.get("text")
+                if isinstance(text, str):
+                    yield text
+            elif isinstance(block, str):
+                yield block
+
+
+def iter_input_strings(value) -> Iterator[str]:
+    """Yield every string value nested inside a tool_use input."""
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from iter_input_strings(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from iter_input_strings(item)
+
+
+def parse_scopes(value: str) -> List[str]:
+    """Parse a comma-separated --in value into a list of known scopes."""
+    scopes = [s.strip() for s in value.split(",") if s.strip()]
+    if "all" in scopes:
+        return list(SEARCH_SCOPES)
+    unknown = [s for s in scopes if s not in SEARCH_SCOPES]
+    if unknown or not scopes:
+        raise argparse.ArgumentTypeError(
+            f"invalid scope(s) {', '.join(unknown) or value!r}; choose from {', '.join(SEARCH_SCOPES)} or all"
+        )
+    return scopes
+
+
+@timed("walk")
 def find_project_dirs(project_name: Optional[str] = None) -> List[Path]:
     """Find project directories, optionally filtered by name."""
     claude_projects = Path.home() / ".claude" / "projects"
@@ -56,10 +111,11 @@ def find_project_dirs(project_name: Optional[str] = None) -> List[Path]:
     return matches
 
 
+@timed("process")
 def search_session(session_file: Path, filters: dict) -> Optional[dict]:
     """Search a single session file and return match info if it matches all filters."""
     match_info = {
-        "session_id": session_file.stem,
+        "session_id": session_id_from_path(session_file),
         "file_path": str(session_file),
         "matches": [],
         "start_time": None,
@@ -71,6 +127,12 @@ def search_session(session_file: Path, filters: dict) -> Optional[dict]:
     }
 
     text_pattern = filters.get("text")
+    scopes = set(filters.get("in") or ["messages"])
+    pattern_lower = text_pattern.lower() if text_pattern else None
+    search_messages = bool(text_pattern) and "messages" in scopes
+    search_results = bool(text_pattern) and "results" in scopes
+    search_thinking = bool(text_pattern) and "thinking" in scopes
+    search_inputs = bool(text_pattern) and "inputs" in scopes
     tool_filter = filters.get("tool")
     command_filter = filters.get("command")
     file_filter = filters.get("file")
@@ -84,100 +146,141 @@ def search_session(session_file: Path, filters: dict) -> Optional[dict]:
     file_matched = file_filter is None
 
     try:
-        with open(session_file, 'r') as f:
-            for line in f:
-                if not line.strip():
-                    continue
-                try:
-                    entry = json.loads(line)
-                except json.JSONDecodeError:
-                    continue
-
-                entry_type = entry.get("type")
-                timestamp = entry.get("timestamp")
-
-                # Track times
-                if timestamp:
-                    if match_info["start_time"] is None:
-                        match_info["start_time"] = timestamp
-                    match_info["end_time"] = timestamp
-
-                # Text search in user messages
-                if entry_type == "user" and text_pattern:
-                    content = entry.get("message", {}).get("content", "")
-                    if isinstance(content, str) and text_pattern.lower() in content.lower():
-                        text_matched = True
+        for entry in iter_entries(session_file):
+            entry_type = entry.get("type")
+            timestamp = entry.get("timestamp")
+
+            # Track times
+            if timestamp:
+                if match_info["start_time"] is None:
+                    match_info["start_time"] = timestamp
+                match_info["end_time"] = timestamp
+
+            # Files Claude changed are also tracked in snapshots
+            if entry_type == "file-history-snapshot" and file_filter:
+                tracked = (entry.get("snapshot") or {}).get("trackedFileBackups") or {}
+                for file_path in tracked:
+                    if file_filter in file_path:
+                        file_matched = True
                         match_info["matches"].append({
-                            "type": "text",
-                            "location": "user_message",
-                            "preview": content[:100]
+                            "type": "file",
+                            "operation": "snapshot",
+                            "file": file_path
                         })
 
-                # Check for errors
-                if entry_type == "user":
-                    content = entry.get("message", {}).get("content", [])
-                    if isinstance(content, list):
-                        for block in content:
-                            if block.get("type") == "tool_result":
-                                result = str(block.get("content", "")).lower()
-                                if "error" in result or "failed" in result:
-                                    match_info["error_count"] += 1
-
-                # Text search in assistant messages
-                if entry_type == "assistant":
-                    content = entry.get("message", {}).get("content", [])
-                    if isinstance(content, list):
-                        for block in content:
-                            if block.get("type") == "text" and text_pattern:
-                                text = block.get("text", "")
-                                if text_pattern.lower() in text.lower():
-                                    text_matched = True
+            # Text search in user messages
+            if entry_type == "user" and search_messages:
+                content = entry.get("message", {}).get("content", "")
+                if isinstance(content, str) and find_text(content, pattern_lower) != -1:
+                    text_matched = True
+                    match_info["matches"].append({
+                        "type": "text",
+                        "location": "user_message",
+                        "preview": content[:100]
+                    })
+
+            # Check for errors (and search tool results in the same walk)
+            if entry_type == "user":
+                content = entry.get("message", {}).get("content", [])
+                if isinstance(content, list):
+                    for block in content:
+                        if block.get("type") == "tool_result":
+                            result = str(block.get("content", ""))
+                            if mentions_error(result):
+                                match_info["error_count"] += 1
+
+                            if search_results:
+                                for text in iter_result_texts(block.get("content")):
+                                    idx = find_text(text, pattern_lower)
+                                    if idx != -1:
+                                        text_matched = True
+                                        match_info["matches"].append({
+                                            "type": "text",
+                                            "location": "tool_result",
+                                            "tool_use_id": block.get("tool_use_id"),
+                                            "preview": match_preview(text, idx)
+                                        })
+                                        break
+
+            # Text search in assistant messages
+            if entry_type == "assistant":
+                content = entry.get("message", {}).get("content", [])
+                if isinstance(content, list):
+                    for block in content:
+                        if block.get("type") == "text" and search_messages:
+                            text = block.get("text", "")
+                            if find_text(text, pattern_lower) != -1:
+                                text_matched = True
+                                match_info["matches"].append({
+                                    "type": "text",
+                                    "location": "assistant_message",
+                                    "preview": text[:100]
+                                })
+
+                        if block.get("type") == "thinking" and search_thinking:
+                            text = block.get("thinking", "")
+                            idx = find_text(text, pattern_lower) if isinstance(text, str) else -1
+                            if idx != -1:
+                                text_matched = True
+                                match_info["matches"].append({
+                                    "type": "text",
+                                    "location": "thinking",
+                                    "preview": match_preview(text, idx)
+                                })
+
+                        if block.get("type") == "tool_use":
+                            match_info["tool_calls"] += 1
+                            tool_name = block.get("name", "")
+                            tool_input = block.get("input", {})
+
+                            if search_inputs:
+                                for text in iter_input_strings(tool_input):
+                                    idx = find_text(text, pattern_lower)
+                                    if idx != -1:
+                                        text_matched = True
+                                        match_info["matches"].append({
+                                            "type": "text",
+                                            "location": "tool_input",
+                                            "tool": tool_name,
+                                            "preview": match_preview(text, idx)
+                                        })
+                                        break
+
+                            # Tool filter
+                            if tool_filter and tool_filter.lower() in tool_name.lower():
+                                tool_matched = True
+                                match_info["matches"].append({
+                                    "type": "tool",
+                                    "tool": tool_name,
+                                    "input_preview": str(tool_input)[:100]
+                                })
+
+                            # Command filter (look for slash commands in Bash or user messages)
+                            if command_filter and tool_name == "Bash":
+                                cmd = tool_input.get("command", "")
+                                if command_filter in cmd:
+                                    command_matched = True
                                     match_info["matches"].append({
-                                        "type": "text",
-                                        "location": "assistant_message",
-                                        "preview": text[:100]
+                                        "type": "command",
+                                        "command": cmd[:100]
                                     })
 
-                            if block.get("type") == "tool_use":
-                                match_info["tool_calls"] += 1
-                                tool_name = block.get("name", "")
-                                tool_input = block.get("input", {})
-
-                                # Tool filter
-                                if tool_filter and tool_filter.lower() in tool_name.lower():
-                                    tool_matched = True
+                            # File filter
+                            if file_filter:
+                                file_path = tool_input.get("file_path", "")
+                                if file_filter in file_path:
+                                    file_matched = True
                                     match_info["matches"].append({
-                                        "type": "tool",
-                                        "tool": tool_name,
-                                        "input_preview": str(tool_input)[:100]
+                                        "type": "file",
+                                        "operation": tool_name,
+                                        "file": file_path
                                     })
 
-                                # Command filter (look for slash commands in Bash or user messages)
-                                if command_filter and tool_name == "Bash":
-                                    cmd = tool_input.get("command", "")
-                                    if command_filter in cmd:
-                                        command_matched = True
-                                        match_info["matches"].append({
-                                            "type": "command",
-                                            "command": cmd[:100]
-                                        })
-
-                                # File filter
-                                if file_filter:
-                                    file_path = tool_input.get("file_path", "")
-                                    if file_filter in file_path:
-                                        file_matched = True
-                                        match_info["matches"].append({
-                                            "type": "file",
-                                            "operation": tool_name,
-                                            "file": file_path
-                                        })
-
-                                # PR detection
-                                if tool_name == "Bash":
-                                    cmd = tool_input.get("command", "")
-                                    if "gh pr" in cmd or "git push" in cmd:
-                                        match_info["has_pr"] = True
+                            # PR detection
+                            if tool_name == "Bash":
+                                cmd = tool_input.get("command", "")
+                                if "gh pr" in cmd or "git push" in cmd:
+                                    match_info["has_pr"] = True
 
         # Calculate duration
         if match_info["start_time"] and match_info["end_time"]:
@@ -210,11 +313,14 @@ def search_session(session_file: Path, filters: dict) -> Optional[dict]:
         return None
 
 
-def main():
+def main(argv=None):
     parser = argparse.ArgumentParser(description="Search Claude Code sessions")
     parser.add_argument("--project", help="Project name to filter")
     parser.add_argument("--days", type=int, default=7, help="Number of days to look back")
     parser.add_argument("--text", help="Full-text search in messages")
+    parser.add_argument("--in", dest="scopes", type=parse_scopes, default=["messages"],
+                        help="Comma-separated places --text searches: "
+                             "messages, results, thinking, inputs, or all (default: messages)")
     parser.add_argument("--tool", help="Filter by tool usage")
     parser.add_argument("--command", help="Filter by command executed")
     parser.add_argument("--file", help="Filter by file touched")
@@ -222,12 +328,18 @@ def main():
     parser.add_argument("--has-errors", action="store_true", help="Only sessions with errors")
     parser.add_argument("--has-pr", action="store_true", help="Only sessions that touched PRs")
     parser.add_argument("--limit", type=int, default=20, help="Maximum results to return")
+    parser.add_argument("--cursor", help="Resume after the page that returned this next_cursor")
+    add_profile_args(parser)
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
+    if args.limit < 1:
+        parser.error("--limit must be at least 1")
+    configure(args)
 
     # Build filters dict
     filters = {
         "text": args.text,
+        "in": args.scopes if args.text else None,
         "tool": args.tool,
         "command": args.command,
         "file": args.file,
@@ -251,28 +363,39 @@ def main():
     # Calculate cutoff date
     cutoff = datetime.now(timezone.utc) - timedelta(days=args.days)
 
-    # Search all sessions
-    matches = []
-    sessions_searched = 0
-
-    for project_dir in project_dirs:
-        for session_file in project_dir.glob("*.jsonl"):
-            # Quick filter by modification time
-            mtime = datetime.fromtimestamp(session_file.stat().st_mtime, tz=timezone.utc)
-            if mtime < cutoff:
-                continue
+    query = {"command": "search", "projects": [str(d) for d in project_dirs], "days": args.days,
+             "filters": filters}
+    try:
+        after = decode_cursor(args.cursor, query) if args.cursor else None
+    except ValueError as e:
+        result = {"status": "error", "error": f"Invalid --cursor: {e}", "matches": []}
+        print(json.dumps(result, indent=2))
+        return 1
 
-            sessions_searched += 1
-            match_info = search_session(session_file, filters)
-            if match_info:
-                match_info["project_dir"] = str(project_dir)
-                matches.append(match_info)
+    # --file is answered from the cached file index; only sessions that
+    # touched a matching path are opened
+    include = None
+    if args.file:
+        from file_activity import sessions_touching
 
-    # Sort by start time (newest first)
-    matches.sort(key=lambda x: x.get("start_time") or "", reverse=True)
+        include = {d: set(sessions_touching(d, args.file)) for d in project_dirs}
 
-    # Apply limit
-    matches = matches[:args.limit]
+    # Scan newest first and stop once the page is full; the cursor records
+    # the last session scanned so the next page resumes right after it
+    ordered = after_cursor(ordered_sessions(project_dirs, cutoff, by_start=False, include=include), after)
+    matches = []
+    sessions_searched = 0
+    next_cursor = None
+
+    for position, item in enumerate(ordered):
+        if len(matches) >= args.limit:
+            next_cursor = encode_cursor(ordered[position - 1].key, query)
+            break
+        sessions_searched += 1
+        match_info = search_session(item.path, filters)
+        if match_info:
+            match_info["project_dir"] = str(item.path.parent)
+            matches.append(match_info)
 
     result = {
         "status": "success",
@@ -280,10 +403,11 @@ def main():
         "days": args.days,
         "sessions_searched": sessions_searched,
         "total_matches": len(matches),
-        "matches": matches
+        "matches": matches,
+        "next_cursor": next_cursor,
     }
 
-    print(json.dumps(result, indent=2, default=str))
+    emit_json(result)
     return 0
 
 
@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Archive old sessions into compressed, seekable files and restore them.
+
+A session <id>.jsonl older than --days is rewritten as <id>.jsonl.gz: a
+sequence of independent gzip members ("frames") of roughly FRAME_BYTES of
+whole lines each. Any gzip reader decompresses the file as one stream, so
+the shared reader (session_io) reads archives transparently. A sidecar
+<id>.jsonl.gz.idx records each frame's compressed offset and first line,
+so a reader that wants line N only decompresses the frame holding it.
+
+The archive keeps the original mtime, so --days filters in the other
+scripts treat archived sessions exactly as before.
+
+Usage:
+    python session_archive.py --project claude-life-dev --days 30
+    python session_archive.py --project claude-life-dev --days 30 --dry-run
+    python session_archive.py --project claude-life-dev --restore <uuid>
+
+Output: JSON with the archived (or restored) sessions and bytes saved.
+"""
+
+import argparse
+import bisect
+import gzip
+import json
+import os
+import sys
+import time
+import zlib
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+from perf import add_profile_args, configure, emit_json, timed
+from session_io import ARCHIVE_SUFFIX, open_session, session_id_from_path
+
+INDEX_SUFFIX = ".idx"
+INDEX_VERSION = 1
+
+# Uncompressed bytes per gzip member; a frame always ends on a line boundary
+FRAME_BYTES = 1024 * 1024
+COMPRESS_LEVEL = 6
+
+
+def find_project_dir(project_name: str) -> Optional[Path]:
+    """Find the project directory in ~/.claude/projects/"""
+    claude_projects = Path.home() / ".claude" / "projects"
+
+    if not claude_projects.exists():
+        return None
+
+    if project_name.startswith("/"):
+        encoded = project_name.replace("/", "-")
+        project_dir = claude_projects / encoded
+        return project_dir if project_dir.exists() else None
+
+    for d in claude_projects.iterdir():
+        if d.is_dir() and d.name.endswith(project_name):
+            return d
+
+    for d in claude_projects.iterdir():
+        if d.is_dir() and project_name in d.name:
+            return d
+
+    return None
+
+
+def index_path(archive: Path) -> Path:
+    return archive.with_name(archive.name + INDEX_SUFFIX)
+
+
+def load_index(archive: Path) -> Optional[dict]:
+    """Return the frame index of an archive, or None if missing or stale."""
+    try:
+        with open(index_path(archive)) as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if index.get("version") != INDEX_VERSION or index.get("compressed_bytes") != archive.stat().st_size:
+        return None
+    return index
+
+
+@timed("process")
+def archive_session(session_file: Path, frame_bytes: int = FRAME_BYTES) -> dict:
+    """Compress one session into framed gzip plus index, then remove the original.
+
+    The archive is written to a temporary file, verified by decompressing it
+    and comparing length and CRC with the source, and only then moved into
+    place. A source that changes while it is being archived is left alone.
+    """
+    before = session_file.stat()
+    archive = session_file.with_name(session_id_from_path(session_file) + ARCHIVE_SUFFIX)
+    if archive.exists():
+        raise OSError(f"{archive.name} already exists; restore it before archiving again")
+    tmp = archive.with_name(archive.name + ".tmp")
+
+    frames: List[List[int]] = []  # [compressed_offset, first_line, line_count]
+    crc = 0
+    lines = 0
+    source_bytes = 0
+
+    try:
+        with open(session_file, "rb") as src, open(tmp, "wb") as dst:
+            pending: List[bytes] = []
+            pending_bytes = 0
+            first_line = 0
+
+            def flush():
+                frames.append([dst.tell(), first_line, len(pending)])
+                dst.write(gzip.compress(b"".join(pending), compresslevel=COMPRESS_LEVEL, mtime=0))
+
+            for raw in src:
+                pending.append(raw)
+                pending_bytes += len(raw)
+                crc = zlib.crc32(raw, crc)
+                source_bytes += len(raw)
+                lines += 1
+                if pending_bytes >= frame_bytes:
+                    flush()
+                    pending, pending_bytes, first_line = [], 0, lines
+            if pending:
+                flush()
+            dst.flush()
+            os.fsync(dst.fileno())
+
+        check_crc = 0
+        check_bytes = 0
+        with gzip.open(tmp, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                check_crc = zlib.crc32(chunk, check_crc)
+                check_bytes += len(chunk)
+        if (check_bytes, check_crc) != (source_bytes, crc):
+            raise OSError(f"verification failed for {session_file.name}")
+
+        after = session_file.stat()
+        if (after.st_size, after.st_mtime_ns) != (before.st_size, before.st_mtime_ns):
+            raise OSError(f"{session_file.name} changed while archiving")
+
+        os.utime(tmp, ns=(before.st_atime_ns, before.st_mtime_ns))
+        os.replace(tmp, archive)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+    compressed_bytes = archive.stat().st_size
+    index = {
+        "version": INDEX_VERSION,
+        "session_id": session_id_from_path(session_file),
+        "lines": lines,
+        "source_bytes": source_bytes,
+        "compressed_bytes": compressed_bytes,
+        "crc32": crc,
+        "frames": frames,
+    }
+    with open(index_path(archive), "w") as f:
+        json.dump(index, f, separators=(",", ":"))
+    os.utime(index_path(archive), ns=(before.st_atime_ns, before.st_mtime_ns))
+    session_file.unlink()
+
+    return {
+        "session_id": index["session_id"],
+        "archive": str(archive),
+        "lines": lines,
+        "source_bytes": source_bytes,
+        "compressed_bytes": compressed_bytes,
+        "ratio": round(source_bytes / compressed_bytes, 2) if compressed_bytes else None,
+        "frames": len(frames),
+    }
+
+
+def restore_session(archive: Path) -> dict:
+    """Decompress an archive back to <id>.jsonl, keeping its mtime."""
+    st = archive.stat()
+    target = archive.with_name(session_id_from_path(archive) + ".jsonl")
+    tmp = target.with_name(target.name + ".tmp")
+    try:
+        with gzip.open(archive, "rb") as src, open(tmp, "wb") as dst:
+            for chunk in iter(lambda: src.read(1 << 20), b""):
+                dst.write(chunk)
+        os.utime(tmp, ns=(st.st_atime_ns, st.st_mtime_ns))
+        os.replace(tmp, target)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+    archive.unlink()
+    try:
+        index_path(archive).unlink()
+    except FileNotFoundError:
+        pass
+    return {"session_id": session_id_from_path(archive), "file_path": str(target),
+            "source_bytes": target.stat().st_size}
+
+
+def frame_for_line(archive: Path, line_no: int) -> Tuple[int, int]:
+    """Return (compressed_offset, first_line) of the frame holding ``line_no``.
+
+    Without a usable index this is (0, 0): decompress from the start.
+    """
+    index = load_index(archive)
+    if not index or not index["frames"]:
+        return 0, 0
+    firsts = [frame[1] for frame in index["frames"]]
+    frame = index["frames"][max(0, bisect.bisect_right(firsts, line_no) - 1)]
+    return frame[0], frame[1]
+
+
+def iter_archive_lines(archive: Path, start_line: int = 0) -> Iterator[Tuple[int, bytes]]:
+    """Yield (line_no, raw_line) from ``start_line`` on, decompressing only the frames needed."""
+    with open_session(archive, start_line) as (f, first_line):
+        for line_no, line in enumerate(f, first_line):
+            if line_no >= start_line:
+                yield line_no, line
+
+
+def archive_candidates(project_dir: Path, days: int) -> List[Path]:
+    """Live sessions whose last write is more than ``days`` days old."""
+    cutoff = time.time() - days * 86400
+    return sorted(p for p in project_dir.glob("*.jsonl") if p.stat().st_mtime < cutoff)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Archive old sessions into compressed, seekable files")
+    parser.add_argument("--project", required=True, help="Project name to archive")
+    parser.add_argument("--days", type=int, default=30, help="Archive sessions not written to for this many days")
+    parser.add_argument("--dry-run", action="store_true", help="Only list the sessions that would be archived")
+    parser.add_argument("--restore", metavar="SESSION_ID", help="Decompress an archived session back to .jsonl")
+    add_profile_args(parser)
+
+    args = parser.parse_args(argv)
+    configure(args)
+
+    project_dir = find_project_dir(args.project)
+    if project_dir is None:
+        result = {
+            "status": "error",
+            "error": f"Project '{args.project}' not found in ~/.claude/projects/",
+            "project": args.project,
+        }
+        print(json.dumps(result, indent=2))
+        return 1
+
+    if args.restore:
+        archive = project_dir / f"{args.restore}{ARCHIVE_SUFFIX}"
+        if not archive.exists():
+            result = {
+                "status": "error",
+                "error": f"Archived session '{args.restore}' not found",
+                "session_id": args.restore,
+            }
+            print(json.dumps(result, indent=2))
+            return 1
+        emit_json({"status": "success", "restored": restore_session(archive)})
+        return 0
+
+    candidates = archive_candidates(project_dir, args.days)
+    result = {
+        "status": "success",
+        "project": args.project,
+        "project_dir": str(project_dir),
+        "days": args.days,
+        "dry_run": args.dry_run,
+    }
+
+    if args.dry_run:
+        result["candidates"] = [{"session_id": session_id_from_path(p), "source_bytes": p.stat().st_size}
+                                for p in candidates]
+        result["total_source_bytes"] = sum(c["source_bytes"] for c in result["candidates"])
+        emit_json(result)
+        return 0
+
+    archived, failed = [], []
+    for session_file in candidates:
+        try:
+            archived.append(archive_session(session_file))
+        except OSError as e:
+            failed.append({"session_id": session_id_from_path(session_file), "error": str(e)})
+
+    source = sum(a["source_bytes"] for a in archived)
+    compressed = sum(a["compressed_bytes"] for a in archived)
+    result.update({
+        "archived": archived,
+        "failed": failed,
+        "total_source_bytes": source,
+        "total_compressed_bytes": compressed,
+        "bytes_saved": source - compressed,
+    })
+
+    emit_json(result)
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except Exception as e:
+        print(json.dumps({"status": "error", "error": str(e)}), file=sys.stderr)
+        sys.exit(1)
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+On-disk cache shared by the session-historian scripts.
+
+Cached data lives under $SESSION_HISTORIAN_CACHE, falling back to
+$XDG_CACHE_HOME/session-historian and then ~/.cache/session-historian.
+Entries are keyed by a file signature (size + mtime) so a session file that
+grows or is rewritten is re-parsed automatically.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Optional
+
+# Bump when the shape of any cached payload changes
+CACHE_VERSION = 1
+
+
+def cache_dir() -> Path:
+    """Return the cache root, honouring SESSION_HISTORIAN_CACHE and XDG_CACHE_HOME."""
+    override = os.environ.get("SESSION_HISTORIAN_CACHE")
+    if override:
+        return Path(override)
+    xdg = os.environ.get("XDG_CACHE_HOME")
+    base = Path(xdg) if xdg else Path.home() / ".cache"
+    return base / "session-historian"
+
+
+def file_signature(path: Path) -> list:
+    """Return [size, mtime_ns] for a file; changes whenever the file is appended to."""
+    st = path.stat()
+    return [st.st_size, st.st_mtime_ns]
+
+
+def load_json_cache(name: str) -> Optional[dict]:
+    """Load a cached JSON document, or None if missing, corrupt or from another version."""
+    path = cache_dir() / name
+    try:
+        with open(path, "r") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict) or data.get("version") != CACHE_VERSION:
+        return None
+    return data
+
+
+def save_json_cache(name: str, data: dict) -> None:
+    """Atomically write a JSON document to the cache. Failures are ignored."""
+    path = cache_dir() / name
+    # A per-process temp name instead of tempfile, which pulls in random and shutil
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    data = dict(data, version=CACHE_VERSION)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp, "w") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp, path)
+    except OSError:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
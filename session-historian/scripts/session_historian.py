@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Single entry point for the session-historian scripts.
+
+One interpreter launch per query instead of one per script, and only the
+subcommand's own module is imported: `list` never loads the DAG, cache or
+statistics code that `analyze --tree` needs.
+
+Usage:
+    python session_historian.py list --project claude-life-dev --limit 5
+    python session_historian.py summarize --session-id <uuid>
+    python session_historian.py search --project claude-life-dev --text "error"
+    python session_historian.py <command> --help
+
+Output: whatever the subcommand prints (JSON).
+"""
+
+import sys
+
+# command -> (module, description). Modules are imported on demand.
+COMMANDS = {
+    "list": ("list_sessions", "List recent sessions for a project"),
+    "summarize": ("summarize_session", "Summarize one session"),
+    "search": ("search_sessions", "Search sessions by text, tool or file"),
+    "errors": ("find_errors", "Find and categorize tool errors"),
+    "context": ("get_session_context", "Full context of one session"),
+    "analyze": ("cross_session_analysis", "Patterns across sessions"),
+    "files": ("file_activity", "File activity across sessions"),
+    "tree": ("agent_tree", "Sub-agent trees"),
+    "dag": ("conversation_dag", "Conversation DAG of one session"),
+    "index": ("offset_index", "Build or refresh a session's line-offset index"),
+    "archive": ("session_archive", "Compress old sessions (readable by every command)"),
+    "verification": ("verification_events", "Verification gate block rates per project and branch"),
+}
+
+
+def usage() -> str:
+    lines = ["usage: session_historian.py <command> [options]", "", "commands:"]
+    width = max(len(name) for name in COMMANDS)
+    for name, (_, description) in COMMANDS.items():
+        lines.append(f"  {name:<{width}}  {description}")
+    lines.append("")
+    lines.append("Run 'session_historian.py <command> --help' for command options.")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+
+    if not argv or argv[0] in ("-h", "--help"):
+        print(usage())
+        return 0 if argv else 1
+
+    command = COMMANDS.get(argv[0])
+    if command is None:
+        print(f"session_historian.py: unknown command '{argv[0]}'\n\n{usage()}", file=sys.stderr)
+        return 2
+
+    module = __import__(command[0])
+    sys.argv[0] = f"session_historian.py {argv[0]}"
+    return module.main(argv[1:])
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except Exception as e:
+        import json
+
+        print(json.dumps({"status": "error", "error": str(e)}), file=sys.stderr)
+        sys.exit(1)
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Shared JSONL reader for session files.
+
+All scripts read sessions through iter_entries(), which skips blank and
+malformed lines, applies an optional per-line mask (see conversation_dag)
+and an optional byte-level prefilter, and feeds the perf recorder with
+bytes read, lines decoded and decode time when --profile is on.
+
+Sessions archived by session_archive.py (<id>.jsonl.gz) are read
+transparently; session_files() and resolve_session_file() find both forms.
+
+find_text() and mentions_error() search tool results case-insensitively
+without lowercasing a multi-MB result in one piece.
+
+match_project_dirs() and map_projects() serve fleet-wide runs: the first
+expands a project glob, the second runs a per-project function in worker
+processes and hands back one result per project.
+"""
+
+import json
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional, Sequence
+
+from perf import PERF
+
+ARCHIVE_SUFFIX = ".jsonl.gz"
+
+GLOB_CHARS = "*?["
+
+# Tool results can run to megabytes. Text is lowercased at most this many
+# characters at a time so one huge result never gets copied wholesale.
+SEARCH_CHUNK_SIZE = 64 * 1024
+
+
+def find_text(text: str, pattern_lower: str, chunk_size: int = SEARCH_CHUNK_SIZE) -> int:
+    """Case-insensitive find that lowercases in bounded, overlapping chunks.
+
+    Returns the index of the first match in ``text`` or -1.
+    """
+    if len(text) <= chunk_size:
+        return text.lower().find(pattern_lower)
+
+    overlap = max(len(pattern_lower) - 1, 0)
+    for start in range(0, len(text), chunk_size):
+        idx = text[start:start + chunk_size + overlap].lower().find(pattern_lower)
+        if idx != -1:
+            return start + idx
+    return -1
+
+
+def mentions_error(text: str) -> bool:
+    """The error heuristic used for tool results: "error" or "failed", any case."""
+    return find_text(text, "error") != -1 or find_text(text, "failed") != -1
+
+
+def session_id_from_path(session_file: Path) -> str:
+    """Session id for a live (<id>.jsonl) or archived (<id>.jsonl.gz) file."""
+    name = session_file.name
+    for suffix in (ARCHIVE_SUFFIX, ".jsonl"):
+        if name.endswith(suffix):
+            return name[:-len(suffix)]
+    return session_file.stem
+
+
+def is_archived(session_file: Path) -> bool:
+    return session_file.name.endswith(ARCHIVE_SUFFIX)
+
+
+def session_files(project_dir: Path) -> List[Path]:
+    """All session files in a project; a live file shadows an archive of the same id."""
+    files = {}
+    for path in project_dir.glob("*" + ARCHIVE_SUFFIX):
+        files[session_id_from_path(path)] = path
+    for path in project_dir.glob("*.jsonl"):
+        files[session_id_from_path(path)] = path
+    return list(files.values())
+
+
+def resolve_session_file(project_dir: Path, session_id: str) -> Optional[Path]:
+    """Return the live or archived file for ``session_id`` in ``project_dir``."""
+    for suffix in (".jsonl", ARCHIVE_SUFFIX):
+        path = project_dir / f"{session_id}{suffix}"
+        if path.exists():
+            return path
+    return None
+
+
+def is_project_glob(project_name: Optional[str]) -> bool:
+    return bool(project_name) and any(c in project_name for c in GLOB_CHARS)
+
+
+def match_project_dirs(pattern: Optional[str] = None) -> List[Path]:
+    """Project directories whose name matches ``pattern`` (all of them for None).
+
+    Like the single-project lookup, the pattern is matched against the end of
+    the encoded directory name, so "api-*" finds "-home-me-src-api-server".
+    """
+    import fnmatch
+
+    claude_projects = Path.home() / ".claude" / "projects"
+    if not claude_projects.exists():
+        return []
+    dirs = sorted(d for d in claude_projects.iterdir() if d.is_dir())
+    if pattern is None:
+        return dirs
+    return [d for d in dirs if fnmatch.fnmatchcase(d.name, "*" + pattern.replace("/", "-"))]
+
+
+def _run_project(func: Callable, project_dir: Path, args: tuple, profiling: bool):
+    """Worker entry point: run ``func`` and ship back its perf counters."""
+    if profiling:
+        PERF.enable()
+    result = func(project_dir, *args)
+    return result, dict(PERF.counters), PERF.phases
+
+
+def map_projects(func: Callable, project_dirs: List[Path], args: tuple = (),
+                 workers: Optional[int] = None) -> Iterator:
+    """Yield (project_dir, func(project_dir, *args)) for each project, in completion order.
+
+    With more than one project and worker, projects are processed in a
+    process pool; ``func`` must be a module-level function returning a
+    picklable result. Worker perf counters are folded into PERF.
+    """
+    import os
+
+    workers = workers or min(32, os.cpu_count() or 1)
+    if workers <= 1 or len(project_dirs) <= 1:
+        for project_dir in project_dirs:
+            yield project_dir, func(project_dir, *args)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(project_dirs))) as pool:
+        futures = {pool.submit(_run_project, func, d, args, PERF.enabled): d for d in project_dirs}
+        for future in as_completed(futures):
+            result, counters, phases = future.result()
+            for name, n in counters.items():
+                PERF.count(name, n)
+            for name, p in phases.items():
+                PERF.add_time(name, p["wall_ms"] / 1000, p["cpu_ms"] / 1000, calls=p["calls"])
+            yield futures[future], result
+
+
+@contextmanager
+def open_session(session_file: Path, start_line: int = 0, start_offset: int = 0):
+    """Open a session for binary line iteration, positioned at or before ``start_line``.
+
+    Yields (file, first_line_no). For a live file, ``start_offset`` must be
+    the byte offset of ``start_line`` (see offset_index); without it the file
+    is read from the top. Archives are decompressed from the frame holding
+    ``start_line``. Callers skip lines before ``start_line`` themselves.
+    """
+    if not is_archived(session_file):
+        with open(session_file, "rb") as f:
+            if start_offset:
+                f.seek(start_offset)
+                yield f, start_line
+            else:
+                yield f, 0
+        return
+
+    import gzip
+
+    offset, first_line = 0, 0
+    if start_line:
+        from session_archive import frame_for_line
+
+        offset, first_line = frame_for_line(session_file, start_line)
+    with open(session_file, "rb") as raw:
+        raw.seek(offset)
+        with gzip.GzipFile(fileobj=raw, mode="rb") as f:
+            yield f, first_line
+
+
+def iter_entries(session_file: Path, line_mask: Optional[bytearray] = None,
+                 stats: Optional[dict] = None, prefilter: Optional[Sequence[bytes]] = None,
+                 with_line_numbers: bool = False, start_line: int = 0,
+                 stop_line: Optional[int] = None, start_offset: int = 0) -> Iterator:
+    """Yield decoded entries from a session file.
+
+    line_mask:  skip line N when line_mask[N] is 0 (lines past the mask are kept)
+    stats:      dict whose "parse_warnings" is incremented for malformed lines;
+                its "lines_read" is incremented too if the key is present
+    prefilter:  byte strings; lines containing none of them are skipped undecoded.
+                Matching is a plain substring test, so it may let extra lines
+                through but never drops a line that contains a needle.
+    with_line_numbers: yield (line_no, entry) instead of entry
+    start_line, stop_line: only lines in [start_line, stop_line); pass the
+                start line's byte offset as start_offset to seek straight to it
+    """
+    profiling = PERF.enabled
+    bytes_read = lines = decoded = skipped = masked = warnings = 0
+    decode_time = 0.0
+    mask_len = len(line_mask) if line_mask is not None else 0
+
+    try:
+        with open_session(session_file, start_line, start_offset) as (f, first_line):
+            for line_no, raw in enumerate(f, first_line):
+                if line_no < start_line:
+                    continue
+                if stop_line is not None and line_no >= stop_line:
+                    break
+                lines += 1
+                bytes_read += len(raw)
+                if mask_len and line_no < mask_len and not line_mask[line_no]:
+                    masked += 1
+                    continue
+                if not raw.strip():
+                    continue
+                if prefilter is not None and not any(needle in raw for needle in prefilter):
+                    skipped += 1
+                    continue
+                try:
+                    if profiling:
+                        t0 = time.perf_counter()
+                        entry = json.loads(raw)
+                        decode_time += time.perf_counter() - t0
+                    else:
+                        entry = json.loads(raw)
+                except ValueError:
+                    # JSONDecodeError and invalid UTF-8 both land here
+                    warnings += 1
+                    continue
+                if not isinstance(entry, dict):
+                    warnings += 1
+                    continue
+                decoded += 1
+                yield (line_no, entry) if with_line_numbers else entry
+    finally:
+        if stats is not None:
+            if warnings:
+                stats["parse_warnings"] = stats.get("parse_warnings", 0) + warnings
+            if "lines_read" in stats:
+                stats["lines_read"] += lines
+        if profiling:
+            PERF.count("files_read")
+            PERF.count("bytes_read", bytes_read)
+            PERF.count("lines_read", lines)
+            PERF.count("lines_decoded", decoded)
+            PERF.count("lines_skipped_prefilter", skipped)
+            PERF.count("lines_skipped_mask", masked)
+            PERF.count("parse_warnings", warnings)
+            PERF.add_time("decode", decode_time, decode_time, calls=decoded)
@@ -4,6 +4,9 @@ Extract key actions and timeline from a specific session.
 
 Usage:
     python summarize_session.py --session-id <uuid>
+    python summarize_session.py --session-id <uuid> --tree
+    python summarize_session.py --session-id <uuid> --active-path
+    python summarize_session.py --session-id <uuid> --verification
 
 Output: JSON with timeline of actions, tools used, files touched, final status.
 """
@@ -14,7 +17,11 @@ import sys
 from pathlib import Path
 from typing import Optional
 
+from perf import add_profile_args, configure, emit_json, timed
+from session_io import iter_entries, resolve_session_file, session_id_from_path
 
+
+@timed("walk")
 def find_session_file(session_id: str) -> Optional[Path]:
     """Find a session file by its ID across all projects."""
     claude_projects = Path.home() / ".claude" / "projects"
@@ -27,24 +34,29 @@ def find_session_file(session_id: str) -> Optional[Path]:
         if not project_dir.is_dir():
             continue
 
-        # Try exact match
-        session_file = project_dir / f"{session_id}.jsonl"
-        if session_file.exists():
+        # Try exact match (live or archived)
+        session_file = resolve_session_file(project_dir, session_id)
+        if session_file is not None:
             return session_file
 
         # Try with agent- prefix
         if not session_id.startswith("agent-"):
-            agent_file = project_dir / f"agent-{session_id}.jsonl"
-            if agent_file.exists():
+            agent_file = resolve_session_file(project_dir, f"agent-{session_id}")
+            if agent_file is not None:
                 return agent_file
 
     return None
 
 
-def summarize_session(session_file: Path) -> dict:
-    """Extract a summary of the session."""
+@timed("process")
+def summarize_session(session_file: Path, line_mask: Optional[bytearray] = None) -> dict:
+    """Extract a summary of the session.
+
+    ``line_mask`` (from conversation_dag) restricts the summary to the lines
+    flagged 1, e.g. the active conversation path.
+    """
     summary = {
-        "session_id": session_file.stem,
+        "session_id": session_id_from_path(session_file),
         "file_path": str(session_file),
         "timeline": [],
         "tools_used": {},
@@ -52,6 +64,7 @@ def summarize_session(session_file: Path) -> dict:
             "read": set(),
             "written": set(),
             "edited": set(),
+            "tracked": set(),
         },
         "commands_run": [],
         "final_status": "unknown",
@@ -63,104 +76,103 @@ def summarize_session(session_file: Path) -> dict:
     }
 
     try:
-        with open(session_file, 'r') as f:
-            for line in f:
-                if not line.strip():
-                    continue
-                try:
-                    entry = json.loads(line)
-                except json.JSONDecodeError:
-                    continue
-
-                entry_type = entry.get("type")
-                timestamp = entry.get("timestamp")
-
-                # Track times
-                if timestamp:
-                    if summary["start_time"] is None:
-                        summary["start_time"] = timestamp
-                    summary["end_time"] = timestamp
-
-                # Capture session summary
-                if entry_type == "summary":
-                    summary["session_summary"] = entry.get("summary")
-
-                # Process user messages
-                if entry_type == "user":
-                    summary["total_messages"] += 1
-                    content = entry.get("message", {}).get("content", "")
-
-                    # Direct user input (not tool result)
-                    if isinstance(content, str) and content:
-                        summary["timeline"].append({
-                            "time": timestamp,
-                            "type": "user_message",
-                            "preview": content[:100] + ("..." if len(content) > 100 else "")
-                        })
-
-                # Process assistant messages
-                elif entry_type == "assistant":
-                    summary["total_messages"] += 1
-                    content = entry.get("message", {}).get("content", [])
-
-                    if isinstance(content, list):
-                        for block in content:
-                            block_type = block.get("type")
-
-                            if block_type == "tool_use":
-                                tool_name = block.get("name", "unknown")
-                                tool_input = block.get("input", {})
-
-                                summary["total_tool_calls"] += 1
-                                summary["tools_used"][tool_name] = summary["tools_used"].get(tool_name, 0) + 1
-
-                                # Track file operations
-                                if tool_name == "Read":
-                                    file_path = tool_input.get("file_path", "")
-                                    if file_path:
-                                        summary["files_touched"]["read"].add(file_path)
-
-                                elif tool_name == "Write":
-                                    file_path = tool_input.get("file_path", "")
-                                    if file_path:
-                                        summary["files_touched"]["written"].add(file_path)
-
-                                elif tool_name == "Edit":
-                                    file_path = tool_input.get("file_path", "")
-                                    if file_path:
-                                        summary["files_touched"]["edited"].add(file_path)
-
-                                elif tool_name == "Bash":
-                                    command = tool_input.get("command", "")
-                                    if command:
-                                        summary["commands_run"].append(command[:200])
-
-                                # Add to timeline (limit to important tools)
-                                if tool_name in ["Write", "Edit", "Bash", "Task"]:
-                                    desc = tool_input.get("description", "")
-                                    if not desc and tool_name == "Bash":
-                                        desc = tool_input.get("command", "")[:50]
-                                    summary["timeline"].append({
-                                        "time": timestamp,
-                                        "type": "tool_use",
-                                        "tool": tool_name,
-                                        "description": desc[:100] if desc else None
-                                    })
-
-                            elif block_type == "text":
-                                text = block.get("text", "")
-                                # Only add significant text responses
-                                if len(text) > 200:
-                                    summary["timeline"].append({
-                                        "time": timestamp,
-                                        "type": "assistant_response",
-                                        "preview": text[:100] + "..."
-                                    })
+        for entry in iter_entries(session_file, line_mask=line_mask):
+            entry_type = entry.get("type")
+            timestamp = entry.get("timestamp")
+
+            # Track times
+            if timestamp:
+                if summary["start_time"] is None:
+                    summary["start_time"] = timestamp
+                summary["end_time"] = timestamp
+
+            # Capture session summary
+            if entry_type == "summary":
+                summary["session_summary"] = entry.get("summary")
+
+            # Snapshots track every file Claude changed, including ones
+            # the Write/Edit inputs above don't name
+            if entry_type == "file-history-snapshot":
+                tracked = (entry.get("snapshot") or {}).get("trackedFileBackups") or {}
+                summary["files_touched"]["tracked"].update(tracked)
+
+            # Process user messages
+            if entry_type == "user":
+                summary["total_messages"] += 1
+                content = entry.get("message", {}).get("content", "")
+
+                # Direct user input (not tool result)
+                if isinstance(content, str) and content:
+                    summary["timeline"].append({
+                        "time": timestamp,
+                        "type": "user_message",
+                        "preview": content[:100] + ("..." if len(content) > 100 else "")
+                    })
+
+            # Process assistant messages
+            elif entry_type == "assistant":
+                summary["total_messages"] += 1
+                content = entry.get("message", {}).get("content", [])
+
+                if isinstance(content, list):
+                    for block in content:
+                        block_type = block.get("type")
+
+                        if block_type == "tool_use":
+                            tool_name = block.get("name", "unknown")
+                            tool_input = block.get("input", {})
+
+                            summary["total_tool_calls"] += 1
+                            summary["tools_used"][tool_name] = summary["tools_used"].get(tool_name, 0) + 1
+
+                            # Track file operations
+                            if tool_name == "Read":
+                                file_path = tool_input.get("file_path", "")
+                                if file_path:
+                                    summary["files_touched"]["read"].add(file_path)
+
+                            elif tool_name == "Write":
+                                file_path = tool_input.get("file_path", "")
+                                if file_path:
+                                    summary["files_touched"]["written"].add(file_path)
+
+                            elif tool_name == "Edit":
+                                file_path = tool_input.get("file_path", "")
+                                if file_path:
+                                    summary["files_touched"]["edited"].add(file_path)
+
+                            elif tool_name == "Bash":
+                                command = tool_input.get("command", "")
+                                if command:
+                                    summary["commands_run"].append(command[:200])
+
+                            # Add to timeline (limit to important tools)
+                            if tool_name in ["Write", "Edit", "Bash", "Task"]:
+                                desc = tool_input.get("description", "")
+                                if not desc and tool_name == "Bash":
+                                    desc = tool_input.get("command", "")[:50]
+                                summary["timeline"].append({
+                                    "time": timestamp,
+                                    "type": "tool_use",
+                                    "tool": tool_name,
+                                    "description": desc[:100] if desc else None
+                                })
+
+                        elif block_type == "text":
+                            text = block.get("text", "")
+                            # Only add significant text responses
+                            if len(text) > 200:
+                                summary["timeline"].append({
+                                    "time": timestamp,
+                                    "type": "assistant_response",
+                                    "preview": text[:100] + "..."
+                                })
 
         # Convert sets to lists
         summary["files_touched"]["read"] = sorted(list(summary["files_touched"]["read"]))
         summary["files_touched"]["written"] = sorted(list(summary["files_touched"]["written"]))
         summary["files_touched"]["edited"] = sorted(list(summary["files_touched"]["edited"]))
+        summary["files_touched"]["tracked"] = sorted(list(summary["files_touched"]["tracked"]))
 
         # Determine final status
         if summary["total_messages"] > 0:
@@ -178,11 +190,19 @@ def summarize_session(session_file: Path) -> dict:
     return summary
 
 
-def main():
+def main(argv=None):
     parser = argparse.ArgumentParser(description="Summarize a Claude Code session")
     parser.add_argument("--session-id", required=True, help="Session UUID to summarize")
+    parser.add_argument("--tree", action="store_true",
+                        help="Include sub-agent sessions and roll up totals across the agent tree")
+    parser.add_argument("--active-path", action="store_true",
+                        help="Only count entries on the active conversation path (skip abandoned branches and sidechains)")
+    parser.add_argument("--verification", action="store_true",
+                        help="Add verification-hooks gate events (blocked/allowed/error) to the timeline")
+    add_profile_args(parser)
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
+    configure(args)
 
     # Find session file
     session_file = find_session_file(args.session_id)
@@ -196,10 +216,31 @@ def main():
         print(json.dumps(result, indent=2))
         return 1
 
-    summary = summarize_session(session_file)
+    line_mask = None
+    if args.active_path:
+        from conversation_dag import active_line_mask
+
+        line_mask = active_line_mask(session_file)
+
+    summary = summarize_session(session_file, line_mask)
+    summary["active_path_only"] = args.active_path
+
+    if args.tree:
+        from agent_tree import build_tree, load_project_tree, rollup_tree
+
+        aggregates, index, children = load_project_tree(session_file.parent)
+        summary["agent_tree"] = build_tree(session_id_from_path(session_file), aggregates, index, children)
+        summary["tree_rollup"] = rollup_tree(session_id_from_path(session_file), aggregates, children)
+
+    if args.verification:
+        from verification_events import join_timeline, load_event_index
+
+        session_id = session_id_from_path(session_file)
+        join_timeline(summary, load_event_index([session_id]).get(session_id, []))
+
     summary["status"] = "success"
 
-    print(json.dumps(summary, indent=2, default=str))
+    emit_json(summary)
     return 0
 
 
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Join verification-hooks gate events to session transcripts.
+
+The verification-hooks plugin appends one line per gate decision to its
+events.jsonl, tagged with the session_id of the session that triggered it.
+load_event_index() reads that log (and its rotated archives) once into a
+dict keyed by session_id, so joining any number of sessions costs one pass
+over the events plus one lookup per session.
+
+Usage:
+    python verification_events.py --all-projects --days 30
+    python verification_events.py --project 'api-*' --days 7
+    python summarize_session.py --session-id <uuid> --verification
+
+Output: JSON with gate block rates per project and per git branch.
+"""
+
+import argparse
+import json
+import os
+import sys
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from perf import add_profile_args, configure, emit_json, timed
+from session_io import iter_entries, match_project_dirs, session_files, session_id_from_path
+
+# Gate decisions worth putting on a timeline; "logged" events from the
+# PostToolUse logger only mirror tool calls the transcript already has
+JOINED_ACTIONS = {"blocked", "allowed", "exception_allowed", "error"}
+
+TIMELINE_LIMIT = 50
+
+
+def events_log() -> Path:
+    """The verification-hooks log: $VERIFICATION_LOG, else events.jsonl in its data dir."""
+    if os.environ.get("VERIFICATION_LOG"):
+        return Path(os.environ["VERIFICATION_LOG"])
+    data_dir = os.environ.get("VERIFICATION_DATA_DIR") or Path.home() / ".local/share/verification-hooks"
+    return Path(data_dir) / "events.jsonl"
+
+
+def event_files(log: Path) -> List[Path]:
+    """Rotated archives (events-*.jsonl[.gz], oldest first) followed by the live log."""
+    directory = log.parent
+    archives = sorted(list(directory.glob("events-*.jsonl")) + list(directory.glob("events-*.jsonl.gz")))
+    return archives + ([log] if log.exists() else [])
+
+
+def parse_time(timestamp: Optional[str]) -> Optional[datetime]:
+    """Aware datetime for transcript ("...Z") and hook (date -Iseconds) timestamps."""
+    if not timestamp:
+        return None
+    try:
+        dt = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+
+@timed("events")
+def load_event_index(session_ids: Optional[Iterable[str]] = None, cutoff: Optional[datetime] = None,
+                     log: Optional[Path] = None) -> Dict[str, List[dict]]:
+    """Gate decisions grouped by session_id, oldest first.
+
+    ``session_ids`` keeps only those sessions (a single id also skips every
+    other line before decoding it); ``cutoff`` drops older events. Lines that
+    appear in more than one file are counted once: the old copy-then-truncate
+    rotation left archives overlapping the live log. Repeats within a single
+    file are kept, since the same decision can be logged twice in a second.
+    """
+    wanted = set(session_ids) if session_ids is not None else None
+    prefilter = None
+    if wanted is not None and len(wanted) == 1:
+        prefilter = [json.dumps(next(iter(wanted))).encode()]
+
+    index: Dict[str, List[dict]] = {}
+    earlier = Counter()  # most copies of each decision found in any one file read so far
+    for path in event_files(log or events_log()):
+        in_file = Counter()
+        for event in iter_entries(path, prefilter=prefilter):
+            session_id = event.get("session_id")
+            if event.get("action") not in JOINED_ACTIONS or not isinstance(session_id, str):
+                continue
+            if wanted is not None and session_id not in wanted:
+                continue
+            when = parse_time(event.get("ts"))
+            if cutoff is not None and (when is None or when < cutoff):
+                continue
+            details = event.get("details") or {}
+            row = {
+                "time": event.get("ts"),
+                "gate": event.get("gate"),
+                "action": event.get("action"),
+                "duration_ms": event.get("duration_ms"),
+                "reason": details.get("reason") or details.get("error"),
+                "issue_ids": details.get("issue_ids"),
+            }
+            key = (session_id, row["time"], row["gate"], row["action"], row["issue_ids"], row["reason"])
+            in_file[key] += 1
+            if in_file[key] <= earlier[key]:
+                continue
+            index.setdefault(session_id, []).append(row)
+        earlier |= in_file
+    return index
+
+
+class GateTally:
+    """Gate decision counts for a set of sessions."""
+
+    def __init__(self):
+        self.blocked = 0
+        self.allowed = 0
+        self.errors = 0
+        self.sessions = set()
+
+    def add(self, session_id: str, events: List[dict]) -> None:
+        self.sessions.add(session_id)
+        for event in events:
+            action = event["action"]
+            if action == "blocked":
+                self.blocked += 1
+            elif action == "error":
+                self.errors += 1
+            else:
+                self.allowed += 1
+
+    def to_dict(self) -> dict:
+        decisions = self.blocked + self.allowed
+        return {
+            "sessions": len(self.sessions),
+            "decisions": decisions,
+            "blocked": self.blocked,
+            "allowed": self.allowed,
+            "errors": self.errors,
+            "block_rate": round(self.blocked / decisions, 3) if decisions else 0.0,
+        }
+
+
+def join_timeline(summary: dict, events: List[dict]) -> dict:
+    """Lay a session's gate events onto its summarize_session timeline, in time order."""
+    tally = GateTally()
+    tally.add(summary.get("session_id"), events)
+    rows = [{"type": "verification", **event} for event in events]
+
+    never = datetime.min.replace(tzinfo=timezone.utc)
+    timeline = sorted(summary.get("timeline", []) + rows,
+                      key=lambda item: parse_time(item.get("time")) or never)
+    summary["timeline"] = timeline[-TIMELINE_LIMIT:]
+
+    stats = tally.to_dict()
+    del stats["sessions"]
+    summary["verification"] = stats
+    return summary
+
+
+def session_branch(session_file: Path) -> Optional[str]:
+    """The git branch recorded on the first transcript entry that has one."""
+    for entry in iter_entries(session_file, prefilter=[b'"gitBranch"']):
+        if entry.get("gitBranch"):
+            return entry["gitBranch"]
+    return None
+
+
+@timed("process")
+def block_rate_report(index: Dict[str, List[dict]], project_dirs: List[Path]) -> dict:
+    """Block rates per project and per (project, branch) for the indexed sessions.
+
+    Sessions whose transcript is not in ``project_dirs`` (another project,
+    a deleted transcript, or session_id "unknown") are only counted as
+    unmatched_sessions.
+    """
+    transcripts = {}
+    for project_dir in project_dirs:
+        for session_file in session_files(project_dir):
+            transcripts[session_id_from_path(session_file)] = (project_dir, session_file)
+
+    total = GateTally()
+    projects: Dict[Path, GateTally] = {}
+    branches: Dict[Path, Dict[str, GateTally]] = {}
+    unmatched = 0
+    for session_id, events in index.items():
+        match = transcripts.get(session_id)
+        if match is None:
+            unmatched += 1
+            continue
+        project_dir, session_file = match
+        branch = session_branch(session_file) or "unknown"
+        total.add(session_id, events)
+        projects.setdefault(project_dir, GateTally()).add(session_id, events)
+        branches.setdefault(project_dir, {}).setdefault(branch, GateTally()).add(session_id, events)
+
+    by_project = []
+    for project_dir, tally in projects.items():
+        by_branch = [{"branch": branch, **t.to_dict()} for branch, t in branches[project_dir].items()]
+        by_branch.sort(key=lambda b: (-b["decisions"], b["branch"]))
+        by_project.append({"project_dir": str(project_dir), **tally.to_dict(), "by_branch": by_branch})
+    by_project.sort(key=lambda p: (-p["decisions"], p["project_dir"]))
+
+    return {
+        **total.to_dict(),
+        "unmatched_sessions": unmatched,
+        "by_project": by_project,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Verification gate block rates per project and branch")
+    scope = parser.add_mutually_exclusive_group(required=True)
+    scope.add_argument("--project", help="Project name or glob (e.g. 'api-*')")
+    scope.add_argument("--all-projects", action="store_true", help="Report on every project")
+    parser.add_argument("--days", type=int, default=7, help="Number of days to look back")
+    parser.add_argument("--log", type=Path, help="verification-hooks events.jsonl (default: $VERIFICATION_LOG "
+                                                 "or ~/.local/share/verification-hooks/events.jsonl)")
+    add_profile_args(parser)
+
+    args = parser.parse_args(argv)
+    configure(args)
+
+    project_dirs = match_project_dirs(None if args.all_projects else args.project)
+    if not project_dirs:
+        result = {
+            "status": "error",
+            "error": "No projects found" + (f" matching '{args.project}'" if args.project else ""),
+            "project": args.project,
+        }
+        print(json.dumps(result, indent=2))
+        return 1
+
+    log = args.log or events_log()
+    cutoff = datetime.now(timezone.utc) - timedelta(days=args.days)
+    index = load_event_index(cutoff=cutoff, log=log)
+
+    result = {
+        "status": "success",
+        "project": args.project or "*",
+        "projects_matched": len(project_dirs),
+        "days": args.days,
+        "log": str(log),
+        **block_rate_report(index, project_dirs),
+    }
+    emit_json(result)
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except Exception as e:
+        print(json.dumps({"status": "error", "error": str(e)}), file=sys.stderr)
+        sys.exit(1)
@@ -6,10 +6,14 @@ Shared pytest fixtures for session-historian tests.
 import json
 import os
 import pytest
+import sys
 import tempfile
 import shutil
 from pathlib import Path
 
+# Let tests import script modules directly for unit-level checks
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
 
 @pytest.fixture
 def fixtures_dir():
@@ -29,6 +33,47 @@ def error_session_file(fixtures_dir):
     return fixtures_dir / "error_session.jsonl"
 
 
+@pytest.fixture
+def rich_session_file(fixtures_dir):
+    """Return path to rich_session.jsonl fixture."""
+    return fixtures_dir / "rich_session.jsonl"
+
+
+@pytest.fixture
+def branch_session_file(fixtures_dir):
+    """Return path to branch_session.jsonl fixture."""
+    return fixtures_dir / "branch_session.jsonl"
+
+
+@pytest.fixture
+def agent_home_dir(temp_home_dir, fixtures_dir):
+    """
+    Extend temp_home_dir with a parent session and the sub-agent it spawned.
+
+    task-session-001 issues a Task call; agent-a1b2c3 is the sub-agent run,
+    carrying the parent's sessionId.
+    """
+    project_dir = temp_home_dir["project_dir"]
+    shutil.copy(fixtures_dir / "task_session.jsonl", project_dir / "task-session-001.jsonl")
+    shutil.copy(fixtures_dir / "agent_session.jsonl", project_dir / "agent-a1b2c3.jsonl")
+    return temp_home_dir
+
+
+@pytest.fixture
+def multi_project_home_dir(temp_home_dir, fixtures_dir):
+    """
+    Extend temp_home_dir with a second project, -home-test-api.
+
+    It holds an error session and a rich session, so fleet-wide runs see two
+    projects with different tools and error counts.
+    """
+    api_dir = temp_home_dir["projects_dir"] / "-home-test-api"
+    api_dir.mkdir()
+    shutil.copy(fixtures_dir / "error_session.jsonl", api_dir / "api-error-001.jsonl")
+    shutil.copy(fixtures_dir / "rich_session.jsonl", api_dir / "api-rich-001.jsonl")
+    return {**temp_home_dir, "api_dir": api_dir}
+
+
 @pytest.fixture
 def temp_home_dir(fixtures_dir):
     """
@@ -58,6 +103,7 @@ def temp_home_dir(fixtures_dir):
     # Create environment dict for subprocess calls
     env = os.environ.copy()
     env["HOME"] = str(temp_base)
+    env["SESSION_HISTORIAN_CACHE"] = str(temp_base / ".cache" / "session-historian")
 
     result = {
         "home": temp_base,
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Unit tests for agent_tree.py and the --tree modes built on it.
+"""
+
+import json
+import pytest
+import subprocess
+import sys
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).parent.parent / "scripts"
+
+
+def run_script(name, args, env):
+    result = subprocess.run(
+        [sys.executable, SCRIPTS_DIR / name, *args],
+        capture_output=True,
+        text=True,
+        env=env
+    )
+    return json.loads(result.stdout)
+
+
+class TestAgentTree:
+    """Tests for parent/sub-agent linkage."""
+
+    def test_agent_linked_to_task_call(self, agent_home_dir):
+        """The agent file links to the Task call whose prompt it received."""
+        output = run_script("agent_tree.py", ["--project", agent_home_dir["project_name"]],
+                            agent_home_dir["env"])
+        assert output["status"] == "success"
+        assert output["agent_files"] == 1
+        link = output["links"]["agent-a1b2c3"]
+        assert link["parent"] == "task-session-001"
+        assert link["task"]["tool_use_id"] == "toolu_task001"
+        assert link["task"]["subagent_type"] == "general-purpose"
+
+    def test_rollup_sums_across_tree(self, agent_home_dir):
+        """Rollup adds the agent's tool calls, errors and tokens to the parent's."""
+        output = run_script("agent_tree.py",
+                            ["--project", agent_home_dir["project_name"], "--session-id", "task-session-001"],
+                            agent_home_dir["env"])
+        rollup = output["rollup"]
+        assert rollup["sessions"] == 2
+        assert rollup["agent_sessions"] == 1
+        assert rollup["tool_calls"] == 3
+        assert rollup["tool_counts"] == {"Task": 1, "Read": 1, "Grep": 1}
+        assert rollup["error_count"] == 1
+        assert rollup["input_tokens"] == 500 + 700 + 300 + 350 + 400
+        assert rollup["duration_minutes"] == 3.1
+        assert [c["session_id"] for c in output["tree"]["children"]] == ["agent-a1b2c3"]
+
+    def test_aggregates_cached_and_refreshed(self, agent_home_dir, monkeypatch):
+        """Aggregates are cached per file and re-parsed when a file changes."""
+        from agent_tree import load_aggregates
+
+        cache_root = Path(agent_home_dir["env"]["SESSION_HISTORIAN_CACHE"])
+        monkeypatch.setenv("SESSION_HISTORIAN_CACHE", str(cache_root))
+        project_dir = agent_home_dir["project_dir"]
+
+        first = load_aggregates(project_dir)
+        assert (cache_root / "aggregates" / f"{project_dir.name}.json").exists()
+
+        with open(project_dir / "task-session-001.jsonl", "a") as f:
+            f.write(json.dumps({
+                "type": "assistant", "sessionId": "task-session-001",
+                "timestamp": "2025-12-27T14:10:00.000Z",
+                "message": {"content": [{"type": "tool_use", "id": "toolu_x", "name": "Bash", "input": {}}]},
+            }) + "\n")
+        second = load_aggregates(project_dir)
+        assert second["task-session-001"]["tool_calls"] == first["task-session-001"]["tool_calls"] + 1
+
+    def test_summarize_tree(self, agent_home_dir):
+        """summarize_session --tree includes the agent tree and rollup."""
+        output = run_script("summarize_session.py", ["--session-id", "task-session-001", "--tree"],
+                            agent_home_dir["env"])
+        assert output["status"] == "success"
+        assert output["tree_rollup"]["tool_calls"] == 3
+        assert output["agent_tree"]["children"][0]["task"]["description"] == "Review config loader"
+
+    def test_list_tree_folds_agents(self, agent_home_dir):
+        """list_sessions --tree hides linked agents and attaches them to the parent."""
+        output = run_script("list_sessions.py",
+                            ["--project", agent_home_dir["project_name"], "--days", "3650", "--tree"],
+                            agent_home_dir["env"])
+        ids = [s["session_id"] for s in output["sessions"]]
+        assert "agent-a1b2c3" not in ids
+        parent = next(s for s in output["sessions"] if s["session_id"] == "task-session-001")
+        assert parent["agents"] == ["agent-a1b2c3"]
+        assert parent["tree_rollup"]["error_count"] == 1
+
+    def test_cross_session_tree_merges_units(self, agent_home_dir):
+        """cross_session_analysis --tree counts a parent and its agents as one unit."""
+        flat = run_script("cross_session_analysis.py",
+                          ["--project", agent_home_dir["project_name"], "--days", "7", "--focus", "tools"],
+                          agent_home_dir["env"])
+        tree = run_script("cross_session_analysis.py",
+                          ["--project", agent_home_dir["project_name"], "--days", "7", "--focus", "tools", "--tree"],
+                          agent_home_dir["env"])
+        assert tree["sessions_analyzed"] == flat["sessions_analyzed"] - 1
+        assert tree["analysis"]["total_tool_calls"] == flat["analysis"]["total_tool_calls"]
+
+
+class TestMergeAgentTrees:
+    """Unit tests for folding agents into their root session."""
+
+    @staticmethod
+    def analysis(session_id, start_time, end_time):
+        from collections import Counter
+        return {"session_id": session_id, "tool_counts": Counter(), "error_count": 0, "has_errors": False,
+                "message_count": 1, "command_stats": {}, "input_tokens": 0, "output_tokens": 0,
+                "parse_warnings": 0, "start_time": start_time, "end_time": end_time}
+
+    def test_root_without_timestamps_takes_agent_times(self):
+        """A root with no timestamped entries does not break the merge."""
+        from cross_session_analysis import merge_agent_trees
+
+        root = self.analysis("root", None, None)
+        agent = self.analysis("agent-1", "2025-12-25T10:00:00Z", "2025-12-25T10:30:00Z")
+        [merged] = merge_agent_trees([root, agent], {"agent-1": {"root": "root"}})
+        assert merged["start_time"] == "2025-12-25T10:00:00Z"
+        assert merged["end_time"] == "2025-12-25T10:30:00Z"
+        assert merged["duration_minutes"] == 30.0
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Unit tests for aggregates.py and the mergeable Aggregate in cross_session_analysis.py.
+"""
+
+import json
+import random
+import statistics
+import subprocess
+import sys
+from collections import Counter
+from pathlib import Path
+
+from aggregates import TDigest, TopK
+from cross_session_analysis import Aggregate
+
+SCRIPTS_DIR = Path(__file__).parent.parent / "scripts"
+
+
+def session(n: int, errors: int = 0, duration: float = 1.0, branch: str = "main") -> dict:
+    return {
+        "session_id": f"s{n:03d}",
+        "git_branch": branch,
+        "error_count": errors,
+        "has_errors": errors > 0,
+        "tool_counts": Counter({"Bash": n % 3 + 1, "Read": 1}),
+        "duration_minutes": duration,
+        "command_stats": {"git status": [1, n % 3 == 0, [n * 10.0]]} if n % 2 else {},
+    }
+
+
+class TestTDigest:
+    """Tests for the duration sketch."""
+
+    def test_exact_for_small_inputs(self):
+        values = [3.0, 1.0, 4.0, 1.5, 9.0, 2.6]
+        digest = TDigest()
+        for v in values:
+            digest.add(v)
+        assert digest.quantile(0.5) == statistics.median(values)
+        assert (digest.min, digest.max, digest.count) == (1.0, 9.0, 6)
+
+    def test_merged_digests_approximate_the_whole(self):
+        rng = random.Random(7)
+        values = [rng.expovariate(0.1) for _ in range(20000)]
+        parts = [TDigest() for _ in range(4)]
+        for i, v in enumerate(values):
+            parts[i % 4].add(v)
+        digest = parts[0].merge(parts[1]).merge(TDigest.from_dict(parts[2].to_dict())).merge(parts[3])
+
+        assert len(digest.centroids) <= 60
+        ordered = sorted(values)
+        for q in (0.1, 0.5, 0.9, 0.99):
+            estimate = digest.quantile(q)
+            rank = sum(1 for v in ordered if v <= estimate) / len(ordered)
+            assert abs(rank - q) < 0.01
+
+
+class TestTopK:
+    def test_keeps_largest_regardless_of_merge_order(self):
+        rows = [[n % 7, f"s{n}"] for n in range(50)]
+        whole = TopK(5)
+        for row in rows:
+            whole.push(row)
+        left, right = TopK(5), TopK(5)
+        for row in rows[:20]:
+            left.push(row)
+        for row in rows[20:]:
+            right.push(row)
+        assert right.merge(left).rows() == whole.rows()
+        assert [row[0] for row in whole.rows()] == [6, 6, 6, 6, 6]
+
+
+class TestAggregate:
+    """Merging partial aggregates gives the same answer as one pass."""
+
+    def test_merge_matches_single_pass(self):
+        sessions = [session(n, errors=n % 4, duration=n * 1.5, branch=("main", "dev")[n % 2])
+                    for n in range(40)]
+        whole = Aggregate.from_sessions(sessions)
+        merged = Aggregate()
+        for chunk in (sessions[:13], sessions[13:30], sessions[30:]):
+            part = Aggregate.from_dict(json.loads(json.dumps(Aggregate.from_sessions(chunk).to_dict())))
+            merged.merge(part)
+        for focus in ("failures", "tools", "duration", "commands"):
+            assert merged.render(focus) == whole.render(focus)
+
+    def test_partials_are_cached(self, temp_home_dir):
+        args = [sys.executable, str(SCRIPTS_DIR / "cross_session_analysis.py"),
+                "--project", temp_home_dir["project_name"], "--days", "3650", "--focus", "tools", "--profile"]
+        first = json.loads(subprocess.run(args, capture_output=True, text=True, env=temp_home_dir["env"]).stdout)
+        second = json.loads(subprocess.run(args, capture_output=True, text=True, env=temp_home_dir["env"]).stdout)
+        assert first["_perf"]["cache_hit_ratio"] == 0.0
+        assert second["_perf"]["cache_hit_ratio"] == 1.0
+        assert "files_read" not in second["_perf"]["counters"]
+        assert second["analysis"] == first["analysis"]
+
+
+class TestTrends:
+    """Tests for the daily rollup table behind --focus trends."""
+
+    def run_trends(self, env, project):
+        result = subprocess.run(
+            [sys.executable, str(SCRIPTS_DIR / "cross_session_analysis.py"), "--project", project,
+             "--days", "3650", "--focus", "trends", "--profile"],
+            capture_output=True, text=True, env=env,
+        )
+        return json.loads(result.stdout)
+
+    def test_daily_series(self, temp_home_dir):
+        output = self.run_trends(temp_home_dir["env"], temp_home_dir["project_name"])
+        assert output["status"] == "success"
+        daily = output["analysis"]["daily"]
+        assert len(daily) == 3651
+        assert sum(day["sessions"] for day in daily) == output["sessions_analyzed"] == 3
+        assert sum(day["errors"] for day in daily) >= 1
+
+    def test_rollups_update_incrementally(self, temp_home_dir, rich_session_file):
+        env = temp_home_dir["env"]
+        self.run_trends(env, temp_home_dir["project_name"])
+        unchanged = self.run_trends(env, temp_home_dir["project_name"])
+        assert "files_read" not in unchanged["_perf"]["counters"]
+
+        (temp_home_dir["project_dir"] / "rich-session-001.jsonl").write_text(rich_session_file.read_text())
+        updated = self.run_trends(env, temp_home_dir["project_name"])
+        assert updated["_perf"]["counters"]["files_read"] == 1
+        assert updated["sessions_analyzed"] == 4
+        assert updated["analysis"]["input_tokens"] > unchanged["analysis"]["input_tokens"]
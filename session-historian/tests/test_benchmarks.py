@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Smoke tests for the benchmark harness and synthetic corpus generator.
+"""
+
+import json
+import pytest
+import subprocess
+import sys
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).parent.parent / "benchmarks"
+sys.path.insert(0, str(BENCH_DIR))
+
+from corpus import CorpusGenerator
+
+
+class TestCorpusGenerator:
+    """Tests for the deterministic corpus generator."""
+
+    def test_same_seed_same_bytes(self, tmp_path):
+        """Two runs with the same seed produce identical files."""
+        dirs = [CorpusGenerator(seed=7).write_corpus(tmp_path / str(i), 3, 60, agents_per_task=1.0)
+                for i in range(2)]
+        first = {p.name: p.read_bytes() for p in dirs[0].glob("*.jsonl")}
+        second = {p.name: p.read_bytes() for p in dirs[1].glob("*.jsonl")}
+        assert first == second
+        assert any(name.startswith("agent-") for name in first)
+
+    def test_entries_are_valid_json(self, tmp_path):
+        """Every generated line parses and has a type."""
+        project_dir = CorpusGenerator(seed=1).write_corpus(tmp_path, 2, 80)
+        for session_file in project_dir.glob("*.jsonl"):
+            for line in session_file.read_text().splitlines():
+                assert json.loads(line)["type"]
+
+
+class TestRunBenchmarks:
+    """Tests for run_benchmarks.py."""
+
+    def test_reports_throughput(self):
+        """A tiny run reports MB/s, lines/s and peak RSS."""
+        result = subprocess.run(
+            [sys.executable, BENCH_DIR / "run_benchmarks.py",
+             "--sessions", "2", "--lines", "40", "--repeat", "1",
+             "--only", "build_dag,search_session"],
+            capture_output=True,
+            text=True
+        )
+        output = json.loads(result.stdout)
+        assert output["status"] == "success"
+        for name in ("build_dag", "search_session"):
+            bench = output["results"][name]
+            assert bench["mb_per_s"] > 0
+            assert bench["lines_per_s"] > 0
+            assert bench["peak_rss_mb"] > 0
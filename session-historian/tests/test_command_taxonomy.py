@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Unit tests for command_taxonomy.py and the --focus commands report built on it.
+"""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from command_taxonomy import command_heads
+
+SCRIPTS_DIR = Path(__file__).parent.parent / "scripts"
+
+
+class TestCommandHeads:
+    """Tests for tokenizing and normalizing Bash commands."""
+
+    @pytest.mark.parametrize("command,heads", [
+        ("git status", ["git status"]),
+        ("git -C repo commit -m 'fix: a && b'", ["git commit"]),
+        ("cd api && FOO=1 python -m pytest -x | tail -5", ["cd", "pytest", "tail"]),
+        ("npm run build; npm test", ["npm run", "npm test"]),
+        ("sudo timeout 30 docker compose up -d", ["docker compose"]),
+        ("/usr/bin/python3 tool.py > out.log 2>&1", ["python3"]),
+        ("gh pr create --title \"x\" || bd close abc-1", ["gh pr", "bd close"]),
+        ("echo 'unterminated", ["echo"]),
+        ("cd /repo\npytest -q", ["cd", "pytest"]),
+        ("git add -A\ngit commit -m x\nnpm test", ["git add", "git commit", "npm test"]),
+        ("git commit -m 'line one\nline two' && ls", ["git commit", "ls"]),
+        ("pytest -q \\\n  tests/ && ls", ["pytest", "ls"]),
+        ("cat > notes.md <<'EOF'\nrm -rf /\nEOF\nls", ["cat", "ls"]),
+        ("sudo -u bob docker compose up", ["docker compose"]),
+        ("env -u HOME FOO=1 npm test", ["npm test"]),
+        ("timeout -s KILL 30 pytest", ["pytest"]),
+        ("(cd a && make)", ["cd", "make"]),
+        ("{ cd a; make; }", ["cd", "make"]),
+        ("echo $(date) && ls", ["date", "echo", "ls"]),
+        ("for f in *; do echo $f; done", ["echo"]),
+        ("if [ -f x ]; then make; fi", ["[", "make"]),
+        ("if [[ -f x ]]; then make; else pytest; fi", ["make", "pytest"]),
+        ("while true; do pytest; done", ["true", "pytest"]),
+        ("case \"$1\" in\n  start|run)\n    npm start\n    ;;\n  *)\n    echo usage ;;\nesac", ["npm start", "echo"]),
+        ("VAR=$(git rev-parse HEAD) make", ["git rev-parse", "make"]),
+        ("x=`whoami` ls", ["whoami", "ls"]),
+        ("$(which python) -m pytest", ["which"]),
+        ("echo '$(not run)'", ["echo"]),
+        ("git commit -m \"$(cat <<'EOF'\nfix: don't (break\nEOF\n)\" && git push", ["cat", "git commit", "git push"]),
+    ])
+    def test_heads(self, command, heads):
+        assert command_heads(command) == heads
+
+
+class TestCommandReport:
+    def test_failure_rate_and_latency(self, temp_home_dir):
+        """Failed calls and result latency are attributed to the command head."""
+        result = subprocess.run(
+            [sys.executable, SCRIPTS_DIR / "cross_session_analysis.py", "--project", temp_home_dir["project_name"],
+             "--days", "3650", "--focus", "commands"],
+            capture_output=True, text=True, env=temp_home_dir["env"],
+        )
+        output = json.loads(result.stdout)
+        by_head = {row["command"]: row for row in output["analysis"]["command_frequency"]}
+        assert by_head["cat"]["failure_rate"] == 1.0
+        assert by_head["cat"]["median_latency_ms"] == 1000
+        assert by_head["git status"]["count"] == 2
+        assert by_head["git status"]["failures"] == 0
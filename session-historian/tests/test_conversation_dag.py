@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Unit tests for conversation_dag.py and the --active-path modes built on it.
+"""
+
+import json
+import pytest
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+from conversation_dag import build_dag
+
+SCRIPTS_DIR = Path(__file__).parent.parent / "scripts"
+
+
+class TestConversationDag:
+    """Tests for DAG reconstruction."""
+
+    def test_active_path_skips_branch_and_sidechain(self, branch_session_file):
+        """The active path follows the edited prompt, not the abandoned one."""
+        dag = build_dag(branch_session_file)
+        path = [dag.uuids[i] for i in dag.active_path()]
+        assert path == ["br-001", "br-004", "br-005", "br-006", "br-007", "br-008", "br-009", "br-010"]
+
+    def test_describe(self, branch_session_file):
+        """Branch points, abandoned entries, sidechains and compaction are reported."""
+        info = build_dag(branch_session_file).describe()
+        assert info["leaf_uuid"] == "br-010"
+        assert info["branch_points"] == ["br-001"]
+        assert info["abandoned_entries"] == 2
+        assert info["sidechain_entries"] == 2
+        assert info["sidechains"][0]["root_uuid"] == "br-s01"
+        assert info["sidechains"][0]["attached_to"] == "br-006"
+        assert info["compaction_boundaries"][0]["logical_parent_uuid"] == "br-006"
+        assert info["summary_leaves"] == ["br-010"]
+
+    def test_without_following_compaction(self, branch_session_file):
+        """Stopping at the boundary leaves only the post-compaction tail."""
+        dag = build_dag(branch_session_file, follow_compaction=False)
+        assert [dag.uuids[i] for i in dag.active_path()] == ["br-007", "br-008", "br-009", "br-010"]
+
+    def test_line_mask_keeps_entries_without_uuid(self, branch_session_file):
+        """Summary lines have no uuid and stay in the mask."""
+        mask = build_dag(branch_session_file).line_mask()
+        assert mask[0] == 1   # summary
+        assert mask[2] == 0   # abandoned assistant turn
+        assert mask[7] == 0   # sidechain
+
+    def test_agent_file_uses_sidechain_leaf(self, fixtures_dir):
+        """A transcript that is all sidechain still has an active path."""
+        dag = build_dag(fixtures_dir / "agent_session.jsonl")
+        assert len(dag.active_path()) == 6
+
+
+class TestActivePathFlag:
+    """Tests for --active-path in the existing scripts."""
+
+    def test_summarize_active_path(self, temp_home_dir, branch_session_file):
+        """summarize_session --active-path drops abandoned and sidechain tool calls."""
+        shutil.copy(branch_session_file, temp_home_dir["project_dir"] / "branch-session-001.jsonl")
+        outputs = {}
+        for flag in ([], ["--active-path"]):
+            result = subprocess.run(
+                [sys.executable, SCRIPTS_DIR / "summarize_session.py",
+                 "--session-id", "branch-session-001", *flag],
+                capture_output=True,
+                text=True,
+                env=temp_home_dir["env"]
+            )
+            outputs[bool(flag)] = json.loads(result.stdout)
+        assert outputs[False]["total_tool_calls"] == 4
+        assert outputs[True]["total_tool_calls"] == 2
+        assert outputs[True]["tools_used"] == {"Read": 1, "Edit": 1}
+        assert outputs[True]["active_path_only"] is True
+
+    def test_context_active_path(self, temp_home_dir, branch_session_file):
+        """get_session_context --active-path reports the conversation structure."""
+        shutil.copy(branch_session_file, temp_home_dir["project_dir"] / "branch-session-001.jsonl")
+        result = subprocess.run(
+            [sys.executable, SCRIPTS_DIR / "get_session_context.py",
+             "--session-id", "branch-session-001", "--active-path"],
+            capture_output=True,
+            text=True,
+            env=temp_home_dir["env"]
+        )
+        output = json.loads(result.stdout)
+        assert output["status"] == "success"
+        assert output["statistics"]["errors"] == 0
+        assert output["conversation"]["abandoned_entries"] == 2
+
+    def test_dag_script(self, temp_home_dir, branch_session_file):
+        """conversation_dag.py reports the DAG as JSON."""
+        shutil.copy(branch_session_file, temp_home_dir["project_dir"] / "branch-session-001.jsonl")
+        result = subprocess.run(
+            [sys.executable, SCRIPTS_DIR / "conversation_dag.py",
+             "--session-id", "branch-session-001"],
+            capture_output=True,
+            text=True,
+            env=temp_home_dir["env"]
+        )
+        output = json.loads(result.stdout)
+        assert output["status"] == "success"
+        assert output["active_path_length"] == 8
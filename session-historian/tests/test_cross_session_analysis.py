@@ -119,3 +119,38 @@ class TestCrossSessionAnalysis:
         # If we have duration data, median should be between min and max
         if "median_duration" in analysis and "min_duration" in analysis and "max_duration" in analysis:
             assert analysis["min_duration"] <= analysis["median_duration"] <= analysis["max_duration"]
+
+
+class TestAllProjects:
+    """Tests for --all-projects and project globs."""
+
+    def run_analysis(self, env, *args):
+        result = subprocess.run(
+            [sys.executable, SCRIPTS_DIR / "cross_session_analysis.py", "--days", "3650", *args],
+            capture_output=True, text=True, env=env,
+        )
+        return json.loads(result.stdout)
+
+    def test_global_totals_match_per_project(self, multi_project_home_dir):
+        output = self.run_analysis(multi_project_home_dir["env"], "--all-projects", "--focus", "tools",
+                                   "--workers", "2")
+        assert output["status"] == "success"
+        assert output["projects_analyzed"] == 2
+        per_project = output["by_project"]
+        assert output["sessions_analyzed"] == sum(p["sessions_analyzed"] for p in per_project) == 5
+        assert output["analysis"]["total_tool_calls"] == sum(p["analysis"]["total_tool_calls"] for p in per_project)
+
+    def test_single_project_matches_its_breakdown(self, multi_project_home_dir):
+        env = multi_project_home_dir["env"]
+        fleet = self.run_analysis(env, "--all-projects", "--focus", "failures")
+        single = self.run_analysis(env, "--project", "test-project", "--focus", "failures")
+        breakdown = next(p for p in fleet["by_project"] if p["project_dir"].endswith("-home-test-project"))
+        assert breakdown["analysis"] == single["analysis"]
+
+    def test_glob_selects_projects(self, multi_project_home_dir):
+        output = self.run_analysis(multi_project_home_dir["env"], "--project", "*-api", "--focus", "failures")
+        assert output["projects_matched"] == 1
+        assert [p["project_dir"] for p in output["by_project"]] == [str(multi_project_home_dir["api_dir"])]
+
+        output = self.run_analysis(multi_project_home_dir["env"], "--project", "nomatch-*")
+        assert output["status"] == "error"
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Unit tests for cursors.py and --cursor paging in list_sessions and search_sessions.
+"""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+from cursors import decode_cursor, encode_cursor
+
+SCRIPTS_DIR = Path(__file__).parent.parent / "scripts"
+
+
+def run_script(name, args, env):
+    result = subprocess.run(
+        [sys.executable, str(SCRIPTS_DIR / name), *args],
+        capture_output=True, text=True, env=env,
+    )
+    return result.returncode, json.loads(result.stdout)
+
+
+class TestCursorTokens:
+    """Tests for encoding and validating cursors."""
+
+    def test_round_trip(self):
+        query = {"command": "list", "days": 7}
+        key = ("2025-12-20T10:00:00.000Z", "-home-test-project", "abc")
+        assert decode_cursor(encode_cursor(key, query), query) == key
+
+    def test_rejects_other_query_and_garbage(self):
+        token = encode_cursor(("", "p", "s"), {"command": "list", "days": 7})
+        for bad_token, query in ((token, {"command": "list", "days": 30}),
+                                 ("not-a-cursor", {"command": "list", "days": 7})):
+            try:
+                decode_cursor(bad_token, query)
+            except ValueError:
+                continue
+            raise AssertionError(f"{bad_token!r} was accepted")
+
+
+class TestPaging:
+    """Tests for walking list and search results page by page."""
+
+    def collect(self, name, args, key, env):
+        seen, cursor = [], None
+        while True:
+            code, data = run_script(name, [*args, *(["--cursor", cursor] if cursor else [])], env)
+            assert code == 0, data
+            seen.extend(item["session_id"] for item in data[key])
+            cursor = data["next_cursor"]
+            if cursor is None:
+                return seen
+
+    def test_list_pages_cover_every_session_once(self, temp_home_dir):
+        args = ["--project", temp_home_dir["project_name"], "--days", "3650"]
+        code, full = run_script("list_sessions.py", args, temp_home_dir["env"])
+        paged = self.collect("list_sessions.py", [*args, "--limit", "1"], "sessions", temp_home_dir["env"])
+        assert paged == [s["session_id"] for s in full["sessions"]]
+        assert len(paged) == 3
+        assert full["next_cursor"] is None
+
+    def test_search_pages_cover_every_match_once(self, temp_home_dir):
+        args = ["--project", temp_home_dir["project_name"], "--days", "3650"]
+        code, full = run_script("search_sessions.py", args, temp_home_dir["env"])
+        paged = self.collect("search_sessions.py", [*args, "--limit", "1"], "matches", temp_home_dir["env"])
+        assert sorted(paged) == sorted(m["session_id"] for m in full["matches"])
+        assert len(set(paged)) == len(paged)
+
+    def test_cursor_from_another_query_is_rejected(self, temp_home_dir):
+        args = ["--project", temp_home_dir["project_name"], "--days", "3650", "--limit", "1"]
+        code, first = run_script("list_sessions.py", args, temp_home_dir["env"])
+        code, data = run_script("list_sessions.py",
+                                ["--project", temp_home_dir["project_name"], "--days", "30",
+                                 "--cursor", first["next_cursor"]],
+                                temp_home_dir["env"])
+        assert code == 1
+        assert "different query" in data["error"]
+
+    def test_limit_below_one_is_rejected(self, temp_home_dir):
+        for name in ("list_sessions.py", "search_sessions.py"):
+            result = subprocess.run(
+                [sys.executable, str(SCRIPTS_DIR / name), "--project", temp_home_dir["project_name"], "--limit", "0"],
+                capture_output=True, text=True, env=temp_home_dir["env"],
+            )
+            assert result.returncode == 2
+            assert "--limit must be at least 1" in result.stderr
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Unit tests for file_activity.py and the indexed search_sessions --file.
+"""
+
+import json
+import pytest
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+from file_activity import extract_file_activity
+
+SCRIPTS_DIR = Path(__file__).parent.parent / "scripts"
+
+
+class TestFileActivity:
+    """Tests for combining tool inputs and file-history snapshots."""
+
+    def test_tool_inputs_and_snapshots_combined(self, rich_session_file):
+        """Edit inputs and snapshot-only files both appear, relative paths resolved via cwd."""
+        files = extract_file_activity(rich_session_file)["files"]
+        parser = files["/home/test/project/src/parser.py"]
+        assert parser["ops"] == {"edit": 1}
+        assert parser["snapshot_versions"] == 1
+        assert parser["churn"] == 1
+
+        lexer = files["/home/test/project/src/lexer.py"]
+        assert lexer["ops"] == {}
+        assert lexer["churn"] == 2
+
+    def test_hot_files(self, temp_home_dir, rich_session_file):
+        """--hot ranks files by churn."""
+        shutil.copy(rich_session_file, temp_home_dir["project_dir"] / "rich-session-001.jsonl")
+        result = subprocess.run(
+            [sys.executable, SCRIPTS_DIR / "file_activity.py",
+             "--project", temp_home_dir["project_name"], "--days", "3650", "--hot"],
+            capture_output=True,
+            text=True,
+            env=temp_home_dir["env"]
+        )
+        output = json.loads(result.stdout)
+        assert output["status"] == "success"
+        assert [f["file"] for f in output["hot_files"]][:2] == [
+            "/home/test/project/src/lexer.py",
+            "/home/test/project/src/parser.py",
+        ]
+
+    def test_file_lookup(self, temp_home_dir, rich_session_file):
+        """--file lists the sessions that touched a path."""
+        shutil.copy(rich_session_file, temp_home_dir["project_dir"] / "rich-session-001.jsonl")
+        result = subprocess.run(
+            [sys.executable, SCRIPTS_DIR / "file_activity.py",
+             "--project", temp_home_dir["project_name"], "--days", "3650", "--file", "parser.py"],
+            capture_output=True,
+            text=True,
+            env=temp_home_dir["env"]
+        )
+        output = json.loads(result.stdout)
+        assert output["total_matches"] == 1
+        assert output["sessions"][0]["session_id"] == "rich-session-001"
+
+    def test_search_file_uses_index(self, temp_home_dir, rich_session_file):
+        """search_sessions --file only opens sessions the index says touched the file."""
+        shutil.copy(rich_session_file, temp_home_dir["project_dir"] / "rich-session-001.jsonl")
+        result = subprocess.run(
+            [sys.executable, SCRIPTS_DIR / "search_sessions.py",
+             "--project", temp_home_dir["project_name"], "--days", "7", "--file", "lexer.py"],
+            capture_output=True,
+            text=True,
+            env=temp_home_dir["env"]
+        )
+        output = json.loads(result.stdout)
+        assert output["status"] == "success"
+        assert output["sessions_searched"] == 1
+        assert output["matches"][0]["matches"][0]["operation"] == "snapshot"
+        cache = Path(temp_home_dir["env"]["SESSION_HISTORIAN_CACHE"]) / "file_index"
+        assert (cache / "-home-test-project.json").exists()
+
+    def test_summarize_lists_tracked_files(self, temp_home_dir, rich_session_file):
+        """summarize_session reports snapshot-tracked files."""
+        shutil.copy(rich_session_file, temp_home_dir["project_dir"] / "rich-session-001.jsonl")
+        result = subprocess.run(
+            [sys.executable, SCRIPTS_DIR / "summarize_session.py",
+             "--session-id", "rich-session-001"],
+            capture_output=True,
+            text=True,
+            env=temp_home_dir["env"]
+        )
+        output = json.loads(result.stdout)
+        assert output["files_touched"]["tracked"] == ["/home/test/project/src/parser.py", "src/lexer.py"]
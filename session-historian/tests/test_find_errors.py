@@ -90,3 +90,36 @@ class TestFindErrors:
         assert output["status"] == "success"
         assert "affected_sessions" in output
         assert len(output["affected_sessions"]) >= 1, "Should include at least one session"
+
+    def test_all_projects(self, multi_project_home_dir):
+        """--all-projects merges per-project error summaries."""
+        result = subprocess.run(
+            [sys.executable, SCRIPTS_DIR / "find_errors.py", "--all-projects", "--days", "3650", "--workers", "2"],
+            capture_output=True,
+            text=True,
+            env=multi_project_home_dir["env"]
+        )
+        output = json.loads(result.stdout)
+        assert output["status"] == "success"
+        assert len(output["by_project"]) == 2
+        assert output["total_sessions"] == 5
+        assert output["total_errors"] == sum(p["total_errors"] for p in output["by_project"])
+        assert {e["session_id"] for e in output["recent_errors"]} >= {"error-session-001", "api-error-001"}
+
+    def test_errors_joined_to_tool_calls(self, temp_home_dir):
+        """Each error carries the tool call it came from; rates are per tool and command."""
+        result = subprocess.run(
+            [sys.executable, SCRIPTS_DIR / "find_errors.py",
+             "--project", temp_home_dir["project_name"], "--days", "3650"],
+            capture_output=True,
+            text=True,
+            env=temp_home_dir["env"]
+        )
+        output = json.loads(result.stdout)
+        bash_error = next(e for e in output["recent_errors"] if e["tool"] == "Bash")
+        assert bash_error["commands"] == ["cat"]
+        read_error = next(e for e in output["recent_errors"] if e["tool"] == "Read")
+        assert read_error["file"]
+        by_tool = {row["tool"]: row for row in output["failure_rate_by_tool"]}
+        assert by_tool["Bash"]["failures"] <= by_tool["Bash"]["calls"]
+        assert {row["command"] for row in output["failure_rate_by_command"]} == {"cat"}
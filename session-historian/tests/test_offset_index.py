@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Unit tests for offset_index.py and the get_session_context windows built on it.
+"""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+from offset_index import load_offset_index, normalize_timestamp
+from perf import PERF
+
+SCRIPTS_DIR = Path(__file__).parent.parent / "scripts"
+
+
+def tool_turns(start: int, count: int) -> str:
+    """Assistant tool_use + user tool_result pairs, one second apart."""
+    lines = []
+    for i in range(start, start + count):
+        ts = f"2025-12-20T10:{i // 60:02d}:{i % 60:02d}.000Z"
+        lines.append(json.dumps({
+            "type": "assistant", "timestamp": ts,
+            "message": {"content": [{"type": "tool_use", "id": f"toolu_{i:03d}", "name": "Bash",
+                                     "input": {"command": f"echo {i}"}}]},
+        }))
+        lines.append(json.dumps({
+            "type": "user", "timestamp": ts,
+            "message": {"content": [{"type": "tool_result", "tool_use_id": f"toolu_{i:03d}",
+                                     "content": f"{i}"}]},
+        }))
+    return "".join(line + "\n" for line in lines)
+
+
+def write_session(path: Path, calls: int) -> Path:
+    prompt = json.dumps({"type": "user", "timestamp": "2025-12-20T09:59:59.000Z",
+                         "message": {"content": "run the numbers"}})
+    path.write_text(prompt + "\n" + tool_turns(0, calls))
+    return path
+
+
+class TestOffsetIndex:
+    """Tests for building and refreshing the index."""
+
+    def test_offsets_point_at_lines(self, tmp_path):
+        session_file = write_session(tmp_path / "s.jsonl", 10)
+        index = load_offset_index(session_file, use_cache=False)
+        data = session_file.read_bytes()
+        assert index.lines == 21
+        assert index.user_messages == [0]
+        for line_no, offset in enumerate(index.offsets):
+            assert data[offset:].split(b"\n", 1)[0] == data.splitlines()[line_no]
+        assert index.tool_uses["toolu_004"] == 9
+        assert index.tool_results["toolu_004"] == 10
+
+    def test_incremental_update(self, tmp_path, monkeypatch):
+        """Appended lines are indexed from the previous end of file."""
+        monkeypatch.setenv("SESSION_HISTORIAN_CACHE", str(tmp_path / "cache"))
+        session_file = write_session(tmp_path / "s.jsonl", 5)
+        load_offset_index(session_file)
+
+        with open(session_file, "a") as f:
+            f.write(tool_turns(5, 3))
+            f.write('{"type": "assistant", "timest')  # partial line still being written
+        PERF.enable()
+        try:
+            index = load_offset_index(session_file)
+            assert PERF.counters["cache_partial_hits"] == 1
+        finally:
+            PERF.enabled = False
+            PERF.counters.clear()
+        assert index.lines == 17
+        assert index.tool_uses["toolu_007"] == 15
+        assert load_offset_index(session_file, use_cache=False).offsets == index.offsets
+
+    def test_rewritten_file_is_rebuilt(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("SESSION_HISTORIAN_CACHE", str(tmp_path / "cache"))
+        session_file = write_session(tmp_path / "s.jsonl", 5)
+        load_offset_index(session_file)
+        session_file.write_text(tool_turns(20, 8))
+        index = load_offset_index(session_file)
+        assert index.user_messages == []
+        assert "toolu_000" not in index.tool_uses
+        assert index.lines == 16
+
+    def test_windows(self, tmp_path):
+        index = load_offset_index(write_session(tmp_path / "s.jsonl", 10), use_cache=False)
+        assert index.time_range(normalize_timestamp("2025-12-20T10:00:03Z"),
+                                normalize_timestamp("2025-12-20T10:00:04Z")) == (7, 11)
+        assert index.around("toolu_005", 1) == (10, 14)
+        first, stop, pages, ids = index.tool_call_page(1, 4)
+        assert pages == 3
+        assert ids == ["toolu_006", "toolu_007", "toolu_008", "toolu_009"]
+        assert (first, stop) == (13, 21)
+
+    def test_normalize_timestamp(self):
+        assert normalize_timestamp("2025-12-20T10:00:03") == "2025-12-20T10:00:03.000Z"
+        assert normalize_timestamp("2025-12-20T12:00:03+02:00") == "2025-12-20T10:00:03.000Z"
+
+
+class TestContextWindows:
+    """Tests for get_session_context --from/--to, --around and --page."""
+
+    def run_context(self, temp_home_dir, *args):
+        result = subprocess.run(
+            [sys.executable, str(SCRIPTS_DIR / "get_session_context.py"), "--session-id", "big-session", *args],
+            capture_output=True, text=True, env=temp_home_dir["env"],
+        )
+        return result.returncode, json.loads(result.stdout) if result.stdout else None
+
+    def test_page_of_tool_calls(self, temp_home_dir):
+        write_session(temp_home_dir["project_dir"] / "big-session.jsonl", 30)
+        code, data = self.run_context(temp_home_dir, "--page", "2", "--page-size", "10")
+        assert code == 0
+        assert [c["id"] for c in data["tool_calls"]] == [f"toolu_{i:03d}" for i in range(10, 20)]
+        assert data["window"]["pages"] == 3
+        assert data["statistics"]["user_messages"] == 10  # only tool results in the window
+
+    def test_around_and_time_window(self, temp_home_dir):
+        write_session(temp_home_dir["project_dir"] / "big-session.jsonl", 30)
+        code, data = self.run_context(temp_home_dir, "--around", "toolu_012", "--context-lines", "0")
+        assert code == 0
+        assert [c["id"] for c in data["tool_calls"]] == ["toolu_012"]
+        assert [r["tool_use_id"] for r in data["tool_results"]] == ["toolu_012"]
+
+        code, data = self.run_context(temp_home_dir, "--from", "2025-12-20T10:00:25Z")
+        assert [c["id"] for c in data["tool_calls"]] == [f"toolu_{i:03d}" for i in range(25, 30)]
+        assert data["metadata"]["start_time"] == "2025-12-20T10:00:25.000Z"
+
+    def test_unknown_tool_use_id(self, temp_home_dir):
+        write_session(temp_home_dir["project_dir"] / "big-session.jsonl", 3)
+        code, data = self.run_context(temp_home_dir, "--around", "toolu_nope")
+        assert code == 1
+        assert data["status"] == "error"
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the shared reader (session_io.py) and --profile instrumentation (perf.py).
+"""
+
+import json
+import pstats
+import subprocess
+import sys
+from pathlib import Path
+
+from session_io import iter_entries
+
+SCRIPTS_DIR = Path(__file__).parent.parent / "scripts"
+
+
+class TestIterEntries:
+    """Tests for the shared JSONL reader."""
+
+    def test_skips_blank_and_malformed_lines(self, tmp_path):
+        """Malformed and non-object lines are counted as parse warnings."""
+        session_file = tmp_path / "s.jsonl"
+        session_file.write_text('{"type": "user"}\n\nnot json\n[1, 2]\n{"type": "assistant"}\n')
+        stats = {"parse_warnings": 0}
+        entries = list(iter_entries(session_file, stats=stats))
+        assert [e["type"] for e in entries] == ["user", "assistant"]
+        assert stats["parse_warnings"] == 2
+
+    def test_line_mask_and_line_numbers(self, tmp_path):
+        """Masked lines are skipped; lines past the end of the mask are kept."""
+        session_file = tmp_path / "s.jsonl"
+        session_file.write_text("".join(json.dumps({"n": i}) + "\n" for i in range(4)))
+        mask = bytearray([1, 0, 1])
+        entries = list(iter_entries(session_file, line_mask=mask, with_line_numbers=True))
+        assert [line_no for line_no, _ in entries] == [0, 2, 3]
+
+    def test_prefilter(self, tmp_path):
+        """Lines without any prefilter needle are not decoded."""
+        session_file = tmp_path / "s.jsonl"
+        session_file.write_text('{"uuid": "a"}\n{"type": "x"}\n{"leafUuid": "b"}\n')
+        entries = list(iter_entries(session_file, prefilter=(b'"uuid"', b'"leafUuid"')))
+        assert len(entries) == 2
+
+
+class TestProfileFlag:
+    """Tests for --profile, --profile-out and --profile-collapsed."""
+
+    def run_script(self, name, args, env):
+        result = subprocess.run(
+            [sys.executable, str(SCRIPTS_DIR / name), *args],
+            capture_output=True, text=True, env=env,
+        )
+        assert result.returncode == 0, result.stderr
+        return json.loads(result.stdout)
+
+    def test_no_perf_section_by_default(self, temp_home_dir):
+        """Normal runs produce unchanged output."""
+        data = self.run_script("summarize_session.py", ["--session-id", "test-session-001"],
+                               temp_home_dir["env"])
+        assert "_perf" not in data
+
+    def test_perf_section(self, temp_home_dir):
+        """--profile reports phases, reader counters and peak RSS."""
+        data = self.run_script("list_sessions.py",
+                               ["--project", temp_home_dir["project_name"], "--days", "3650", "--profile"],
+                               temp_home_dir["env"])
+        perf = data["_perf"]
+        assert {"walk", "process", "decode", "serialize"} <= set(perf["phases"])
+        assert perf["phases"]["process"]["calls"] == 3
+        assert perf["counters"]["cache_misses"] == 3  # start times, first run
+        assert perf["counters"]["bytes_read"] > 0
+        assert perf["counters"]["lines_decoded"] <= perf["counters"]["lines_read"]
+        assert perf["total_wall_ms"] >= perf["phases"]["process"]["wall_ms"]
+
+    def test_cache_hit_ratio(self, agent_home_dir):
+        """A second run over an unchanged project is served from the cache."""
+        args = ["--project", agent_home_dir["project_name"], "--profile"]
+        first = self.run_script("agent_tree.py", args, agent_home_dir["env"])["_perf"]
+        second = self.run_script("agent_tree.py", args, agent_home_dir["env"])["_perf"]
+        assert first["cache_hit_ratio"] == 0.0
+        assert second["cache_hit_ratio"] == 1.0
+        assert "files_read" not in second["counters"]
+
+    def test_dag_prefilter_counted(self, temp_home_dir, branch_session_file):
+        """The DAG builder skips lines without a uuid before decoding them."""
+        session_file = temp_home_dir["project_dir"] / "branch-session-001.jsonl"
+        session_file.write_text(branch_session_file.read_text() + '{"type": "queue-operation"}\n')
+        data = self.run_script("conversation_dag.py", ["--session-id", "branch-session-001", "--profile"],
+                               temp_home_dir["env"])
+        assert data["_perf"]["counters"]["lines_skipped_prefilter"] == 1
+        assert data["total_lines"] == len(session_file.read_text().splitlines())
+
+    def test_profile_outputs(self, temp_home_dir, tmp_path):
+        """--profile-out writes loadable pstats; --profile-collapsed writes stack lines."""
+        stats_path = tmp_path / "run.prof"
+        collapsed_path = tmp_path / "run.folded"
+        data = self.run_script("get_session_context.py",
+                               ["--session-id", "error-session-001",
+                                "--profile-out", str(stats_path),
+                                "--profile-collapsed", str(collapsed_path)],
+                               temp_home_dir["env"])
+        assert data["_perf"]["profile_out"] == str(stats_path)
+        assert pstats.Stats(str(stats_path)).total_calls > 0
+        for line in collapsed_path.read_text().splitlines():
+            stack, count = line.rsplit(" ", 1)
+            assert stack and int(count) > 0
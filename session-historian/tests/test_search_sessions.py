@@ -5,6 +5,7 @@ Unit tests for search_sessions.py
 
 import json
 import pytest
+import shutil
 import subprocess
 import sys
 from pathlib import Path
@@ -104,3 +105,82 @@ class TestSearchSessions:
         assert output["status"] == "success"
         filters = output.get("filters_applied", {})
         assert "has_errors" in filters
+
+    def test_text_search_defaults_to_messages(self, temp_home_dir, rich_session_file):
+        """Tool result content is not searched unless --in asks for it."""
+        shutil.copy(rich_session_file, temp_home_dir["project_dir"] / "rich-session-001.jsonl")
+        result = subprocess.run(
+            [sys.executable, SCRIPTS_DIR / "search_sessions.py",
+             "--project", temp_home_dir["project_name"], "--days", "7",
+             "--text", "RecursionError"],
+            capture_output=True,
+            text=True,
+            env=temp_home_dir["env"]
+        )
+        output = json.loads(result.stdout)
+        assert output["status"] == "success"
+        assert output["total_matches"] == 0
+
+    def test_in_results_searches_list_form_tool_results(self, temp_home_dir, rich_session_file):
+        """--in results finds text inside list-of-blocks tool results."""
+        shutil.copy(rich_session_file, temp_home_dir["project_dir"] / "rich-session-001.jsonl")
+        result = subprocess.run(
+            [sys.executable, SCRIPTS_DIR / "search_sessions.py",
+             "--project", temp_home_dir["project_name"], "--days", "7",
+             "--text", "recursionerror", "--in", "results"],
+            capture_output=True,
+            text=True,
+            env=temp_home_dir["env"]
+        )
+        output = json.loads(result.stdout)
+        assert output["status"] == "success"
+        assert [m["session_id"] for m in output["matches"]] == ["rich-session-001"]
+        match = output["matches"][0]["matches"][0]
+        assert match["location"] == "tool_result"
+        assert match["tool_use_id"] == "toolu_rich001"
+        assert "RecursionError" in match["preview"]
+        assert output["filters_applied"]["in"] == ["results"]
+
+    def test_in_thinking_and_inputs(self, temp_home_dir, rich_session_file):
+        """--in thinking,inputs searches thinking blocks and tool_use inputs."""
+        shutil.copy(rich_session_file, temp_home_dir["project_dir"] / "rich-session-001.jsonl")
+        result = subprocess.run(
+            [sys.executable, SCRIPTS_DIR / "search_sessions.py",
+             "--project", temp_home_dir["project_name"], "--days", "7",
+             "--text", "tokenize", "--in", "thinking,inputs"],
+            capture_output=True,
+            text=True,
+            env=temp_home_dir["env"]
+        )
+        output = json.loads(result.stdout)
+        assert output["status"] == "success"
+        locations = {m["location"] for m in output["matches"][0]["matches"]}
+        assert locations == {"thinking", "tool_input"}
+
+    def test_invalid_scope_rejected(self, temp_home_dir):
+        """Unknown --in scopes are an argument error."""
+        result = subprocess.run(
+            [sys.executable, SCRIPTS_DIR / "search_sessions.py",
+             "--text", "x", "--in", "results,bogus"],
+            capture_output=True,
+            text=True,
+            env=temp_home_dir["env"]
+        )
+        assert result.returncode != 0
+        assert "bogus" in result.stderr
+
+
+class TestFindText:
+    """Tests for the chunked case-insensitive matcher."""
+
+    def test_match_across_chunk_boundary(self):
+        from search_sessions import find_text
+
+        text = "x" * 20 + "NeedLE" + "y" * 20
+        for chunk_size in (4, 7, 21, 23, 100):
+            assert find_text(text, "needle", chunk_size=chunk_size) == 20
+
+    def test_no_match(self):
+        from search_sessions import find_text
+
+        assert find_text("a" * 1000, "b", chunk_size=16) == -1
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Unit tests for session_archive.py and transparent reading of archived sessions.
+"""
+
+import gzip
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from session_archive import archive_session, iter_archive_lines, load_index, restore_session
+from session_io import iter_entries, session_files
+
+SCRIPTS_DIR = Path(__file__).parent.parent / "scripts"
+
+
+def age(path: Path, days: int) -> None:
+    old = time.time() - days * 86400
+    os.utime(path, (old, old))
+
+
+def run_script(name, args, env):
+    result = subprocess.run([sys.executable, str(SCRIPTS_DIR / name), *args],
+                            capture_output=True, text=True, env=env)
+    return result.returncode, json.loads(result.stdout)
+
+
+class TestArchiveSession:
+    """Tests for the archive format."""
+
+    def test_round_trip(self, tmp_path, rich_session_file):
+        """Archive then restore gives back identical bytes and mtime."""
+        session_file = tmp_path / "s-001.jsonl"
+        session_file.write_bytes(rich_session_file.read_bytes())
+        age(session_file, 40)
+        mtime = session_file.stat().st_mtime_ns
+
+        info = archive_session(session_file)
+        archive = tmp_path / "s-001.jsonl.gz"
+        assert not session_file.exists()
+        assert archive.stat().st_mtime_ns == mtime
+        assert info["source_bytes"] == len(rich_session_file.read_bytes())
+        assert gzip.decompress(archive.read_bytes()) == rich_session_file.read_bytes()
+
+        restore_session(archive)
+        assert session_file.read_bytes() == rich_session_file.read_bytes()
+        assert session_file.stat().st_mtime_ns == mtime
+        assert not archive.exists()
+
+    def test_seek_by_line(self, tmp_path):
+        """Small frames: reading from line N starts at the frame holding N."""
+        session_file = tmp_path / "s-002.jsonl"
+        session_file.write_text("".join(json.dumps({"n": i, "pad": "x" * 50}) + "\n" for i in range(100)))
+        archive_session(session_file, frame_bytes=500)
+        archive = tmp_path / "s-002.jsonl.gz"
+
+        index = load_index(archive)
+        assert len(index["frames"]) > 5
+        assert index["lines"] == 100
+
+        lines = list(iter_archive_lines(archive, start_line=57))
+        assert lines[0][0] == 57
+        assert json.loads(lines[0][1])["n"] == 57
+        assert len(lines) == 43
+
+    def test_shared_reader_reads_archives(self, tmp_path, simple_session_file):
+        """iter_entries yields the same entries from an archive as from the original."""
+        session_file = tmp_path / "s-003.jsonl"
+        session_file.write_bytes(simple_session_file.read_bytes())
+        expected = list(iter_entries(session_file))
+        archive_session(session_file)
+        assert list(iter_entries(tmp_path / "s-003.jsonl.gz")) == expected
+        assert session_files(tmp_path) == [tmp_path / "s-003.jsonl.gz"]
+
+    def test_refuses_to_overwrite_archive(self, tmp_path, simple_session_file):
+        session_file = tmp_path / "s-004.jsonl"
+        session_file.write_bytes(simple_session_file.read_bytes())
+        (tmp_path / "s-004.jsonl.gz").write_bytes(b"")
+        try:
+            archive_session(session_file)
+        except OSError as e:
+            assert "already exists" in str(e)
+        else:
+            raise AssertionError("expected OSError")
+        assert session_file.exists()
+
+
+class TestArchiveCommand:
+    """Tests for the archive CLI and the other scripts on archived sessions."""
+
+    def test_archive_old_sessions_only(self, temp_home_dir):
+        project_dir = temp_home_dir["project_dir"]
+        age(project_dir / "test-session-001.jsonl", 60)
+        age(project_dir / "error-session-001.jsonl", 60)
+
+        code, dry = run_script("session_archive.py",
+                               ["--project", temp_home_dir["project_name"], "--days", "30", "--dry-run"],
+                               temp_home_dir["env"])
+        assert code == 0
+        assert {c["session_id"] for c in dry["candidates"]} == {"test-session-001", "error-session-001"}
+        assert (project_dir / "test-session-001.jsonl").exists()
+
+        code, data = run_script("session_archive.py",
+                                ["--project", temp_home_dir["project_name"], "--days", "30"],
+                                temp_home_dir["env"])
+        assert code == 0
+        assert len(data["archived"]) == 2
+        assert (project_dir / "error-session-001.jsonl.gz").exists()
+        assert (project_dir / "test-session-002.jsonl").exists()
+
+    def test_scripts_read_archived_sessions(self, temp_home_dir):
+        """Summaries, errors and search work the same after archiving."""
+        env = temp_home_dir["env"]
+        project = temp_home_dir["project_name"]
+        project_dir = temp_home_dir["project_dir"]
+
+        _, before = run_script("summarize_session.py", ["--session-id", "error-session-001"], env)
+        _, errors_before = run_script("find_errors.py", ["--project", project, "--days", "3650"], env)
+        age(project_dir / "error-session-001.jsonl", 60)
+        run_script("session_archive.py", ["--project", project, "--days", "30"], env)
+
+        _, after = run_script("summarize_session.py", ["--session-id", "error-session-001"], env)
+        assert after["file_path"].endswith(".jsonl.gz")
+        for key in ("session_id", "statistics", "tools_used", "errors"):
+            assert after.get(key) == before.get(key)
+
+        _, errors_after = run_script("find_errors.py", ["--project", project, "--days", "3650"], env)
+        assert errors_after["total_errors"] == errors_before["total_errors"]
+
+        _, found = run_script("search_sessions.py",
+                              ["--project", project, "--days", "3650", "--tool", "Bash"], env)
+        assert "error-session-001" in {m["session_id"] for m in found["matches"]}
+
+    def test_restore_unknown_session(self, temp_home_dir):
+        code, data = run_script("session_archive.py",
+                                ["--project", temp_home_dir["project_name"], "--restore", "nope"],
+                                temp_home_dir["env"])
+        assert code == 1
+        assert data["status"] == "error"
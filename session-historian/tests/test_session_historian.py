@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the session_historian.py single entry point.
+"""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).parent.parent / "scripts"
+
+# Modules a small `list` or `summarize` query must not pay for at start-up
+HEAVY_MODULES = ["statistics", "tempfile", "hashlib", "cProfile", "agent_tree",
+                 "conversation_dag", "file_activity"]
+
+
+class TestSessionHistorianCli:
+    """Tests for subcommand dispatch and lazy imports."""
+
+    def run_cli(self, args, env):
+        return subprocess.run(
+            [sys.executable, str(SCRIPTS_DIR / "session_historian.py"), *args],
+            capture_output=True, text=True, env=env,
+        )
+
+    def test_list_matches_script(self, temp_home_dir):
+        """`list` produces the same JSON as list_sessions.py."""
+        args = ["--project", temp_home_dir["project_name"], "--days", "3650"]
+        cli = self.run_cli(["list", *args], temp_home_dir["env"])
+        script = subprocess.run([sys.executable, str(SCRIPTS_DIR / "list_sessions.py"), *args],
+                                capture_output=True, text=True, env=temp_home_dir["env"])
+        assert cli.returncode == 0, cli.stderr
+        assert json.loads(cli.stdout) == json.loads(script.stdout)
+
+    def test_exit_code_is_forwarded(self, temp_home_dir):
+        """A failing subcommand exits 1 with its JSON error."""
+        result = self.run_cli(["summarize", "--session-id", "nonexistent"], temp_home_dir["env"])
+        assert result.returncode == 1
+        assert json.loads(result.stdout)["status"] == "error"
+
+    def test_unknown_command(self, temp_home_dir):
+        """Unknown commands print usage and exit 2."""
+        result = self.run_cli(["bogus"], temp_home_dir["env"])
+        assert result.returncode == 2
+        assert "unknown command" in result.stderr
+
+    def test_no_command_prints_usage(self, temp_home_dir):
+        result = self.run_cli([], temp_home_dir["env"])
+        assert result.returncode == 1
+        assert "summarize" in result.stdout
+
+    def test_small_queries_skip_heavy_modules(self, temp_home_dir):
+        """Only the subcommand's own module and its direct needs are imported."""
+        code = (
+            "import io, json, sys, contextlib\n"
+            f"sys.path.insert(0, {str(SCRIPTS_DIR)!r})\n"
+            "import session_historian\n"
+            "loaded = {}\n"
+            "for argv in (['list', '--project', 'test-project', '--limit', '5'],\n"
+            "             ['summarize', '--session-id', 'test-session-001']):\n"
+            "    with contextlib.redirect_stdout(io.StringIO()):\n"
+            "        session_historian.main(argv)\n"
+            f"    loaded[argv[0]] = [m for m in {HEAVY_MODULES!r} if m in sys.modules]\n"
+            "print(json.dumps(loaded))\n"
+        )
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                                env=temp_home_dir["env"])
+        assert result.returncode == 0, result.stderr
+        assert json.loads(result.stdout) == {"list": [], "summarize": []}
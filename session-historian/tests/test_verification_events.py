@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Unit tests for verification_events.py and summarize_session.py --verification
+"""
+
+import gzip
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+SCRIPTS_DIR = Path(__file__).parent.parent / "scripts"
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+from verification_events import load_event_index  # noqa: E402
+
+
+def event(session_id, action, ts, gate="bd_close", reason=None, issue_ids="proj-1"):
+    details = {"issue_ids": issue_ids}
+    if reason:
+        details["reason"] = reason
+    return {"ts": ts, "session_id": session_id, "gate": gate, "action": action, "duration_ms": 40,
+            "details": details}
+
+
+@pytest.fixture
+def verification_log(multi_project_home_dir):
+    """An events.jsonl for the multi-project fixture sessions, exposed via $VERIFICATION_LOG."""
+    data_dir = multi_project_home_dir["home"] / ".local" / "share" / "verification-hooks"
+    data_dir.mkdir(parents=True)
+    log = data_dir / "events.jsonl"
+    events = [
+        # test-session-001 (main): 1 blocked, 1 allowed, plus a logger event that is not joined
+        event("test-session-001", "blocked", "2025-12-25T10:00:12+00:00", reason="no VERIFIED note"),
+        {"ts": "2025-12-25T10:00:13+00:00", "session_id": "test-session-001", "gate": "logger",
+         "action": "logged", "details": {"tool": "Bash"}},
+        event("test-session-001", "allowed", "2025-12-25T05:00:18-05:00"),
+        # error-session-001 (feature/test): allowed
+        event("error-session-001", "allowed", "2025-12-25T11:00:12+00:00"),
+        # api-rich-001 in the second project (feature/parser): blocked, error
+        event("api-rich-001", "blocked", "2025-12-26T09:00:10+00:00", reason="no VERIFIED note"),
+        event("api-rich-001", "error", "2025-12-26T09:00:11+00:00", gate="bd_close"),
+        # No transcript
+        event("unknown", "blocked", "2025-12-26T09:00:11+00:00"),
+    ]
+    log.write_text("".join(json.dumps(e) + "\n" for e in events) + "not json\n")
+    env = {**multi_project_home_dir["env"], "VERIFICATION_LOG": str(log)}
+    return {**multi_project_home_dir, "log": log, "data_dir": data_dir, "env": env}
+
+
+def run_script(name, args, env):
+    result = subprocess.run([sys.executable, SCRIPTS_DIR / name, *args], capture_output=True, text=True, env=env)
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout)
+
+
+class TestLoadEventIndex:
+    """Tests for the session_id index."""
+
+    def test_groups_decisions_by_session(self, verification_log):
+        index = load_event_index(log=verification_log["log"])
+        assert set(index) == {"test-session-001", "error-session-001", "api-rich-001", "unknown"}
+        assert [e["action"] for e in index["test-session-001"]] == ["blocked", "allowed"]
+
+    def test_single_session_filter(self, verification_log):
+        index = load_event_index(["api-rich-001"], log=verification_log["log"])
+        assert list(index) == ["api-rich-001"]
+        assert len(index["api-rich-001"]) == 2
+
+    def test_archives_are_read_once(self, verification_log):
+        """Rotated archives are read, and lines duplicated across files are counted once."""
+        log = verification_log["log"]
+        extra = json.dumps(event("error-session-001", "blocked", "2025-12-25T11:00:01+00:00")) + "\n"
+        with gzip.open(verification_log["data_dir"] / "events-20251224.jsonl.gz", "wt") as f:
+            f.write(extra + log.read_text())
+        index = load_event_index(log=log)
+        assert [e["action"] for e in index["error-session-001"]] == ["blocked", "allowed"]
+        assert len(index["test-session-001"]) == 2
+
+    def test_repeats_within_one_file_are_kept(self, verification_log):
+        """Identical decisions in the same second are separate events unless another file also has them."""
+        log = verification_log["log"]
+        repeat = json.dumps(event("error-session-001", "blocked", "2025-12-25T11:00:01+00:00")) + "\n"
+        with open(log, "a") as f:
+            f.write(repeat * 2)
+        assert len(load_event_index(log=log)["error-session-001"]) == 3
+        with gzip.open(verification_log["data_dir"] / "events-20251224.jsonl.gz", "wt") as f:
+            f.write(repeat)
+        assert len(load_event_index(log=log)["error-session-001"]) == 3
+
+
+class TestSummarizeVerification:
+    """Tests for summarize_session.py --verification."""
+
+    def test_events_joined_in_time_order(self, verification_log):
+        output = run_script("summarize_session.py", ["--session-id", "test-session-001", "--verification"],
+                            verification_log["env"])
+        assert output["verification"] == {"decisions": 2, "blocked": 1, "allowed": 1, "errors": 0,
+                                           "block_rate": 0.5}
+        rows = [item for item in output["timeline"] if item["type"] == "verification"]
+        assert [r["action"] for r in rows] == ["blocked", "allowed"]
+        assert rows[0]["reason"] == "no VERIFIED note"
+
+        # The -05:00 event at 05:00:18 is 10:00:18Z: after the 10:00:15 tool use
+        times = [item["time"] for item in output["timeline"]]
+        assert times.index("2025-12-25T05:00:18-05:00") > times.index("2025-12-25T10:00:15.000Z")
+
+    def test_without_flag_timeline_is_unchanged(self, verification_log):
+        output = run_script("summarize_session.py", ["--session-id", "test-session-001"], verification_log["env"])
+        assert "verification" not in output
+        assert all(item["type"] != "verification" for item in output["timeline"])
+
+
+class TestBlockRateReport:
+    """Tests for the cross-session block rate report."""
+
+    def test_rates_per_project_and_branch(self, verification_log):
+        output = run_script("verification_events.py", ["--all-projects", "--days", "3650"], verification_log["env"])
+        assert output["status"] == "success"
+        assert output["decisions"] == 4
+        assert output["blocked"] == 2
+        assert output["errors"] == 1
+        assert output["unmatched_sessions"] == 1
+
+        projects = {Path(p["project_dir"]).name: p for p in output["by_project"]}
+        main_project = projects["-home-test-project"]
+        assert main_project["sessions"] == 2
+        assert main_project["block_rate"] == pytest.approx(1 / 3, abs=0.001)
+        branches = {b["branch"]: b for b in main_project["by_branch"]}
+        assert branches["main"]["block_rate"] == 0.5
+        assert branches["feature/test"]["block_rate"] == 0.0
+
+        api = projects["-home-test-api"]
+        assert api["by_branch"] == [{"branch": "feature/parser", "sessions": 1, "decisions": 1, "blocked": 1,
+                                     "allowed": 0, "errors": 1, "block_rate": 1.0}]
+
+    def test_project_scope_and_days(self, verification_log):
+        """Sessions from other projects are unmatched; --days drops old events."""
+        output = run_script("verification_events.py", ["--project", "test-api", "--days", "3650"],
+                            verification_log["env"])
+        assert [Path(p["project_dir"]).name for p in output["by_project"]] == ["-home-test-api"]
+        assert output["unmatched_sessions"] == 3
+
+        output = run_script("verification_events.py", ["--all-projects", "--days", "1"], verification_log["env"])
+        assert output["decisions"] == 0
+        assert output["by_project"] == []
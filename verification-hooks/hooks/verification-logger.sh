@@ -5,28 +5,35 @@
 SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")/.." && pwd)"
 source "$SCRIPT_DIR/scripts/log-event.sh" 2>/dev/null || true
 
-INPUT=$(cat 2>/dev/null || true)
+# Read stdin with the read builtin; fields are parsed in-process (jq only for \u escapes)
+IFS= read -r -d '' INPUT || true
 
-TOOL_NAME=$(echo "$INPUT" | jq -r '.tool_name // "unknown"' 2>/dev/null)
+TOOL_NAME="unknown"
+if [[ "$INPUT" =~ \"tool_name\"[[:space:]]*:[[:space:]]*\"([^\"\\]*)\" ]]; then
+  TOOL_NAME="${BASH_REMATCH[1]}"
+fi
 
 # Only log significant tool uses (writes/edits/bash that modify things)
 case "$TOOL_NAME" in
   Bash)
-    COMMAND=$(echo "$INPUT" | jq -r '.tool_input.command // ""' 2>/dev/null)
+    if _json_field command "$INPUT"; then
+      COMMAND="$REPLY"
+    else
+      COMMAND=$(printf '%s' "$INPUT" | jq -r '.tool_input.command // ""' 2>/dev/null)
+    fi
     # Skip read-only commands
-    if echo "$COMMAND" | grep -qE "^(ls|cat|head|tail|grep|find|git (log|status|diff|show|branch)|pwd|echo|which|type|bd (show|list|ready|search|stats))"; then
+    if [[ "$COMMAND" =~ ^(ls|cat|head|tail|grep|find|git\ (log|status|diff|show|branch)|pwd|echo|which|type|bd\ (show|list|ready|search|stats)) ]]; then
       exit 0
     fi
-    # Use jq to build valid JSON (handles quotes in commands)
-    EVENT=$(jq -nc --arg tool "$TOOL_NAME" --arg cmd "$(echo "$COMMAND" | head -c 100)" \
-      '{"gate":"logger","action":"logged","details":{"tool":$tool,"command_prefix":$cmd}}')
-    log_event "$EVENT" "$INPUT"
+    log_gate_event "$INPUT" logger logged "" tool "$TOOL_NAME" command_prefix "${COMMAND:0:100}"
     ;;
   Edit|Write)
-    FILE_PATH=$(echo "$INPUT" | jq -r '.tool_input.file_path // "unknown"' 2>/dev/null)
-    EVENT=$(jq -nc --arg tool "$TOOL_NAME" --arg file "$FILE_PATH" \
-      '{"gate":"logger","action":"logged","details":{"tool":$tool,"file":$file}}')
-    log_event "$EVENT" "$INPUT"
+    if _json_field file_path "$INPUT"; then
+      FILE_PATH="$REPLY"
+    else
+      FILE_PATH=$(printf '%s' "$INPUT" | jq -r '.tool_input.file_path // "unknown"' 2>/dev/null)
+    fi
+    log_gate_event "$INPUT" logger logged "" tool "$TOOL_NAME" file "$FILE_PATH"
     ;;
   *)
     # Unknown tool — skip
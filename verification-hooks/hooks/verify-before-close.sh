@@ -4,12 +4,26 @@
 # Exit 0 = allow, Exit 2 = block
 set -o pipefail
 
+# Read stdin once, store for session_id extraction and command parsing.
+# `read` is a builtin: no subshell or cat process on the hot path.
+IFS= read -r -d '' INPUT || true
+
+# Fast path: this hook runs before every Bash call, and almost none of them
+# mention bd close. Rule those out with a builtin match on the raw JSON
+# (whitespace may be JSON-escaped) before spawning anything — no jq, no
+# sourcing, no sed. Everything below only runs for candidate commands.
+if ! [[ "$INPUT" =~ bd([[:space:]]|\\[tn])+close ]]; then
+  exit 0
+fi
+
 SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")/.." && pwd)"
 source "$SCRIPT_DIR/scripts/log-event.sh" 2>/dev/null || true
 
-# Read stdin once, store for session_id extraction and command parsing
-INPUT=$(cat 2>/dev/null || true)
-COMMAND=$(echo "$INPUT" | jq -r '.tool_input.command // empty' 2>/dev/null)
+if _json_field command "$INPUT"; then
+  COMMAND="$REPLY"
+else
+  COMMAND=$(printf '%s' "$INPUT" | jq -r '.tool_input.command // empty' 2>/dev/null)
+fi
 
 # No command to check — allow through
 if [ -z "$COMMAND" ]; then
@@ -110,11 +124,49 @@ ISSUE_IDS=$(echo "$ISSUE_IDS" | sed 's/^[[:space:]]*//')
 
 if [ -z "$ISSUE_IDS" ]; then
   # No valid issue IDs found — allow through (fail-open)
-  EVENT=$(jq -nc --arg cmd "$COMMAND" '{"gate":"bd_close","action":"skipped","details":{"reason":"no issue IDs parsed","command":$cmd}}')
-  log_event "$EVENT" "$INPUT"
+  log_gate_event "$INPUT" bd_close skipped "" reason "no issue IDs parsed" command "$COMMAND"
   exit 0
 fi
 
+# ========================================
+# Batched issue lookup
+# One `bd show --json` for every issue ID; both gates evaluate the result in
+# memory. Each issue becomes a line "<id> <verdict> <R|->" where verdict is
+# duplicate (has a "duplicates" dependency), verified (notes carry a
+# VERIFIED: entry) or unverified, and R marks requirement titles (^R[0-9]+:).
+# ========================================
+
+START_MS=$(($(date +%s%N) / 1000000))
+
+ISSUE_FILTER='.[]? | select(type == "object" and .id) | [.id,
+  (if any(.dependencies[]?; .dependency_type? == "duplicates") then "duplicate"
+   elif ((.notes // "") | tostring | contains("VERIFIED:")) then "verified"
+   else "unverified" end),
+  (if ((.title // "") | tostring | test("^R[0-9]+:")) then "R" else "-" end)] | join(" ")'
+
+# shellcheck disable=SC2086
+ISSUE_STATES=$(bd show --json $ISSUE_IDS 2>/dev/null | jq -r "$ISSUE_FILTER" 2>/dev/null || true)
+if [ -z "$ISSUE_STATES" ]; then
+  # Batch failed (older bd, or one unknown ID failing the whole call) — per-ID fallback
+  for ID in $ISSUE_IDS; do
+    ISSUE_STATES="$ISSUE_STATES
+$(bd show "$ID" --json 2>/dev/null | jq -r "$ISSUE_FILTER" 2>/dev/null || true)"
+  done
+fi
+
+# Space-delimited sets; IDs missing from the lookup stay unverified
+VERIFIED_SET=" "
+DUPLICATE_SET=" "
+HAS_R_ISSUE=false
+while read -r ID VERDICT KIND; do
+  [ -z "$ID" ] && continue
+  case "$VERDICT" in
+    duplicate) DUPLICATE_SET="$DUPLICATE_SET$ID " ;;
+    verified) VERIFIED_SET="$VERIFIED_SET$ID " ;;
+  esac
+  [ "$KIND" = "R" ] && HAS_R_ISSUE=true
+done <<< "$ISSUE_STATES"
+
 # ========================================
 # Gate 0: Dependency verification gate (CAPA-8)
 # When closing R-prefixed requirement issues, require a closed GATE: issue.
@@ -122,29 +174,20 @@ fi
 # This gate prevents shipping without validating dependency assumptions.
 # ========================================
 
-HAS_R_ISSUE=false
-for ID in $ISSUE_IDS; do
-  R_TITLE=$(bd show "$ID" --json 2>/dev/null | jq -r '.[0].title // empty' 2>/dev/null || true)
-  if [[ "$R_TITLE" =~ ^R[0-9]+: ]]; then
-    HAS_R_ISSUE=true
-    break
-  fi
-done
-
 if $HAS_R_ISSUE; then
   # Check if a closed GATE: issue exists in this project
-  GATE_CLOSED_COUNT=$(bd list --status=closed 2>/dev/null | grep -c "GATE:" 2>/dev/null || true)
+  GATE_CLOSED_COUNT=$(bd list --status=closed --json 2>/dev/null \
+    | jq '[.[]? | select((.title // "") | tostring | contains("GATE:"))] | length' 2>/dev/null || true)
 
-  if [ "$GATE_CLOSED_COUNT" -eq 0 ] 2>/dev/null; then
+  if [ "${GATE_CLOSED_COUNT:-0}" -eq 0 ] 2>/dev/null; then
     # No closed GATE — check if one exists at all (for better error message)
-    GATE_ANY=$(bd list 2>/dev/null | grep "GATE:" | head -1 || true)
+    GATE_ID=$(bd list --json 2>/dev/null \
+      | jq -r 'first(.[]? | select((.title // "") | tostring | contains("GATE:")) | .id) // empty' 2>/dev/null || true)
 
-    if [ -n "$GATE_ANY" ]; then
+    if [ -n "$GATE_ID" ]; then
       # GATE exists but not closed
-      GATE_ID=$(echo "$GATE_ANY" | awk '{print $2}')
-      EVENT=$(jq -nc --arg ids "$(echo $ISSUE_IDS | tr ' ' ',')" --arg cmd "$COMMAND" --arg gate "$GATE_ID" \
-        '{"gate":"dependency_verification","action":"blocked","details":{"reason":"GATE issue not closed","gate_id":$gate,"issue_ids":$ids,"command":$cmd}}')
-      log_event "$EVENT" "$INPUT"
+      log_gate_event "$INPUT" dependency_verification blocked "" \
+        reason "GATE issue not closed" gate_id "$GATE_ID" issue_ids "${ISSUE_IDS// /,}" command "$COMMAND"
       cat >&2 <<EOF
 DEPENDENCY VERIFICATION REQUIRED before closing requirement issues.
 
@@ -165,9 +208,8 @@ EOF
       exit 2
     else
       # No GATE issue at all — dev-process was not followed
-      EVENT=$(jq -nc --arg ids "$(echo $ISSUE_IDS | tr ' ' ',')" --arg cmd "$COMMAND" \
-        '{"gate":"dependency_verification","action":"blocked","details":{"reason":"no GATE issue exists","issue_ids":$ids,"command":$cmd}}')
-      log_event "$EVENT" "$INPUT"
+      log_gate_event "$INPUT" dependency_verification blocked "" \
+        reason "no GATE issue exists" issue_ids "${ISSUE_IDS// /,}" command "$COMMAND"
       cat >&2 <<EOF
 DEPENDENCY VERIFICATION GATE MISSING.
 
@@ -190,28 +232,14 @@ fi
 # Gate 1: bd close verification
 # ========================================
 
-START_MS=$(($(date +%s%N) / 1000000))
-
 UNVERIFIED=""
 DUPLICATE_IDS=""
 
 for ID in $ISSUE_IDS; do
-  # Single bd show call (text format for VERIFIED check + JSON for duplicate check)
-  SHOW_OUTPUT=$(bd show "$ID" 2>/dev/null || true)
-
-  # ========================================
-  # R3: Check for duplicate exception
-  # Uses JSON output to check for "duplicates" dependency type
-  # ========================================
-  JSON_OUTPUT=$(bd show "$ID" --json 2>/dev/null || true)
-  if echo "$JSON_OUTPUT" | jq -e '.[0].dependencies[]? | select(.dependency_type == "duplicates")' >/dev/null 2>&1; then
+  # R3: duplicate closes are an allowed exception
+  if [[ "$DUPLICATE_SET" == *" $ID "* ]]; then
     DUPLICATE_IDS="$DUPLICATE_IDS $ID"
-    continue
-  fi
-
-  # Check if issue has a VERIFIED: note
-  NOTES=$(echo "$SHOW_OUTPUT" | grep "VERIFIED:" | tail -1 || true)
-  if [ -z "$NOTES" ]; then
+  elif [[ "$VERIFIED_SET" != *" $ID "* ]]; then
     UNVERIFIED="$UNVERIFIED $ID"
   fi
 done
@@ -221,50 +249,49 @@ DURATION_MS=$((END_MS - START_MS))
 
 # Log duplicate exceptions (R3 + R6)
 for DID in $DUPLICATE_IDS; do
-  EVENT=$(jq -nc --arg id "$DID" --arg cmd "$COMMAND" --argjson dur "$DURATION_MS" \
-    '{"gate":"bd_close","action":"exception_allowed","duration_ms":$dur,"details":{"reason":"duplicate_close","issue_ids":$id,"command":$cmd}}')
-  log_event "$EVENT" "$INPUT"
+  log_gate_event "$INPUT" bd_close exception_allowed "$DURATION_MS" \
+    reason duplicate_close issue_ids "$DID" command "$COMMAND"
 done
 
 if [ -z "$UNVERIFIED" ]; then
   # All verified (or all duplicates) — log and allow
-  EVENT=$(jq -nc --arg ids "$(echo $ISSUE_IDS | tr ' ' ',')" --arg cmd "$COMMAND" --argjson dur "$DURATION_MS" \
-    '{"gate":"bd_close","action":"allowed","duration_ms":$dur,"details":{"issue_ids":$ids,"command":$cmd}}')
-  log_event "$EVENT" "$INPUT"
+  log_gate_event "$INPUT" bd_close allowed "$DURATION_MS" issue_ids "${ISSUE_IDS// /,}" command "$COMMAND"
   exit 0
 fi
 
 # ========================================
 # R4: Circuit breaker — check block count for this session+issue
 # ========================================
-SESSION_ID=$(_extract_session_id "$INPUT")
+_session_id "$INPUT"
+SESSION_ID="$REPLY"
 BREAKER_THRESHOLD=3
 BREAKER_ACTIVE=false
 
+# The uncompressed archive is the latest rotation, so counts survive a rotation mid-session
+BREAKER_LOGS=("$VERIFICATION_LOG")
+for ARCHIVE in "$VERIFICATION_DATA_DIR"/events-*.jsonl; do
+  [ -f "$ARCHIVE" ] && BREAKER_LOGS+=("$ARCHIVE")
+done
+
 for UVID in $UNVERIFIED; do
   BLOCK_COUNT=0
   if [ "$SESSION_ID" != "unknown" ] && [ -f "$VERIFICATION_LOG" ]; then
     # Use chained grep for robustness — field order varies, log may have malformed lines
-    BLOCK_COUNT=$(grep "$SESSION_ID" "$VERIFICATION_LOG" 2>/dev/null \
+    BLOCK_COUNT=$(grep -h "$SESSION_ID" "${BREAKER_LOGS[@]}" 2>/dev/null \
       | grep '"gate":"bd_close"' \
       | grep '"action":"blocked"' \
-      | grep -c "$UVID" || echo 0)
+      | grep -c "$UVID" || true)
   fi
 
-  if [ "$BLOCK_COUNT" -ge "$BREAKER_THRESHOLD" ] 2>/dev/null; then
+  if [ "${BLOCK_COUNT:-0}" -ge "$BREAKER_THRESHOLD" ] 2>/dev/null; then
     BREAKER_ACTIVE=true
 
     # Circuit breaker triggered — check if agent provided a reason
     if [ -n "$CLOSE_REASON" ]; then
       # Agent provided reason — allow through as exception
-      EVENT=$(jq -nc \
-        --arg id "$UVID" \
-        --arg cmd "$COMMAND" \
-        --arg reason "$CLOSE_REASON" \
-        --argjson count "$BLOCK_COUNT" \
-        --argjson dur "$DURATION_MS" \
-        '{"gate":"bd_close","action":"exception_allowed","duration_ms":$dur,"details":{"reason":"circuit_breaker","issue_ids":$id,"agent_reason":$reason,"block_count":$count,"command":$cmd}}')
-      log_event "$EVENT" "$INPUT"
+      log_gate_event "$INPUT" bd_close exception_allowed "$DURATION_MS" \
+        reason circuit_breaker issue_ids "$UVID" agent_reason "$CLOSE_REASON" \
+        "#block_count" "$BLOCK_COUNT" command "$COMMAND"
       # Remove this ID from unverified list
       UNVERIFIED=$(echo "$UNVERIFIED" | sed "s/$UVID//g" | sed 's/^[[:space:]]*//' | sed 's/[[:space:]]*$//')
     fi
@@ -278,9 +305,9 @@ if [ -z "$UNVERIFIED" ]; then
 fi
 
 # Block — require verification first
-EVENT=$(jq -nc --arg ids "$(echo $UNVERIFIED | tr ' ' ',')" --arg cmd "$COMMAND" --argjson dur "$DURATION_MS" \
-  '{"gate":"bd_close","action":"blocked","duration_ms":$dur,"details":{"issue_ids":$ids,"reason":"no VERIFIED note","command":$cmd}}')
-log_event "$EVENT" "$INPUT"
+UNVERIFIED_CSV=$(echo $UNVERIFIED | tr ' ' ',')
+log_gate_event "$INPUT" bd_close blocked "$DURATION_MS" \
+  issue_ids "$UNVERIFIED_CSV" reason "no VERIFIED note" command "$COMMAND"
 
 if $BREAKER_ACTIVE; then
   # Circuit breaker message — agent has been blocked too many times
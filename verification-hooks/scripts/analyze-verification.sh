@@ -1,6 +1,13 @@
 #!/bin/bash
 # Verification Hooks — monitoring and analysis report
-# Usage: bash analyze-verification.sh [path-to-log]
+# Usage: bash analyze-verification.sh [path-to-log] [--json] [--archives]
+#
+# The report is built by analyze_verification.py in one streaming pass; the
+# jq implementation below is only a fallback for hosts without python3.
+
+if command -v python3 >/dev/null 2>&1; then
+  exec python3 "$(dirname "$0")/analyze_verification.py" "$@"
+fi
 
 LOG="${1:-$HOME/.local/log/verification-hooks.jsonl}"
 
@@ -0,0 +1,484 @@
+#!/usr/bin/env python3
+"""
+Verification Hooks — monitoring and analysis report.
+
+Reads events.jsonl (and, with --archives, the rotated events-YYYYMMDD.jsonl
+archives next to it) in a single streaming pass and builds every section of
+the report at once: gate activity, latency percentiles, timeout SLOs, a
+daily trend, recent blocks, errors and the health check.
+
+Latencies go into log-linear histograms (exact below 32 ms, within 1/16 of
+the value above), so memory stays bounded however long the history is.
+Timeouts come from hooks/hooks.json; a gate whose duration reaches
+--near-timeout of its hook's limit is flagged as a near-timeout.
+
+Usage:
+    python3 analyze_verification.py [path-to-log]
+    python3 analyze_verification.py --json
+    python3 analyze_verification.py --archives --near-timeout 0.5
+
+Output: the text report printed by analyze-verification.sh, or JSON with
+--json.
+"""
+
+import argparse
+import glob
+import json
+import math
+import os
+import sys
+from collections import deque
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+RECENT_BLOCKS = 5
+MAX_ERRORS_SHOWN = 100
+PERCENTILES = (50, 95, 99)
+NEAR_TIMEOUT = 0.8
+
+# Lines the old copy-then-truncate rotation kept at the head of the new log
+OVERLAP_LINES = 5000
+
+HOOKS_JSON = Path(__file__).resolve().parent.parent / "hooks" / "hooks.json"
+
+# The hook each gate runs in: a command script name or, for agent hooks, the event
+GATE_HOOKS = {
+    "bd_close": "verify-before-close.sh",
+    "dependency_verification": "verify-before-close.sh",
+    "infra": "verify-before-close.sh",
+    "logger": "verification-logger.sh",
+    "task_complete": "TaskCompleted",
+    "stop": "Stop",
+}
+
+
+def data_dir() -> Path:
+    return Path(os.environ.get("VERIFICATION_DATA_DIR") or Path.home() / ".local/share/verification-hooks")
+
+
+def default_log() -> Path:
+    """$VERIFICATION_LOG, else events.jsonl in the data dir, else the pre-migration path."""
+    if os.environ.get("VERIFICATION_LOG"):
+        return Path(os.environ["VERIFICATION_LOG"])
+    log = data_dir() / "events.jsonl"
+    legacy = Path.home() / ".local/log/verification-hooks.jsonl"
+    if not log.exists() and legacy.exists():
+        return legacy
+    return log
+
+
+def archive_files(log: Path) -> List[Path]:
+    """Rotated archives next to ``log``, oldest first (plain or gzip-compressed)."""
+    directory = log.resolve().parent
+    paths = glob.glob(str(directory / "events-*.jsonl")) + glob.glob(str(directory / "events-*.jsonl.gz"))
+    return [Path(p) for p in sorted(paths)]
+
+
+def hook_timeouts(path: Path = HOOKS_JSON) -> dict:
+    """Timeout in ms per hook: keyed by command script name and by event name."""
+    try:
+        config = json.loads(path.read_text())
+    except (OSError, ValueError):
+        return {}
+    timeouts = {}
+    for event, matchers in (config.get("hooks") or {}).items():
+        for matcher in matchers:
+            for hook in matcher.get("hooks", []):
+                if "timeout" not in hook:
+                    continue
+                ms = hook["timeout"] * 1000
+                if hook.get("command"):
+                    script = hook["command"].split()[-1].rsplit("/", 1)[-1]
+                    timeouts[script] = ms
+                timeouts.setdefault(event, ms)
+    return timeouts
+
+
+def gate_timeouts(timeouts: dict) -> dict:
+    return {gate: timeouts[hook] for gate, hook in GATE_HOOKS.items() if hook in timeouts}
+
+
+class LatencyHistogram:
+    """Log-linear histogram of millisecond durations.
+
+    Values under 32 ms get a bucket each; above that every power of two is
+    split into 16 buckets. Percentiles report the upper edge of the bucket
+    holding the nearest rank (capped at the observed max), so they never
+    understate a latency.
+    """
+
+    EXACT = 32
+    SUB_BUCKETS = 16
+
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total = 0
+        self.max = None
+
+    def _bucket(self, ms: float) -> int:
+        if ms < self.EXACT:
+            return max(int(ms), 0)
+        exp = int(math.log2(ms))
+        sub = int((ms / (1 << exp) - 1) * self.SUB_BUCKETS)
+        return (exp << 8) | sub
+
+    def _upper(self, bucket: int) -> float:
+        if bucket < self.EXACT:
+            return bucket
+        exp, sub = bucket >> 8, bucket & 0xFF
+        return (1 << exp) * (1 + (sub + 1) / self.SUB_BUCKETS)
+
+    def add(self, ms: float) -> None:
+        bucket = self._bucket(ms)
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+        self.count += 1
+        self.total += ms
+        self.max = ms if self.max is None else max(self.max, ms)
+
+    def percentile(self, p: float) -> Optional[float]:
+        if not self.count:
+            return None
+        rank = max(math.ceil(p / 100 * self.count), 1)
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                return min(round(self._upper(bucket)), self.max)
+        return self.max
+
+    def summary(self) -> dict:
+        result = {"samples": self.count, "avg_ms": round(self.total / self.count) if self.count else None}
+        for p in PERCENTILES:
+            result[f"p{p}_ms"] = self.percentile(p)
+        result["max_ms"] = self.max
+        return result
+
+    def histogram(self) -> list:
+        """[upper_ms, count] per non-empty bucket, ascending."""
+        return [[round(self._upper(b), 1), self.buckets[b]] for b in sorted(self.buckets)]
+
+
+def _open_lines(path: Path):
+    if path.name.endswith(".gz"):
+        import gzip
+
+        return gzip.open(path, "rb")
+    return open(path, "rb")
+
+
+def iter_events(paths: List[Path], stats: dict) -> Iterator[dict]:
+    """Yield decoded events from ``paths`` in order.
+
+    stats["total"] and stats["invalid"] count lines and undecodable lines.
+    A line is skipped when it repeats one of the last OVERLAP_LINES lines
+    of the earlier files: the old rotation copied the log into the archive
+    and kept only its tail, so archives and the live log overlap by at most
+    that much. Memory stays bounded by the window, not the history.
+    """
+    dedupe = len(paths) > 1
+    window = deque(maxlen=OVERLAP_LINES)     # hashes of the most recent lines read
+    for path in paths:
+        seen_before = set(window) if dedupe else ()
+        try:
+            f = _open_lines(path)
+        except OSError:
+            continue
+        with f:
+            for raw in f:
+                if not raw.strip():
+                    continue
+                if dedupe:
+                    key = hash(raw.rstrip(b"\n"))
+                    window.append(key)
+                    if key in seen_before:
+                        continue
+                stats["total"] += 1
+                try:
+                    event = json.loads(raw)
+                except ValueError:
+                    stats["invalid"] += 1
+                    continue
+                if not isinstance(event, dict):
+                    stats["invalid"] += 1
+                    continue
+                yield event
+
+
+class Report:
+    """Every report section, accumulated one event at a time.
+
+    ``limits`` maps gate -> hook timeout in ms (see gate_timeouts()); durations
+    at or above ``near`` times the limit count as near-timeouts.
+    """
+
+    MAX_FLAGGED = 20
+
+    def __init__(self, limits: Optional[dict] = None, near: float = NEAR_TIMEOUT):
+        self.limits = limits or {}
+        self.near = near
+        self.gates = {}         # gate -> {"fires", "blocked", "errors"}
+        self.latency = {}       # gate -> LatencyHistogram
+        self.by_action = {}     # (gate, action) -> LatencyHistogram
+        self.slo = {}           # gate -> {"timeouts", "near_timeouts"}
+        self.flagged = deque(maxlen=self.MAX_FLAGGED)
+        self.daily = {}         # YYYY-MM-DD -> {"events", "blocked", "errors", "latency": {gate: hist}}
+        self.recent_blocks = deque(maxlen=RECENT_BLOCKS)
+        self.errors = deque(maxlen=MAX_ERRORS_SHOWN)
+        self.error_count = 0
+
+    def add(self, event: dict) -> None:
+        gate = event.get("gate")
+        action = event.get("action")
+        counts = self.gates.setdefault(gate, {"fires": 0, "blocked": 0, "errors": 0})
+        counts["fires"] += 1
+
+        ts = event.get("ts")
+        day = self.daily.get(ts[:10]) if isinstance(ts, str) else None
+        if day is None and isinstance(ts, str) and len(ts) >= 10:
+            day = self.daily[ts[:10]] = {"events": 0, "blocked": 0, "errors": 0, "latency": {}}
+        if day is not None:
+            day["events"] += 1
+
+        if action == "blocked":
+            counts["blocked"] += 1
+            self.recent_blocks.append(event)
+            if day is not None:
+                day["blocked"] += 1
+        elif action == "error":
+            counts["errors"] += 1
+            self.error_count += 1
+            self.errors.append(event)
+            if day is not None:
+                day["errors"] += 1
+
+        duration = event.get("duration_ms")
+        if not isinstance(duration, (int, float)) or isinstance(duration, bool):
+            return
+        self._histogram(self.latency, gate).add(duration)
+        self._histogram(self.by_action, (gate, action)).add(duration)
+        if day is not None:
+            self._histogram(day["latency"], gate).add(duration)
+
+        limit = self.limits.get(gate)
+        if limit:
+            slo = self.slo.setdefault(gate, {"timeouts": 0, "near_timeouts": 0})
+            if duration >= limit:
+                slo["timeouts"] += 1
+            elif duration >= limit * self.near:
+                slo["near_timeouts"] += 1
+            else:
+                return
+            self.flagged.append({"ts": ts, "gate": gate, "action": action, "duration_ms": duration,
+                                 "timeout_ms": limit, "session_id": event.get("session_id")})
+
+    @staticmethod
+    def _histogram(table: dict, key) -> LatencyHistogram:
+        hist = table.get(key)
+        if hist is None:
+            hist = table[key] = LatencyHistogram()
+        return hist
+
+    def _rate(self, gate: str) -> Optional[int]:
+        counts = self.gates.get(gate)
+        if not counts or not counts["fires"]:
+            return None
+        return counts["blocked"] * 100 // counts["fires"]
+
+    def _performance(self) -> list:
+        rows = []
+        for gate, hist in sorted(self.latency.items(), key=_gate_key):
+            actions = [{"action": action, **h.summary()}
+                       for (g, action), h in sorted(self.by_action.items(), key=lambda item: str(item[0][1]))
+                       if g == gate]
+            rows.append({"gate": gate, **hist.summary(), "by_action": actions, "histogram": hist.histogram()})
+        return rows
+
+    def _slo(self) -> list:
+        rows = []
+        for gate, limit in sorted(self.limits.items()):
+            hist = self.latency.get(gate)
+            if hist is None:
+                continue
+            slo = self.slo.get(gate, {"timeouts": 0, "near_timeouts": 0})
+            rows.append({
+                "gate": gate,
+                "timeout_ms": limit,
+                "near_timeout_ms": round(limit * self.near),
+                "p99_ms": hist.percentile(99),
+                **slo,
+                "ok": not slo["timeouts"] and not slo["near_timeouts"],
+            })
+        return rows
+
+    def _daily(self) -> list:
+        return [
+            {
+                "date": date,
+                "events": day["events"],
+                "blocked": day["blocked"],
+                "errors": day["errors"],
+                "latency": {gate: {f"p{p}_ms": hist.percentile(p) for p in PERCENTILES}
+                            for gate, hist in sorted(day["latency"].items(), key=_gate_key)},
+            }
+            for date, day in sorted(self.daily.items())
+        ]
+
+    def to_dict(self) -> dict:
+        bd_close = self.latency.get("bd_close")
+        return {
+            "gates": [{"gate": gate, **counts} for gate, counts in sorted(self.gates.items(), key=_gate_key)],
+            "performance": self._performance(),
+            "slo": self._slo(),
+            "slo_flagged": list(self.flagged),
+            "daily": self._daily(),
+            "recent_blocks": list(self.recent_blocks),
+            "errors": {"count": self.error_count, "events": list(self.errors)},
+            "health": {
+                "bd_close_block_rate": self._rate("bd_close"),
+                "bd_close_p95_ms": bd_close.percentile(95) if bd_close else None,
+                "stop_block_rate": self._rate("stop"),
+                "error_count": self.error_count,
+            },
+        }
+
+
+def _gate_key(item) -> str:
+    return item[0] or ""
+
+
+def _ms(value) -> str:
+    return "-" if value is None else f"{value}ms"
+
+
+def print_text(log: Path, files: List[Path], stats: dict, data: dict) -> None:
+    valid = stats["total"] - stats["invalid"]
+    invalid = f", {stats['invalid']} invalid" if stats["invalid"] else ""
+    print("=== Verification Hooks Report ===")
+    print(f"Log: {log} ({valid} valid / {stats['total']} total events{invalid})")
+    if len(files) > 1:
+        print(f"Archives: {len(files) - 1} file(s) included")
+    print()
+
+    print("--- Gate Activity ---")
+    for g in data["gates"]:
+        print(f"{g['gate']}: {g['fires']} fires, {g['blocked']} blocked, {g['errors']} errors")
+    if not data["gates"]:
+        print("(no parseable events)")
+    print()
+
+    print("--- Performance ---")
+    for p in data["performance"]:
+        print(f"{p['gate']}: avg {p['avg_ms']}ms, p50 {_ms(p['p50_ms'])}, p95 {_ms(p['p95_ms'])}, "
+              f"p99 {_ms(p['p99_ms'])}, max {p['max_ms']}ms ({p['samples']} samples)")
+        for a in p["by_action"]:
+            print(f"  {a['action']}: p50 {_ms(a['p50_ms'])}, p95 {_ms(a['p95_ms'])}, "
+                  f"p99 {_ms(a['p99_ms'])} ({a['samples']} samples)")
+    if not data["performance"]:
+        print("(no timing data)")
+    print()
+
+    print("--- Timeout SLOs ---")
+    for s in data["slo"]:
+        status = "OK" if s["ok"] else "ATTENTION"
+        print(f"{s['gate']}: limit {s['timeout_ms']}ms, p99 {_ms(s['p99_ms'])}, {s['timeouts']} timeouts, "
+              f"{s['near_timeouts']} near-timeouts (>= {s['near_timeout_ms']}ms) [{status}]")
+    for f in data["slo_flagged"][-RECENT_BLOCKS:]:
+        print(f"  {f['ts']} [{f['gate']}/{f['action']}] {f['duration_ms']}ms of {f['timeout_ms']}ms")
+    if not data["slo"]:
+        print("(no timed gates with a configured timeout)")
+    print()
+
+    print("--- Daily Trend ---")
+    for d in data["daily"]:
+        latency = ", ".join(f"{gate} p95 {_ms(q['p95_ms'])}" for gate, q in d["latency"].items())
+        print(f"{d['date']}: {d['events']} events, {d['blocked']} blocked, {d['errors']} errors"
+              + (f" | {latency}" if latency else ""))
+    if not data["daily"]:
+        print("(no timestamped events)")
+    print()
+
+    print(f"--- Recent Blocks (last {RECENT_BLOCKS}) ---")
+    for e in data["recent_blocks"]:
+        reason = (e.get("details") or {}).get("reason") or "no reason"
+        print(f"{e.get('ts')} [{e.get('gate')}] {reason}")
+    if not data["recent_blocks"]:
+        print("(none)")
+    print()
+
+    print("--- Errors ---")
+    errors = data["errors"]
+    if errors["count"]:
+        print(f"WARNING: {errors['count']} hook errors detected!")
+        if errors["count"] > len(errors["events"]):
+            print(f"(showing the last {len(errors['events'])})")
+        for e in errors["events"]:
+            print(f"{e.get('ts')} [{e.get('gate')}] {(e.get('details') or {}).get('error') or 'unknown'}")
+    else:
+        print("No errors.")
+    print()
+
+    health = data["health"]
+    print("--- Health Check ---")
+    print("| Metric | Value | Healthy Range |")
+    print("|--------|-------|---------------|")
+    if health["bd_close_block_rate"] is not None:
+        print(f"| bd_close block rate | {health['bd_close_block_rate']}% | 10-30% |")
+    if health["bd_close_p95_ms"] is not None:
+        print(f"| bd_close p95 latency | {health['bd_close_p95_ms']}ms | <100ms |")
+    if health["stop_block_rate"] is not None:
+        print(f"| stop block rate | {health['stop_block_rate']}% | <10% |")
+    print(f"| error count | {health['error_count']} | 0 |")
+    print(f"| total events | {stats['total']} | 5-20/session |")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Verification hooks monitoring report")
+    parser.add_argument("log", nargs="?", help="Event log (default: events.jsonl in the data dir)")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    parser.add_argument("--archives", action="store_true",
+                        help="Include rotated events-YYYYMMDD.jsonl[.gz] archives from the log's directory")
+    parser.add_argument("--hooks-json", type=Path, default=HOOKS_JSON,
+                        help="hooks.json to read timeouts from (default: this plugin's)")
+    parser.add_argument("--near-timeout", type=float, default=NEAR_TIMEOUT,
+                        help=f"Fraction of a hook's timeout flagged as near-timeout (default: {NEAR_TIMEOUT})")
+    args = parser.parse_args(argv)
+
+    log = Path(args.log) if args.log else default_log()
+    if not log.exists():
+        if args.json:
+            print(json.dumps({"status": "error", "error": f"No verification log found at {log}"}, indent=2))
+            return 0
+        print(f"No verification log found at {log}")
+        print("The log is created automatically when verification hooks first fire.")
+        return 0
+
+    files = (archive_files(log) if args.archives else []) + [log]
+    stats = {"total": 0, "invalid": 0}
+    report = Report(gate_timeouts(hook_timeouts(args.hooks_json)), args.near_timeout)
+    for event in iter_events(files, stats):
+        report.add(event)
+    data = report.to_dict()
+
+    if args.json:
+        result = {
+            "status": "success",
+            "log": str(log),
+            "files": [str(p) for p in files],
+            "total_events": stats["total"],
+            "valid_events": stats["total"] - stats["invalid"],
+            "invalid_events": stats["invalid"],
+            **data,
+        }
+        print(json.dumps(result, indent=2))
+    else:
+        print_text(log, files, stats, data)
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except Exception as e:
+        print(json.dumps({"status": "error", "error": str(e)}), file=sys.stderr)
+        sys.exit(1)
@@ -1,43 +1,84 @@
 #!/bin/bash
 # Shared JSONL log writer for verification hooks
 # Usage: source log-event.sh; log_event '{"gate":"bd_close","action":"blocked",...}' "$RAW_STDIN"
-# Handles: file creation, atomic writes, rotation, session_id extraction
+#    or: log_gate_event "$RAW_STDIN" bd_close blocked "$DURATION_MS" reason "no VERIFIED note"
+# Handles: file creation, atomic writes, size-based rotation, session_id extraction
 
 # Persistent data location — dedicated directory for all verification hooks data
 # Included in backups at ~/.local/share/verification-hooks/
 VERIFICATION_DATA_DIR="${VERIFICATION_DATA_DIR:-$HOME/.local/share/verification-hooks}"
 VERIFICATION_LOG="${VERIFICATION_LOG:-$VERIFICATION_DATA_DIR/events.jsonl}"
 
-# Extract session_id from hook stdin JSON (passed as second arg)
-# Falls back to env var, then "unknown"
-_extract_session_id() {
-  local stdin_json="$1"
-  local sid=""
+# Everything on the logging path below uses bash builtins only — no jq, date
+# or mkdir processes — because hooks log several events per tool call across
+# parallel sessions. Helpers return their result in $REPLY to avoid the fork
+# of a $(...) command substitution.
 
-  # Primary: read from hook stdin JSON (documented in Claude Code hook contract)
-  if [ -n "$stdin_json" ]; then
-    sid=$(echo "$stdin_json" | jq -r '.session_id // empty' 2>/dev/null)
+# JSON-escape a string into $REPLY (control characters other than \n \r \t are dropped)
+_json_escape() {
+  local s="$1"
+  s=${s//\\/\\\\}
+  s=${s//\"/\\\"}
+  s=${s//$'\n'/\\n}
+  s=${s//$'\r'/\\r}
+  s=${s//$'\t'/\\t}
+  REPLY=${s//[$'\001'-$'\037']/}
+}
+
+# Current time in `date -Iseconds` format (2026-03-26T15:30:00-04:00) into $REPLY
+_now_iso() {
+  if [ "${BASH_VERSINFO[0]}" -gt 4 ] || { [ "${BASH_VERSINFO[0]}" -eq 4 ] && [ "${BASH_VERSINFO[1]}" -ge 2 ]; }; then
+    printf -v REPLY '%(%Y-%m-%dT%H:%M:%S%z)T' -1
+    REPLY="${REPLY:0:22}:${REPLY:22}"
+  else
+    REPLY=$(date -Iseconds)
   fi
+}
 
-  # Fallback: env var (in case Claude Code adds it in future)
-  if [ -z "$sid" ]; then
-    sid="${CLAUDE_SESSION_ID:-}"
+# First string value of "<key>" in hook stdin JSON, decoded, into $REPLY.
+# Returns 1 when the key is absent or uses escapes decoded only by jq (\uXXXX).
+# Hook payloads list tool_input before tool_response, so the first match is
+# the tool_input field.
+_json_field() {
+  local key="$1" json="$2"
+  REPLY=""
+  [[ "$json" =~ \"$key\"[[:space:]]*:[[:space:]]*\"((\\.|[^\"\\])*)\" ]] || return 1
+  local s="${BASH_REMATCH[1]}"
+  if [[ "$s" == *\\* ]]; then
+    s=${s//\\\\/$'\001'}
+    s=${s//\\\"/\"}
+    s=${s//\\\//\/}
+    s=${s//\\n/$'\n'}
+    s=${s//\\t/$'\t'}
+    s=${s//\\r/$'\r'}
+    [[ "$s" == *\\* ]] && return 1
+    s=${s//$'\001'/\\}
   fi
+  REPLY="$s"
+}
 
-  # Final fallback
-  echo "${sid:-unknown}"
+# session_id from hook stdin JSON into $REPLY
+# Falls back to env var, then "unknown"
+_session_id() {
+  REPLY=""
+  # Primary: read from hook stdin JSON (documented in Claude Code hook contract)
+  if [[ "$1" =~ \"session_id\"[[:space:]]*:[[:space:]]*\"([^\"\\]*)\" ]]; then
+    REPLY="${BASH_REMATCH[1]}"
+  fi
+  # Fallback: env var (in case Claude Code adds it in future), then "unknown"
+  REPLY="${REPLY:-${CLAUDE_SESSION_ID:-}}"
+  REPLY="${REPLY:-unknown}"
 }
 
-log_event() {
-  local json="$1"
-  local stdin_json="${2:-}"
-  local ts
-  ts=$(date -Iseconds)
-  local session_id
-  session_id=$(_extract_session_id "$stdin_json")
+# Extract session_id from hook stdin JSON (passed as first arg) and print it
+_extract_session_id() {
+  _session_id "$1"
+  echo "$REPLY"
+}
 
+_ensure_log_dir() {
   # Ensure data directory exists
-  mkdir -p "$VERIFICATION_DATA_DIR"
+  [ -d "$VERIFICATION_DATA_DIR" ] || mkdir -p "$VERIFICATION_DATA_DIR"
 
   # Set up backward-compatible symlink from old log path
   local old_log_dir="$HOME/.local/log"
@@ -48,32 +89,150 @@ log_event() {
       mv "$old_log_path" "$VERIFICATION_LOG" 2>/dev/null || true
     fi
     ln -sf "$VERIFICATION_LOG" "$old_log_path" 2>/dev/null || true
-  elif [ ! -e "$old_log_path" ] && [ -d "$old_log_dir" ]; then
-    ln -sf "$VERIFICATION_LOG" "$old_log_path" 2>/dev/null || true
   fi
+  return 0
+}
+
+_append_event() {
+  _ensure_log_dir
+  # Atomic append (>> is atomic for lines < PIPE_BUF on Linux)
+  printf '%s\n' "$1" >> "$VERIFICATION_LOG"
+  _rotate_log_if_needed
+}
+
+# True when JSON object $1 has top-level key $2. Keys inside nested objects
+# (e.g. details) and string contents don't count.
+_json_has_key() {
+  local json="$1" needle="\"$2\"" depth=0 in_str=0 i c rest
+  [[ "$json" == *"$needle"* ]] || return 1
+  for ((i = 0; i < ${#json}; i++)); do
+    c="${json:i:1}"
+    if ((in_str)); then
+      if [[ "$c" == '\' ]]; then
+        i=$((i + 1))
+      elif [[ "$c" == '"' ]]; then
+        in_str=0
+      fi
+      continue
+    fi
+    case "$c" in
+      '{'|'[') depth=$((depth + 1)) ;;
+      '}'|']') depth=$((depth - 1)) ;;
+      '"')
+        if ((depth == 1)) && [[ "${json:i:${#needle}}" == "$needle" ]]; then
+          rest="${json:i+${#needle}}"
+          rest="${rest#"${rest%%[![:space:]]*}"}"
+          [[ "$rest" == :* ]] && return 0
+        fi
+        in_str=1 ;;
+    esac
+  done
+  return 1
+}
+
+# Append a caller-built JSON object, adding ts and session_id if not already present
+log_event() {
+  local json="$1"
+  local stdin_json="${2:-}"
+  local ts session_id extra=""
+  _now_iso
+  ts="$REPLY"
+  _session_id "$stdin_json"
+  _json_escape "$REPLY"
+  session_id="$REPLY"
+
+  _json_has_key "$json" ts || extra="$extra,\"ts\":\"$ts\""
+  _json_has_key "$json" session_id || extra="$extra,\"session_id\":\"$session_id\""
 
-  # Add ts and session_id if not already present
   local full_event
-  full_event=$(echo "$json" | jq -c \
-    --arg ts "$ts" \
-    --arg sid "$session_id" \
-    '. + {ts: (.ts // $ts), session_id: (.session_id // $sid)}' 2>/dev/null)
-
-  # Fallback if jq fails
-  if [ -z "$full_event" ]; then
-    full_event="{\"ts\":\"$ts\",\"session_id\":\"$session_id\",\"raw\":$(echo "$json" | jq -c '.' 2>/dev/null || echo "\"$json\"")}"
+  if [[ "$json" =~ ^\{[[:space:]]*\}$ ]]; then
+    full_event="{${extra#,}}"
+  elif [[ "$json" == "{"*"}" ]]; then
+    full_event="${json%\}}$extra}"
+  else
+    # Not a JSON object — keep it as a string so the line stays valid
+    _json_escape "$json"
+    full_event="{\"ts\":\"$ts\",\"session_id\":\"$session_id\",\"raw\":\"$REPLY\"}"
   fi
+  _append_event "$full_event"
+}
 
-  # Atomic append (>> is atomic for lines < PIPE_BUF on Linux)
-  echo "$full_event" >> "$VERIFICATION_LOG"
-
-  # Rotate if over 10K lines (keep last 5K)
-  local lines
-  lines=$(wc -l < "$VERIFICATION_LOG" 2>/dev/null || echo 0)
-  if [ "$lines" -gt 10000 ]; then
-    local archive="$VERIFICATION_DATA_DIR/events-$(date +%Y%m%d).jsonl"
-    cp "$VERIFICATION_LOG" "$archive"
-    tail -5000 "$VERIFICATION_LOG" > "${VERIFICATION_LOG}.tmp"
-    mv "${VERIFICATION_LOG}.tmp" "$VERIFICATION_LOG"
+# Build, enrich and append an event in one go, without jq:
+#   log_gate_event "$INPUT" <gate> <action> <duration_ms|""> [key value]...
+# Detail values are JSON strings; prefix a key with # for a number (#block_count 3).
+log_gate_event() {
+  local stdin_json="$1" gate="$2" action="$3" duration="$4"
+  shift 4
+  local ts session_id details="" key value
+  _now_iso
+  ts="$REPLY"
+  _session_id "$stdin_json"
+  _json_escape "$REPLY"
+  session_id="$REPLY"
+
+  while [ $# -ge 2 ]; do
+    key="$1"
+    value="$2"
+    shift 2
+    if [[ "$key" == "#"* && "$value" =~ ^-?[0-9]+$ ]]; then
+      details="$details,\"${key#\#}\":$value"
+    else
+      _json_escape "$value"
+      details="$details,\"${key#\#}\":\"$REPLY\""
+    fi
+  done
+
+  local event="{\"ts\":\"$ts\",\"session_id\":\"$session_id\",\"gate\":\"$gate\",\"action\":\"$action\""
+  [[ "$duration" =~ ^[0-9]+$ ]] && event="$event,\"duration_ms\":$duration"
+  event="$event,\"details\":{${details#,}}}"
+  _append_event "$event"
+}
+
+# ========================================
+# Size-based rotation
+# The size is sampled on roughly 1 in VERIFICATION_LOG_CHECK_EVERY appends
+# ($RANDOM — no process spawned otherwise), so an append never pays for
+# reading the log. Rotation renames the live log to
+# events-YYYYMMDD-HHMMSS-PID.jsonl under an exclusive flock; writers keep
+# appending by path, so new events go to a fresh events.jsonl. A writer that
+# opened the old file just before the rename still lands its line in the
+# archive, which is why archives are gzipped one rotation later rather than
+# immediately — by then nobody can still be writing to them.
+# ========================================
+VERIFICATION_LOG_MAX_BYTES="${VERIFICATION_LOG_MAX_BYTES:-2097152}"
+VERIFICATION_LOG_CHECK_EVERY="${VERIFICATION_LOG_CHECK_EVERY:-32}"
+
+_log_size() {
+  stat -c %s "$1" 2>/dev/null || stat -f %z "$1" 2>/dev/null || echo 0
+}
+
+_rotate_log_if_needed() {
+  [ $((RANDOM % VERIFICATION_LOG_CHECK_EVERY)) -eq 0 ] || return 0
+  [ "$(_log_size "$VERIFICATION_LOG")" -ge "$VERIFICATION_LOG_MAX_BYTES" ] 2>/dev/null || return 0
+
+  local lock="$VERIFICATION_DATA_DIR/.rotate.lock"
+  if command -v flock >/dev/null 2>&1; then
+    (
+      flock -n 9 || exit 0    # another hook is already rotating
+      _rotate_log
+    ) 9>"$lock"
+  elif mkdir "$lock.d" 2>/dev/null; then
+    _rotate_log
+    rmdir "$lock.d" 2>/dev/null
   fi
+  return 0
+}
+
+# Caller holds the rotation lock
+_rotate_log() {
+  # Re-check under the lock: a concurrent hook may have just rotated
+  [ "$(_log_size "$VERIFICATION_LOG")" -ge "$VERIFICATION_LOG_MAX_BYTES" ] 2>/dev/null || return 0
+
+  # Compress archives from earlier rotations; late writers are long gone
+  local old
+  for old in "$VERIFICATION_DATA_DIR"/events-*.jsonl; do
+    [ -f "$old" ] && gzip -q "$old" 2>/dev/null
+  done
+
+  mv "$VERIFICATION_LOG" "$VERIFICATION_DATA_DIR/events-$(date +%Y%m%d-%H%M%S)-$$.jsonl" 2>/dev/null
 }